@@ -1,10 +1,12 @@
 # audio/capture.py
 
-from typing import Tuple
+from typing import Optional, Tuple
 
 import numpy as np
 import sounddevice as sd
 
+from audio.resample import create_resampler, downmix
+from audio.ring_buffer import AudioRingBuffer, RingBufferReader
 from core.config import AudioConfig
 
 
@@ -49,34 +51,144 @@ def resolve_device_index(config: AudioConfig) -> int:
     return _find_device_index(config.device_name)
 
 
+def device_format(config: AudioConfig, device_index: int) -> Tuple[int, int]:
+    """
+    장치를 열 (sample_rate, channels).
+    native_capture 면 장치 기본값 (가상 케이블 / 디스코드 출력은 보통 48kHz 스테레오),
+    아니면 AudioConfig 값 그대로 (드라이버가 변환).
+    """
+    if not config.native_capture:
+        return config.sample_rate, config.channels
+
+    info = sd.query_devices(device_index, "input")
+    return int(info["default_samplerate"]), max(1, int(info["max_input_channels"]))
+
+
 def record_once_with_index(config: AudioConfig, device_index: int) -> Tuple[np.ndarray, int]:
     """
     이미 결정된 device_index를 사용하여
     config.chunk_duration_sec 동안 녹음.
-    모노 오디오 데이터와 샘플레이트를 반환.
+    모노 오디오 데이터와 샘플레이트(config.sample_rate)를 반환.
     """
     sample_rate = config.sample_rate
-    channels = config.channels
+    device_rate, channels = device_format(config, device_index)
     duration = config.chunk_duration_sec
 
-    num_frames = int(sample_rate * duration)
+    num_frames = int(device_rate * duration)
 
     print(f"[*] 장치 [{device_index}] 에서 {duration:.1f}초 동안 녹음 시작...")
-    print(f"    - sample_rate={sample_rate}, channels={channels}, frames={num_frames}")
+    print(f"    - device_rate={device_rate}, channels={channels}, frames={num_frames}")
 
     recording = sd.rec(
         frames=num_frames,
-        samplerate=sample_rate,
+        samplerate=device_rate,
         channels=channels,
         dtype="float32",
         device=device_index,
     )
     sd.wait()
 
-    if channels == 1:
-        audio_mono = recording[:, 0]
-    else:
-        audio_mono = recording.mean(axis=1)
+    audio_mono = downmix(recording)
+    resampler = create_resampler(device_rate, sample_rate)
+    if resampler is not None:
+        audio_mono = resampler.process(audio_mono)
 
     print(f"[*] 녹음 완료. raw_shape={recording.shape}, mono_shape={audio_mono.shape}")
     return audio_mono, sample_rate
+
+
+class ContinuousCapture:
+    """
+    장치를 한 번만 열어두고 PortAudio 콜백으로 링버퍼를 계속 채우는 캡처 소스.
+
+    - sd.rec/sd.wait 를 청크마다 반복하지 않으므로 청크 사이에 샘플이 빠지지 않는다.
+    - consumer 는 reader() 로 커서를 받아 원하는 길이로 프레임을 읽는다.
+    - 장치는 기본 rate/채널로 열고, 콜백에서 다운믹스 + 스트리밍 리샘플해
+      링버퍼에는 항상 config.sample_rate 모노가 쌓인다 (리샘플러가 프레임 사이 필터 상태를 유지).
+    """
+
+    def __init__(self, config: AudioConfig, device_index: int, name: str = ""):
+        self.config = config
+        self.device_index = device_index
+        self.name = name or config.device_name
+        self.sample_rate = config.sample_rate
+        self.device_rate, self.channels = device_format(config, device_index)
+        self.resampler = create_resampler(self.device_rate, self.sample_rate)
+
+        capacity = int(config.sample_rate * config.ring_buffer_sec)
+        self.ring = AudioRingBuffer(capacity)
+        self.overflow_count = 0
+
+        self._stream: Optional[sd.InputStream] = None
+
+    def _callback(self, indata: np.ndarray, frames: int, time_info, status) -> None:
+        if status.input_overflow:
+            self.overflow_count += 1
+
+        mono = downmix(indata)
+        if self.resampler is not None:
+            mono = self.resampler.process(mono)
+        self.ring.write(mono)
+
+    def _open_stream(self) -> None:
+        self._stream = sd.InputStream(
+            samplerate=self.device_rate,
+            channels=self.channels,
+            dtype="float32",
+            device=self.device_index,
+            callback=self._callback,
+        )
+
+    def start(self) -> "ContinuousCapture":
+        if self._stream is not None:
+            return self
+
+        try:
+            self._open_stream()
+        except sd.PortAudioError as e:
+            if (self.device_rate, self.channels) == (self.sample_rate, self.config.channels):
+                raise
+            # 기본 형식으로 못 열면 예전처럼 드라이버 변환에 맡긴다
+            print(f"[WARN] 장치 기본 형식({self.device_rate}Hz, {self.channels}ch)으로 열기 실패: {e}")
+            self.device_rate, self.channels = self.sample_rate, self.config.channels
+            self.resampler = None
+            self._open_stream()
+        self._stream.start()
+
+        print(
+            f"[*] 연속 캡처 시작: 장치 [{self.device_index}], "
+            f"device_rate={self.device_rate}, channels={self.channels} → {self.sample_rate}Hz mono, "
+            f"ring={self.config.ring_buffer_sec:.0f}s"
+        )
+        return self
+
+    def stop(self) -> None:
+        if self._stream is None:
+            return
+
+        self._stream.stop()
+        self._stream.close()
+        self._stream = None
+        self.ring.close()
+
+        if self.overflow_count:
+            print(f"[WARN] 캡처 중 입력 오버플로 {self.overflow_count}회")
+        print("[*] 연속 캡처 종료")
+
+    def reader(self) -> RingBufferReader:
+        """지금 시점부터 읽기 시작하는 새 커서."""
+        return self.ring.reader()
+
+    def __enter__(self) -> "ContinuousCapture":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+
+def open_continuous_capture(config: AudioConfig) -> ContinuousCapture:
+    """
+    AudioConfig 기준으로 장치를 찾아 연속 캡처를 시작한다.
+    """
+    device_index = resolve_device_index(config)
+    return ContinuousCapture(config, device_index).start()
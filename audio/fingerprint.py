@@ -0,0 +1,179 @@
+# audio/fingerprint.py
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# 스펙트로그램 프레임 (64ms 창, 32ms hop). 주파수 bin 간격은 rate 와 상관없이 15.625Hz
+FRAME_SEC = 0.064
+HOP_SEC = FRAME_SEC / 2
+
+MIN_HZ = 150.0
+MAX_HZ = 5000.0
+
+
+@dataclass
+class Fingerprint:
+    """
+    landmark 해시 목록. frames 는 각 해시의 기준(anchor) 피크 시각 (스트림 절대 프레임, HOP_SEC 단위).
+    """
+
+    hashes: np.ndarray   # uint32
+    frames: np.ndarray   # int64
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+
+def spectral_peaks(
+    audio: np.ndarray,
+    sample_rate: int,
+    peaks_per_frame: int = 5,
+    neighborhood: Tuple[int, int] = (3, 8),
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    로그 스펙트로그램의 국소 최댓값 (time, freq bin).
+    - neighborhood (시간 프레임, 주파수 bin) 반경 안에서 가장 큰 점만 피크
+    - 프레임 중앙값 + 10dB, 전체 최대 - 60dB 아래는 버리고, 프레임마다 큰 것부터 peaks_per_frame 개
+    """
+    frame_len = int(round(sample_rate * FRAME_SEC))
+    hop = frame_len // 2
+    x = np.asarray(audio, dtype=np.float32)
+    if len(x) < frame_len:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    frames = sliding_window_view(x, frame_len)[::hop] * np.hanning(frame_len).astype(np.float32)
+    bin_hz = sample_rate / frame_len
+    lo, hi = int(MIN_HZ / bin_hz), int(MAX_HZ / bin_hz) + 1
+    spec = 20 * np.log10(np.abs(np.fft.rfft(frames, axis=1))[:, lo:hi] + 1e-6)
+
+    # 분리 가능한 최댓값 필터 (주파수 → 시간)
+    dt, df = neighborhood
+    local = np.pad(spec, ((0, 0), (df, df)), constant_values=-np.inf)
+    local = sliding_window_view(local, 2 * df + 1, axis=1).max(axis=-1)
+    local = np.pad(local, ((dt, dt), (0, 0)), constant_values=-np.inf)
+    local = sliding_window_view(local, 2 * dt + 1, axis=0).max(axis=-1)
+
+    floor = np.maximum(np.median(spec, axis=1, keepdims=True) + 10.0, spec.max() - 60.0)
+    score = np.where((spec == local) & (spec > floor), spec, -np.inf)
+
+    k = min(peaks_per_frame, score.shape[1])
+    top = np.argpartition(score, -k, axis=1)[:, -k:]
+    t_idx = np.repeat(np.arange(score.shape[0]), k)
+    f_idx = top.ravel()
+    keep = np.isfinite(score[t_idx, f_idx])
+    return t_idx[keep], f_idx[keep] + lo
+
+
+def landmark_hashes(
+    times: np.ndarray,
+    bins: np.ndarray,
+    fan_out: int = 6,
+    max_dt: int = 31,
+    max_df: int = 127,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    피크 쌍 (anchor, 뒤따르는 피크) → 32bit 해시 = f1(9bit) | f2(9bit) | dt(5bit).
+    anchor 마다 1~max_dt 프레임 뒤, 주파수 차 max_df 안의 피크를 가까운 순서로 fan_out 개까지 짝짓는다.
+    """
+    order = np.lexsort((bins, times))
+    t, f = times[order], bins[order]
+    n = len(t)
+    span = fan_out * 8   # 프레임당 피크 수를 생각한 후보 범위
+
+    if n < 2:
+        return np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.int64)
+
+    offsets = np.arange(1, min(span, n - 1) + 1)
+    j = np.arange(n)[:, None] + offsets[None, :]
+    inside = j < n
+    j = np.where(inside, j, n - 1)
+
+    d_t = t[j] - t[:, None]
+    d_f = f[j] - f[:, None]
+    valid = inside & (d_t >= 1) & (d_t <= max_dt) & (np.abs(d_f) <= max_df)
+    valid &= np.cumsum(valid, axis=1) <= fan_out
+
+    anchor, col = np.nonzero(valid)
+    target = j[anchor, col]
+    hashes = (
+        (f[anchor].astype(np.uint32) & 0x1FF) << 14
+        | (f[target].astype(np.uint32) & 0x1FF) << 5
+        | (d_t[anchor, col].astype(np.uint32) & 0x1F)
+    )
+    return hashes, t[anchor].astype(np.int64)
+
+
+def fingerprint(
+    audio: np.ndarray,
+    sample_rate: int,
+    start_sec: float = 0.0,
+    peaks_per_frame: int = 5,
+    fan_out: int = 6,
+) -> Fingerprint:
+    """오디오 구간 하나의 지문. start_sec 로 프레임을 스트림 절대 시각에 맞춘다."""
+    times, bins = spectral_peaks(audio, sample_rate, peaks_per_frame)
+    hashes, frames = landmark_hashes(times, bins, fan_out)
+    return Fingerprint(hashes, frames + int(round(start_sec / HOP_SEC)))
+
+
+class FingerprintIndex:
+    """
+    해시 → 나온 프레임들 (역색인). 지나간 오디오를 시간 순서로 쌓고, 오래된 것부터 지운다.
+
+    match() 는 질의 해시마다 같은 해시가 나온 과거 프레임과의 시간 차를 투표해
+    가장 많이 맞은 시간 차(= 같은 오디오가 몇 프레임 전에 나왔는지)를 찾는다.
+    """
+
+    def __init__(self):
+        self._index: Dict[int, "deque[int]"] = {}
+        self._order: "deque[Tuple[int, int]]" = deque()   # (frame, hash), 넣은 순서 = 시간 순서
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def add(self, fp: Fingerprint, from_frame: int = 0) -> None:
+        """from_frame 이후 해시만 넣는다 (겹치는 윈도우가 같은 구간을 또 넣지 않도록)."""
+        keep = fp.frames >= from_frame
+        order = np.argsort(fp.frames[keep], kind="stable")
+        for h, frame in zip(fp.hashes[keep][order].tolist(), fp.frames[keep][order].tolist()):
+            self._index.setdefault(h, deque()).append(frame)
+            self._order.append((frame, h))
+
+    def evict(self, before_frame: int) -> None:
+        while self._order and self._order[0][0] < before_frame:
+            _, h = self._order.popleft()
+            frames = self._index[h]
+            frames.popleft()
+            if not frames:
+                del self._index[h]
+
+    def match(self, fp: Fingerprint, max_delta: int) -> Optional[Tuple[int, np.ndarray]]:
+        """
+        (시간 차, 맞은 질의 해시 mask). 시간 차 = 과거 프레임 - 질의 프레임 ≤ max_delta 만 센다 (음수 = 과거).
+        격자가 프레임 미만으로 어긋난 경우를 위해 이웃 시간 차(±1)로 맞은 해시도 포함한다.
+        """
+        deltas, queries = [], []
+        for i, (h, frame) in enumerate(zip(fp.hashes.tolist(), fp.frames.tolist())):
+            frames = self._index.get(h)
+            if frames:
+                d = np.fromiter(frames, dtype=np.int64, count=len(frames)) - frame
+                d = d[d <= max_delta]
+                deltas.append(d)
+                queries.append(np.full(len(d), i))
+        if not deltas:
+            return None
+
+        deltas = np.concatenate(deltas)
+        if not len(deltas):
+            return None
+        queries = np.concatenate(queries)
+
+        values, counts = np.unique(deltas, return_counts=True)
+        best = int(values[np.argmax(counts)])
+        matched = np.zeros(len(fp), dtype=bool)
+        matched[queries[np.abs(deltas - best) <= 1]] = True
+        return best, matched
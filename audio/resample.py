@@ -0,0 +1,106 @@
+# audio/resample.py
+
+from math import gcd
+from typing import Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def downmix(frames: np.ndarray) -> np.ndarray:
+    """
+    (frames, channels) → float32 모노. 채널 평균을 행렬-벡터 곱 한 번으로 계산한다.
+    이미 1차원이면 그대로 돌려준다.
+    """
+    if frames.ndim == 1:
+        return frames if frames.dtype == np.float32 else frames.astype(np.float32)
+    if frames.shape[1] == 1:
+        return np.ascontiguousarray(frames[:, 0], dtype=np.float32)
+
+    weights = np.full(frames.shape[1], 1.0 / frames.shape[1], dtype=np.float32)
+    return frames.astype(np.float32, copy=False) @ weights
+
+
+def design_lowpass(up: int, down: int, zero_crossings: int = 16, rolloff: float = 0.92, beta: float = 8.6) -> np.ndarray:
+    """
+    polyphase 용 원형 필터 (Kaiser 창 sinc). 업샘플된 rate 기준으로 설계하고 이득 up 을 곱해 둔다.
+    - 차단 주파수: 입력/출력 중 낮은 쪽 나이퀴스트의 rolloff 배
+    - zero_crossings: 입력 샘플 기준 한쪽 sinc 영점 수 (길수록 전이대역이 좁고 비쌈)
+    """
+    cutoff = rolloff * 0.5 / max(up, down)   # 업샘플 rate 기준 (cycles / sample)
+    taps_per_phase = int(np.ceil(2 * zero_crossings * max(1.0, down / up)))
+    n = taps_per_phase * up
+
+    t = np.arange(n) - (n - 1) / 2
+    h = 2 * cutoff * np.sinc(2 * cutoff * t) * np.kaiser(n, beta)
+    h *= up / h.sum()
+    return h
+
+
+class StreamingResampler:
+    """
+    정수비 up/down 의 polyphase FIR 리샘플러 (48k → 16k = 1/3, 44.1k → 16k = 160/441).
+
+    - 프레임마다 process() 를 부르면 필터 이력(직전 입력 꼬리)과 위상을 이어 가므로
+      프레임 경계에 끊김 / 위상 튐이 없다 (한 번에 넣은 것과 결과가 같음)
+    - 출력 샘플마다 필요한 phase 의 필터만 계산한다 (업샘플한 0 은 곱하지 않음)
+    - 정수배 다운샘플(up == 1)은 sliding window 뷰 @ 필터 한 번으로 끝난다
+    """
+
+    def __init__(self, in_rate: int, out_rate: int, zero_crossings: int = 16):
+        g = gcd(int(in_rate), int(out_rate))
+        self.in_rate = int(in_rate)
+        self.out_rate = int(out_rate)
+        self.up = self.out_rate // g
+        self.down = self.in_rate // g
+
+        h = design_lowpass(self.up, self.down, zero_crossings)
+        self.taps = len(h) // self.up
+        # bank[p, k] = h[p + k * up] 를 입력 순서(오래된 → 최근)로 뒤집어 둔다
+        self._bank = np.ascontiguousarray(h.reshape(self.taps, self.up).T[:, ::-1], dtype=np.float32)
+
+        # 필터 지연을 0 으로 채운 이력으로 시작 (출력 길이 ≈ 입력 길이 × up / down)
+        self._hist = np.zeros(self.taps - 1, dtype=np.float32)
+        self._t = 0   # 다음 출력의 업샘플 시각 (이번 프레임 첫 입력 기준)
+
+    @property
+    def delay_sec(self) -> float:
+        """필터 군지연 (출력이 입력보다 늦는 시간)."""
+        return (self.taps * self.up - 1) / 2 / (self.in_rate * self.up)
+
+    def reset(self) -> None:
+        self._hist[:] = 0
+        self._t = 0
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        x = np.asarray(samples, dtype=np.float32)
+        n_in = len(x)
+        if n_in == 0:
+            return np.zeros(0, dtype=np.float32)
+
+        buf = np.concatenate((self._hist, x))
+        span = n_in * self.up
+        n_out = max(0, -(-(span - self._t) // self.down))   # ceil
+
+        if n_out:
+            windows = sliding_window_view(buf, self.taps)   # windows[i] = 입력 i 에서 끝나는 필터 창
+            if self.up == 1:
+                idx0 = self._t
+                y = windows[idx0:idx0 + self.down * n_out:self.down] @ self._bank[0]
+            else:
+                ts = self._t + self.down * np.arange(n_out)
+                y = np.einsum("nk,nk->n", windows[ts // self.up], self._bank[ts % self.up])
+            self._t += self.down * n_out
+        else:
+            y = np.zeros(0, dtype=np.float32)
+
+        self._t -= span
+        self._hist = buf[-(self.taps - 1):].copy() if self.taps > 1 else self._hist
+        return y.astype(np.float32, copy=False)
+
+
+def create_resampler(in_rate: int, out_rate: int) -> Optional[StreamingResampler]:
+    """같은 rate 면 None (리샘플 생략)."""
+    if int(in_rate) == int(out_rate):
+        return None
+    return StreamingResampler(in_rate, out_rate)
@@ -0,0 +1,156 @@
+# audio/ring_buffer.py
+
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """
+    PortAudio 콜백이 채우는 모노 float32 링버퍼.
+
+    - 내부 배열을 capacity 의 2배로 잡고 모든 샘플을 두 군데(i, i + capacity)에 기록한다.
+      덕분에 길이 capacity 이하의 구간은 경계를 넘어가도 항상 연속된 슬라이스로 읽을 수 있다.
+    - 위치는 "지금까지 기록된 전체 샘플 수" 기준의 절대 위치로 다룬다.
+    - view() 가 돌려주는 배열은 복사본이 아니라 내부 버퍼의 뷰이므로,
+      writer 가 capacity 만큼 더 쓰기 전까지만 유효하다.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError(f"capacity 는 0보다 커야 합니다: {capacity}")
+
+        self.capacity = int(capacity)
+        self._buf = np.zeros(self.capacity * 2, dtype=np.float32)
+        self._write_pos = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    # ---------------- writer ---------------- #
+    def write(self, samples: np.ndarray) -> None:
+        """
+        모노 샘플을 기록한다. (콜백 스레드에서 호출)
+        capacity 보다 긴 입력은 마지막 capacity 샘플만 남는다.
+        """
+        n = len(samples)
+        if n == 0:
+            return
+
+        cap = self.capacity
+        if n > cap:
+            self._write_pos += n - cap
+            samples = samples[-cap:]
+            n = cap
+
+        start = self._write_pos % cap
+        first = min(n, cap - start)
+
+        # 앞쪽 사본
+        self._buf[start:start + first] = samples[:first]
+        self._buf[start + cap:start + cap + first] = samples[:first]
+        # capacity 경계를 넘어간 나머지
+        if first < n:
+            rest = n - first
+            self._buf[:rest] = samples[first:]
+            self._buf[cap:cap + rest] = samples[first:]
+
+        with self._cond:
+            self._write_pos += n
+            self._cond.notify_all()
+
+    def close(self) -> None:
+        """대기 중인 reader 를 모두 깨운다. 이후 read 는 None 을 돌려준다."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    # ---------------- reader 측 ---------------- #
+    @property
+    def write_pos(self) -> int:
+        return self._write_pos
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def view(self, start: int, num_frames: int) -> np.ndarray:
+        """
+        절대 위치 start 부터 num_frames 샘플을 복사 없이 돌려준다.
+        이미 덮어써진 구간이나 아직 기록되지 않은 구간을 요청하면 ValueError.
+        """
+        if num_frames > self.capacity:
+            raise ValueError(f"요청 길이({num_frames})가 링버퍼 용량({self.capacity})보다 큽니다.")
+        if start < self._write_pos - self.capacity or start + num_frames > self._write_pos:
+            raise ValueError(
+                f"링버퍼 범위를 벗어난 구간: start={start}, frames={num_frames}, "
+                f"write_pos={self._write_pos}"
+            )
+
+        offset = start % self.capacity
+        return self._buf[offset:offset + num_frames]
+
+    def snapshot(self, start: int, end: int) -> Optional[Tuple[int, np.ndarray]]:
+        """
+        절대 구간 [start, end) 의 복사본 → (실제 시작 위치, 샘플).
+        큐에 넣어 나중에 쓸 오디오용 (view 는 writer 가 capacity 만큼 더 쓰면 조용히 바뀐다).
+        이미 덮어써진 앞부분은 잘라내고, 남는 게 없으면 None.
+        """
+        start = max(start, self._write_pos - self.capacity)
+        end = min(end, self._write_pos)
+        if start >= end:
+            return None
+        audio = self.view(start, end - start).copy()
+
+        # 복사하는 동안 writer 가 앞부분을 덮어썼으면 그만큼 버린다
+        oldest = self._write_pos - self.capacity
+        if oldest > start:
+            audio = audio[oldest - start:]
+            start = oldest
+        return (start, audio) if len(audio) else None
+
+    def wait_until(self, pos: int, timeout: Optional[float] = None) -> bool:
+        """write_pos 가 pos 이상이 될 때까지 대기. 성공하면 True."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._write_pos >= pos or self._closed,
+                timeout=timeout,
+            ) and self._write_pos >= pos
+
+    def reader(self, start: Optional[int] = None) -> "RingBufferReader":
+        return RingBufferReader(self, start)
+
+
+class RingBufferReader:
+    """
+    링버퍼를 순서대로 읽는 커서.
+    consumer 마다 하나씩 만들어 쓰며, 원하는 길이로 프레임을 잘라 읽을 수 있다.
+    """
+
+    def __init__(self, ring: AudioRingBuffer, start: Optional[int] = None):
+        self.ring = ring
+        self.pos = ring.write_pos if start is None else start
+        self.dropped_samples = 0
+
+    def available(self) -> int:
+        return self.ring.write_pos - self.pos
+
+    def read(self, num_frames: int, timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        """
+        num_frames 샘플이 모일 때까지 기다렸다가 zero-copy 뷰로 반환.
+        - timeout 안에 모이지 않거나 링버퍼가 닫히면 None
+        - reader 가 너무 느려 덮어써진 구간은 건너뛰고 dropped_samples 에 누적
+        """
+        if not self.ring.wait_until(self.pos + num_frames, timeout=timeout):
+            return None
+
+        oldest = self.ring.write_pos - self.ring.capacity
+        if self.pos < oldest:
+            lost = oldest - self.pos
+            self.dropped_samples += lost
+            print(f"[WARN] ring buffer overrun, {lost} samples skipped")
+            self.pos = oldest
+
+        frame = self.ring.view(self.pos, num_frames)
+        self.pos += num_frames
+        return frame
@@ -0,0 +1,83 @@
+# audio/sources.py
+
+from dataclasses import replace
+from typing import Union
+
+import numpy as np
+
+from audio.capture import ContinuousCapture, resolve_device_index
+from audio.resample import create_resampler, downmix
+from audio.ring_buffer import AudioRingBuffer, RingBufferReader
+from core.config import AudioConfig, SourceConfig
+
+
+class PushAudioSource:
+    """
+    외부에서 PCM 을 밀어 넣는 오디오 소스 (예: 디스코드 봇이 받은 사용자별 음성).
+
+    - ContinuousCapture 와 같은 링버퍼/reader 인터페이스를 제공하므로
+      파이프라인에서는 장치 소스와 똑같이 다룬다.
+    - push() 는 int16 PCM bytes / int16 배열 / float32 배열을 받는다.
+    - input_rate 가 sample_rate 와 다르면 (디스코드 48kHz 스테레오 등) 다운믹스 후 스트리밍 리샘플
+    """
+
+    def __init__(
+        self,
+        name: str,
+        sample_rate: int,
+        ring_buffer_sec: float,
+        channels: int = 1,
+        input_rate: int = 0,
+    ):
+        self.name = name
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.input_rate = input_rate or sample_rate
+        self.resampler = create_resampler(self.input_rate, sample_rate)
+        self.ring = AudioRingBuffer(int(sample_rate * ring_buffer_sec))
+
+    def push(self, pcm: Union[bytes, np.ndarray]) -> None:
+        if isinstance(pcm, (bytes, bytearray, memoryview)):
+            pcm = np.frombuffer(pcm, dtype=np.int16)
+
+        if pcm.dtype == np.int16:
+            samples = pcm.astype(np.float32) / 32768.0
+        else:
+            samples = np.asarray(pcm, dtype=np.float32)
+
+        if samples.ndim == 1 and self.channels > 1:
+            samples = samples.reshape(-1, self.channels)
+        samples = downmix(samples)
+        if self.resampler is not None:
+            samples = self.resampler.process(samples)
+
+        self.ring.write(samples)
+
+    def start(self) -> "PushAudioSource":
+        return self
+
+    def stop(self) -> None:
+        self.ring.close()
+
+    def reader(self) -> RingBufferReader:
+        return self.ring.reader()
+
+
+def open_source(src: SourceConfig, audio_cfg: AudioConfig):
+    """
+    SourceConfig 하나를 열어 reader() 를 가진 소스 객체로 돌려준다.
+    """
+    if src.kind == "device":
+        cfg = replace(audio_cfg, device_name=src.device_name)
+        return ContinuousCapture(cfg, resolve_device_index(cfg), name=src.name).start()
+
+    if src.kind == "push":
+        return PushAudioSource(
+            src.name,
+            audio_cfg.sample_rate,
+            audio_cfg.ring_buffer_sec,
+            channels=src.channels,
+            input_rate=src.sample_rate,
+        ).start()
+
+    raise ValueError(f"지원하지 않는 오디오 소스 종류: {src.kind}")
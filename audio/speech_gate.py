@@ -0,0 +1,170 @@
+# audio/speech_gate.py
+
+import threading
+import time
+from dataclasses import replace
+from typing import Optional, Tuple
+
+import numpy as np
+
+from audio.vad import OnnxSpeechClassifier, create_vad_classifier
+from core.config import SpeechGateConfig, VADConfig
+from core.debug_config import DEBUG_VAD
+
+BAND_HZ = (300.0, 3400.0)      # 말소리 에너지가 몰리는 대역
+MODULATION_HZ = (2.0, 8.0)     # 음절 속도 (초당 2~8 음절)
+
+
+def spectral_features(frames: np.ndarray, sample_rate: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (n, frame_len) 프레임 배열 → (rms dB, 대역 내 spectral flatness, 말소리 대역 에너지 비율). rfft 한 번으로 계산.
+    - flatness: 기하평균 / 산술평균 (잡음 ≈ 1, 배음이 뚜렷한 유성음 ≪ 1)
+    - band ratio: 300~3400Hz 에너지 / 60Hz 이상 전체 에너지
+    """
+    frame_len = frames.shape[1]
+    power = np.abs(np.fft.rfft(frames * np.hanning(frame_len).astype(np.float32), axis=1)) ** 2 + 1e-12
+    freqs = np.fft.rfftfreq(frame_len, 1.0 / sample_rate)
+
+    band = (freqs >= BAND_HZ[0]) & (freqs <= BAND_HZ[1])
+    p_band = power[:, band]
+    flatness = np.exp(np.log(p_band).mean(axis=1)) / p_band.mean(axis=1)
+    band_ratio = p_band.sum(axis=1) / power[:, freqs >= 60.0].sum(axis=1)
+
+    rms_db = 10 * np.log10(np.einsum("ij,ij->i", frames, frames) / frame_len + 1e-12)
+    return rms_db, flatness, band_ratio
+
+
+def modulation_ratio(rms_db: np.ndarray, frame_sec: float) -> float:
+    """
+    에너지 포락선의 변조 스펙트럼에서 음절 속도(2~8Hz) 성분의 비율.
+    말소리는 음절마다 에너지가 오르내리고, 지속음 위주의 음악 / 잡음은 이 비율이 낮다.
+    """
+    if len(rms_db) < 16:
+        return 1.0   # 너무 짧으면 판단하지 않음
+    env = rms_db - rms_db.mean()
+    spectrum = np.abs(np.fft.rfft(env * np.hanning(len(env)))) ** 2
+    freqs = np.fft.rfftfreq(len(env), frame_sec)
+    total = spectrum[(freqs >= 0.5)].sum()
+    if total <= 0:
+        return 0.0
+    return float(spectrum[(freqs >= MODULATION_HZ[0]) & (freqs <= MODULATION_HZ[1])].sum() / total)
+
+
+class SpeechGate:
+    """
+    브금/영상 모드: STT 앞에서 청크에 말소리가 있는지 먼저 본다 (없으면 디코딩 생략).
+
+    - backend="spectral": 적응형 에너지 판정(EnergyClassifier) + 프레임별 flatness / 대역 비율
+      + 청크 전체의 음절 속도 변조 비율. numpy 벡터 연산만 쓴다 (윈도우 하나에 수 ms)
+    - backend="onnx": 에너지 판정을 통과한 프레임만 ONNX 음성 모델(OnnxSpeechClassifier)로 다시 판정
+      (윈도우가 겹치므로 모델 상태는 윈도우마다 새로 시작. onnxruntime / 모델 경로가 없으면 spectral 로 대체)
+    - 말소리로 판정된 프레임이 min_speech_sec 이상이면 통과하고, 그 뒤 hangover_chunks 개는 판정 없이 통과
+      (슬라이딩 윈도우에서 끝부분 단어는 다음 윈도우에서 확정되므로)
+    - hangover / 노이즈 바닥이 앞 청크에 의존하므로 check() 는 캡처 순서대로 불러야 한다 (stt 단계 스레드 하나)
+    """
+
+    def __init__(self, cfg: SpeechGateConfig, vad_cfg: VADConfig, sample_rate: int):
+        self.cfg = cfg
+        self.sample_rate = sample_rate
+        self.frame_len = int(sample_rate * cfg.frame_ms / 1000)
+        self.frame_sec = self.frame_len / sample_rate
+
+        # ONNX 모델 경로 / 임계값, 에너지 판정 값은 대화 모드 VAD 설정을 같이 쓴다
+        backend = "onnx" if cfg.backend == "onnx" else "energy"
+        if backend == "onnx" and not vad_cfg.onnx_model_path:
+            print("[WARN] speech_gate backend='onnx' 에 vad.onnx_model_path 가 없어 spectral 로 대체합니다.")
+            backend = "energy"
+        gate_vad_cfg = replace(vad_cfg, backend=backend, frame_ms=cfg.frame_ms)
+        try:
+            self.classifier = create_vad_classifier(gate_vad_cfg, sample_rate)
+        except ValueError as e:
+            # ONNX 모델이 받지 못하는 sample rate / 프레임 길이 → spectral 로
+            print(f"[WARN] speech_gate ONNX 를 쓸 수 없어 spectral 로 대체합니다: {e}")
+            self.classifier = create_vad_classifier(replace(gate_vad_cfg, backend="energy"), sample_rate)
+        self.uses_model = isinstance(self.classifier, OnnxSpeechClassifier)
+        self._lock = threading.Lock()   # 분류기 상태 (노이즈 바닥, ONNX state)
+
+        self._hangover = 0
+        self.checked = 0
+        self.dropped = 0
+        self.dropped_audio_sec = 0.0
+        self._gate_sec = 0.0
+        self._stt_sec = 0.0
+        self._stt_audio_sec = 0.0
+
+    def speech_sec(self, audio: np.ndarray) -> float:
+        """말소리로 판정된 길이 (초)."""
+        n = len(audio) // self.frame_len
+        if n == 0:
+            return 0.0
+        frames = np.asarray(audio[:n * self.frame_len], dtype=np.float32).reshape(n, self.frame_len)
+
+        with self._lock:
+            if self.uses_model:
+                self.classifier.reset_state()
+            speech = self.classifier.classify(frames)
+            floor_db = 20 * np.log10(self.classifier.threshold()) if not self.uses_model else 0.0
+        if self.uses_model or not speech.any():
+            return float(speech.sum()) * self.frame_sec
+
+        rms_db, flatness, band_ratio = spectral_features(frames, self.sample_rate)
+        speech &= (flatness < self.cfg.max_flatness) & (band_ratio > self.cfg.min_band_ratio)
+        # 무음 구간의 잔잡음이 변조 스펙트럼을 흐리지 않도록 에너지 임계값 아래는 평평하게
+        mod = modulation_ratio(np.maximum(rms_db, floor_db), self.frame_sec)
+
+        if DEBUG_VAD:
+            print(
+                f"[GATE] flat={np.median(flatness):.2f} band={np.median(band_ratio):.2f} "
+                f"mod={mod:.2f} speech={int(speech.sum())}/{n}"
+            )
+
+        if mod < self.cfg.min_modulation:
+            return 0.0
+        return float(speech.sum()) * self.frame_sec
+
+    def check(self, audio: np.ndarray, decode_sec: Optional[float] = None) -> bool:
+        """
+        True 면 STT 로 보낸다. False 면 버린 것으로 센다.
+        decode_sec: 통과했다면 디코딩했을 오디오 길이 (윈도우 꼬리만 판정할 때, 기본은 audio 길이)
+        """
+        started = time.perf_counter()
+        passed = self.speech_sec(audio) >= self.cfg.min_speech_sec
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self.checked += 1
+            self._gate_sec += elapsed
+            if passed:
+                self._hangover = self.cfg.hangover_chunks
+            elif self._hangover > 0:
+                self._hangover -= 1
+                passed = True
+            else:
+                self.dropped += 1
+                self.dropped_audio_sec += decode_sec if decode_sec is not None else len(audio) / self.sample_rate
+        return passed
+
+    def observe_decode(self, audio_sec: float, stt_sec: float) -> None:
+        """통과한 청크의 실제 디코딩 시간 (버린 청크가 아낀 시간을 추정하는 데 씀)."""
+        with self._lock:
+            self._stt_sec += stt_sec
+            self._stt_audio_sec += audio_sec
+
+    def stats(self) -> dict:
+        with self._lock:
+            rtf = self._stt_sec / self._stt_audio_sec if self._stt_audio_sec else 0.0
+            return {
+                "checked": self.checked,
+                "dropped": self.dropped,
+                "drop_rate": round(self.dropped / self.checked, 3) if self.checked else 0.0,
+                "dropped_audio_sec": round(self.dropped_audio_sec, 2),
+                "stt_sec_saved": round(self.dropped_audio_sec * rtf, 2),   # 디코딩했다면 걸렸을 시간 (실측 RTF 기준)
+                "gate_ms_avg": round(self._gate_sec / self.checked * 1000, 3) if self.checked else 0.0,
+            }
+
+
+def create_speech_gate(cfg: SpeechGateConfig, vad_cfg: VADConfig, sample_rate: int):
+    """꺼져 있으면 None."""
+    if not cfg.enabled:
+        return None
+    return SpeechGate(cfg, vad_cfg, sample_rate)
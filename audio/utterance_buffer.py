@@ -0,0 +1,62 @@
+# audio/utterance_buffer.py
+
+import numpy as np
+
+
+class UtteranceBuffer:
+    """
+    발화 하나를 모으는 미리 할당된 float32 버퍼.
+
+    - VAD 가 내보내는 프레임(프리롤 포함)을 리스트에 모았다가 np.concatenate 하는 대신 제자리에 쓴다
+    - view() 는 복사 없는 연속 배열이라 그대로 Whisper 에 넘길 수 있다 (중간 자막 스냅샷 포함)
+    - detach() 는 지금까지 쓴 배열을 작업 쪽으로 넘기고 같은 크기의 새 버퍼로 갈아 끼운다
+      → 넘겨 준 배열은 더 이상 덮어쓰지 않으므로 STT 스레드가 복사 없이 써도 안전
+    - 용량이 모자라면 두 배로 늘린다 (보통은 max_utter_sec 기준으로 잡아 늘 일이 없음)
+    """
+
+    def __init__(self, sample_rate: int, capacity_sec: float = 16.0):
+        self.sample_rate = sample_rate
+        self._buf = np.empty(max(1, int(sample_rate * capacity_sec)), dtype=np.float32)
+        self._n = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def duration_sec(self) -> float:
+        return self._n / self.sample_rate
+
+    @property
+    def capacity(self) -> int:
+        return len(self._buf)
+
+    def append(self, samples: np.ndarray) -> None:
+        k = len(samples)
+        end = self._n + k
+        if end > len(self._buf):
+            self._grow(end)
+        self._buf[self._n:end] = samples
+        self._n = end
+
+    def view(self) -> np.ndarray:
+        """지금까지 모은 오디오 (복사 없음). 이후 append 는 이 구간을 건드리지 않는다."""
+        return self._buf[:self._n]
+
+    def detach(self) -> np.ndarray:
+        """모은 오디오를 넘기고 빈 새 버퍼로 시작."""
+        audio = self._buf[:self._n]
+        self._buf = np.empty(len(self._buf), dtype=np.float32)
+        self._n = 0
+        return audio
+
+    def clear(self) -> None:
+        """
+        모은 오디오를 버리고 같은 버퍼를 다시 쓴다.
+        view() 로 넘겨 준 스냅샷이 아직 쓰이는 중이면 detach() 를 써야 한다.
+        """
+        self._n = 0
+
+    def _grow(self, needed: int) -> None:
+        new = np.empty(max(needed, 2 * len(self._buf)), dtype=np.float32)
+        new[:self._n] = self._buf[:self._n]
+        self._buf = new
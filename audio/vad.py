@@ -0,0 +1,222 @@
+# audio/vad.py
+
+from collections import deque
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from core.config import VADConfig
+from core.debug_config import DEBUG_VAD
+
+
+# (kind, audio)
+# - ("start", pre-roll 포함 시작 오디오)
+# - ("audio", 발화 중 이어지는 오디오. 발화 중간의 짧은 무음도 포함)
+# - ("end",   None)
+VadEvent = Tuple[str, Optional[np.ndarray]]
+
+
+def frame_features(frames: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (n, frame_len) 서브프레임 배열에서 RMS 에너지와 zero-crossing rate 를 한 번에 계산.
+    """
+    rms = np.sqrt(np.einsum("ij,ij->i", frames, frames) / frames.shape[1])
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frames.shape[1] - 1)
+    return rms, zcr
+
+
+class EnergyClassifier:
+    """
+    에너지 + ZCR + 적응형 노이즈 바닥 기반 음성 판정.
+    - 노이즈 바닥은 무음으로 판정된 프레임으로 블록마다 갱신 (내려갈 땐 바로, 올라갈 땐 천천히)
+    """
+
+    def __init__(self, cfg: VADConfig):
+        self.cfg = cfg
+        self.noise_floor: Optional[float] = None
+
+    def threshold(self) -> float:
+        floor = self.noise_floor if self.noise_floor is not None else self.cfg.min_energy
+        return max(self.cfg.min_energy, floor * self.cfg.speech_ratio)
+
+    def classify(self, frames: np.ndarray) -> np.ndarray:
+        rms, zcr = frame_features(frames)
+
+        if self.noise_floor is None:
+            self.noise_floor = max(float(rms.min()), 1e-5)
+
+        th = self.threshold()
+        speech = (rms > th) & ((zcr < self.cfg.max_zcr) | (rms > th * 2.0))
+
+        quiet = rms[~speech]
+        if quiet.size:
+            target = float(np.median(quiet))
+        else:
+            # 계속 음성으로만 나오면 아주 천천히 바닥을 끌어올린다 (잡음 레벨 급상승 대비)
+            target = float(rms.min())
+
+        if target < self.noise_floor:
+            self.noise_floor = max(target, 1e-5)
+        else:
+            rate = self.cfg.noise_adapt if quiet.size else self.cfg.noise_adapt * 0.1
+            self.noise_floor += rate * (target - self.noise_floor)
+
+        if DEBUG_VAD:
+            print(
+                f"[VAD] rms={rms.mean():.5f} zcr={zcr.mean():.2f} "
+                f"floor={self.noise_floor:.5f} th={th:.5f} speech={int(speech.sum())}/{len(speech)}"
+            )
+
+        return speech
+
+
+class OnnxSpeechClassifier:
+    """
+    작은 ONNX 음성 모델(silero VAD v5 입출력 규격)로 에너지 판정을 한 번 더 거른다.
+    - 에너지 게이트를 통과한 서브프레임만 모델에 넣어 CPU 비용을 줄인다.
+    - silero 는 16kHz 에서 512 샘플 (8kHz 에서 256 샘플) 창만 받으므로 frame_ms=32 여야 한다.
+      다른 설정이면 만들 때 ValueError (실행 중에 모델이 실패 / 오판정하지 않도록)
+    """
+
+    # sample_rate → 모델이 받는 창 길이
+    WINDOW_SAMPLES = {16000: 512, 8000: 256}
+
+    def __init__(self, cfg: VADConfig, sample_rate: int):
+        import onnxruntime as ort
+
+        if not cfg.onnx_model_path:
+            raise ValueError("backend='onnx' 에는 onnx_model_path 가 필요합니다.")
+
+        window = self.WINDOW_SAMPLES.get(sample_rate)
+        if window is None:
+            raise ValueError(f"backend='onnx' 는 8000 / 16000Hz 만 지원합니다 (sample_rate={sample_rate}).")
+        frame_len = int(sample_rate * cfg.frame_ms / 1000)
+        if frame_len != window:
+            raise ValueError(
+                f"backend='onnx' 는 {sample_rate}Hz 에서 {window} 샘플 프레임이 필요합니다 "
+                f"(frame_ms={cfg.frame_ms} → {frame_len} 샘플, frame_ms=32 로 설정)."
+            )
+
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = 1
+        opts.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(
+            cfg.onnx_model_path,
+            sess_options=opts,
+            providers=["CPUExecutionProvider"],
+        )
+
+        self.cfg = cfg
+        self.energy = EnergyClassifier(cfg)
+        self._sr = np.array(sample_rate, dtype=np.int64)
+        self._state = np.zeros((2, 1, 128), dtype=np.float32)
+
+    def reset_state(self) -> None:
+        """모델 상태(RNN state)만 비운다. 에너지 노이즈 바닥은 유지."""
+        self._state = np.zeros((2, 1, 128), dtype=np.float32)
+
+    def classify(self, frames: np.ndarray) -> np.ndarray:
+        speech = self.energy.classify(frames)
+
+        for i in np.flatnonzero(speech):
+            prob, self._state = self.session.run(
+                None,
+                {"input": frames[i:i + 1], "state": self._state, "sr": self._sr},
+            )
+            speech[i] = float(prob[0, 0]) >= self.cfg.onnx_threshold
+
+        return speech
+
+
+def create_vad_classifier(cfg: VADConfig, sample_rate: int):
+    if cfg.backend == "energy":
+        return EnergyClassifier(cfg)
+
+    if cfg.backend == "onnx":
+        try:
+            return OnnxSpeechClassifier(cfg, sample_rate)
+        except ImportError:
+            print("[WARN] onnxruntime 이 없어 energy VAD 로 대체합니다.")
+            return EnergyClassifier(cfg)
+
+    raise ValueError(f"지원하지 않는 VAD backend: {cfg.backend}")
+
+
+class VADSegmenter:
+    """
+    캡처 블록을 서브프레임 단위로 판정해 발화 시작/끝 이벤트를 만든다.
+
+    - start_ms 만큼 연속 음성이면 시작, hangover_ms 만큼 연속 무음이면 endpoint
+    - 시작 시 preroll_ms 만큼의 직전 오디오를 앞에 붙여 첫 음절이 잘리지 않게 한다
+    - 발화 도중의 무음도 그대로 이어 붙이므로 Whisper 에 끊긴 오디오가 가지 않는다
+    """
+
+    def __init__(self, cfg: VADConfig, sample_rate: int, classifier=None):
+        self.cfg = cfg
+        self.sample_rate = sample_rate
+        self.frame_len = int(sample_rate * cfg.frame_ms / 1000)
+        self.classifier = classifier or create_vad_classifier(cfg, sample_rate)
+
+        self.start_frames = max(1, round(cfg.start_ms / cfg.frame_ms))
+        self.hangover_frames = max(1, round(cfg.hangover_ms / cfg.frame_ms))
+        preroll_frames = round(cfg.preroll_ms / cfg.frame_ms)
+
+        self._preroll: "deque[np.ndarray]" = deque(maxlen=preroll_frames + self.start_frames)
+        self._remainder = np.zeros(0, dtype=np.float32)
+
+        self.in_speech = False
+        self._speech_run = 0
+        self._silence_run = 0
+
+    def reset(self) -> None:
+        self._preroll.clear()
+        self._remainder = np.zeros(0, dtype=np.float32)
+        self.in_speech = False
+        self._speech_run = 0
+        self._silence_run = 0
+
+    def process(self, block: np.ndarray) -> List[VadEvent]:
+        if len(self._remainder):
+            block = np.concatenate([self._remainder, block])
+
+        n = len(block) // self.frame_len
+        used = n * self.frame_len
+        self._remainder = block[used:].copy()
+        if n == 0:
+            return []
+
+        frames = block[:used].reshape(n, self.frame_len)
+        speech = self.classifier.classify(frames)
+
+        events: List[VadEvent] = []
+        span_start = 0   # 발화 중일 때 아직 내보내지 않은 구간의 시작 프레임
+
+        for i in range(n):
+            if not self.in_speech:
+                self._preroll.append(frames[i])
+                self._speech_run = self._speech_run + 1 if speech[i] else 0
+
+                if self._speech_run >= self.start_frames:
+                    self.in_speech = True
+                    self._silence_run = 0
+                    events.append(("start", np.concatenate(self._preroll)))
+                    self._preroll.clear()
+                    span_start = i + 1
+                continue
+
+            self._silence_run = 0 if speech[i] else self._silence_run + 1
+
+            if self._silence_run >= self.hangover_frames:
+                if i + 1 > span_start:
+                    events.append(("audio", block[span_start * self.frame_len:(i + 1) * self.frame_len]))
+                events.append(("end", None))
+                self.in_speech = False
+                self._speech_run = 0
+                self._silence_run = 0
+                span_start = i + 1
+
+        if self.in_speech and n > span_start:
+            events.append(("audio", block[span_start * self.frame_len:used]))
+
+        return events
@@ -0,0 +1,93 @@
+# bench_backpressure.py
+#
+# 지속 과부하에서 BackpressureQueue 가 정책별로 지연 상한을 지키는지.
+# - 캡처 쪽은 실시간으로 발화(SttJob)를 넣고, STT 쪽은 발화 길이 × slowdown 만큼 걸려 꺼낸다
+# - 큐에 쌓인 오디오 길이 / 대기 시간의 최댓값이 latency_budget_sec 근처에서 멈추는지 본다
+#   (상한을 넘으면 0 이 아닌 종료 코드)
+#
+# 사용 예:
+#   python bench_backpressure.py
+#   python bench_backpressure.py --policies merge --slowdown 3 --seconds 20
+
+import argparse
+import sys
+import threading
+import time
+
+import numpy as np
+
+from core.backpressure import POLICIES, BackpressureQueue, merge_stt_jobs
+from core.events import SttJob
+
+SAMPLE_RATE = 16000
+
+
+def run(policy: str, seconds: float, utter_sec: float, slowdown: float, budget: float, maxsize: int) -> dict:
+    q: "BackpressureQueue[SttJob]" = BackpressureQueue(
+        policy=policy,
+        latency_budget_sec=budget,
+        maxsize=maxsize,
+        merge_fn=lambda jobs: merge_stt_jobs(jobs, max_sec=4 * utter_sec),
+    )
+    done = threading.Event()
+    peak = {"queued_sec": 0.0, "wait_sec": 0.0}
+
+    def consumer():
+        while True:
+            job = q.get(timeout=0.1)
+            if job is None:
+                if done.is_set():
+                    return
+                continue
+            peak["wait_sec"] = max(peak["wait_sec"], time.monotonic() - job.created_at)
+            time.sleep(job.duration_sec * slowdown)
+
+    th = threading.Thread(target=consumer, daemon=True)
+    th.start()
+
+    audio = np.zeros(int(utter_sec * SAMPLE_RATE), dtype=np.float32)
+    started = time.monotonic()
+    cid = 0
+    while time.monotonic() - started < seconds:
+        cid += 1
+        q.put(SttJob("final", cid, audio, SAMPLE_RATE))
+        peak["queued_sec"] = max(peak["queued_sec"], sum(j.duration_sec for j in list(q._items)))
+        time.sleep(utter_sec)
+
+    done.set()
+    q.close()
+    th.join(timeout=seconds * slowdown)
+    return {**peak, **q.stats()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="backpressure queue bound under sustained overload")
+    parser.add_argument("--policies", nargs="+", default=list(POLICIES))
+    parser.add_argument("--seconds", type=float, default=10.0, help="입력을 넣는 시간")
+    parser.add_argument("--utter", type=float, default=0.5, help="발화 하나 길이 (초)")
+    parser.add_argument("--slowdown", type=float, default=2.0, help="STT 처리 시간 / 오디오 길이")
+    parser.add_argument("--budget", type=float, default=2.0)
+    parser.add_argument("--maxsize", type=int, default=20)
+    args = parser.parse_args()
+
+    # 한 번 꺼낸 작업을 처리하는 동안 더 밀릴 수 있는 만큼 (가장 긴 작업 하나)
+    limit = args.budget + 4 * args.utter * args.slowdown + args.utter
+
+    print(f"\n입력 {args.seconds:.0f}s, 처리 {args.slowdown:.1f}x 느림, 예산 {args.budget:.1f}s (허용 대기 {limit:.1f}s)")
+    print(f"{'policy':>13} {'max wait':>9} {'max queued':>11} {'dropped':>8} {'merged':>7}")
+
+    ok = True
+    for policy in args.policies:
+        r = run(policy, args.seconds, args.utter, args.slowdown, args.budget, args.maxsize)
+        bounded = r["wait_sec"] <= limit
+        ok &= bounded
+        print(
+            f"{policy:>13} {r['wait_sec']:>8.2f}s {r['queued_sec']:>10.2f}s "
+            f"{r['dropped_audio_sec']:>7.1f}s {r['merged_items']:>7} {'' if bounded else '← 상한 초과'}"
+        )
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
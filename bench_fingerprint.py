@@ -0,0 +1,94 @@
+# bench_fingerprint.py
+#
+# 브금/영상 모드 지문 캐시(stt.transcript_cache)가 반복 오디오에서 STT 를 얼마나 건너뛰는지.
+# - 트랙(음성 파일 또는 합성 음악)을 loops 번 이어 붙이고, 사이에 다른 오디오를 끼워
+#   슬라이딩 윈도우로 흘려 보낸다 (STT 는 부르지 않고 빈 결과를 기록)
+# - 윈도우당 지문 계산 + 조회 시간과 적중률, 끼워 넣은 구간에서 잘못 맞은 수를 잰다
+#
+# 사용 예:
+#   python bench_fingerprint.py
+#   python bench_fingerprint.py --audio bgm.wav --loops 3 --hop 1.5 --overlap 3.5
+
+import argparse
+import time
+
+import numpy as np
+
+from core.config import FingerprintConfig
+from stt.engine import Transcript
+from stt.transcript_cache import TranscriptCache
+
+SAMPLE_RATE = 16000
+
+
+def synth_track(seconds: float, seed: int) -> np.ndarray:
+    # 0.25초마다 화음이 바뀌는 합성 음악
+    rng = np.random.default_rng(seed)
+    note = int(0.25 * SAMPLE_RATE)
+    t = np.arange(note) / SAMPLE_RATE
+    out = np.zeros(int(seconds * SAMPLE_RATE) // note * note, dtype=np.float32)
+    for i in range(0, len(out), note):
+        keys = rng.choice(np.arange(48, 84), 3)
+        chord = sum(np.sin(2 * np.pi * 440 * 2 ** ((k - 69) / 12) * t) for k in keys)
+        out[i:i + note] = 0.1 * chord * np.exp(-3 * t)
+    return out
+
+
+def load_track(path: str | None, seconds: float, seed: int) -> np.ndarray:
+    if path:
+        from faster_whisper import decode_audio
+        return decode_audio(path, sampling_rate=SAMPLE_RATE)[: int(seconds * SAMPLE_RATE)].astype(np.float32)
+    return synth_track(seconds, seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="audio fingerprint cache hit rate / cost")
+    parser.add_argument("--audio", default=None, help="반복할 트랙 (없으면 합성 음악)")
+    parser.add_argument("--seconds", type=float, default=30.0, help="트랙 길이")
+    parser.add_argument("--loops", type=int, default=3)
+    parser.add_argument("--hop", type=float, default=1.5)
+    parser.add_argument("--overlap", type=float, default=3.5)
+    args = parser.parse_args()
+
+    track = load_track(args.audio, args.seconds, seed=1)
+    other = synth_track(args.seconds, seed=2)   # 한 번만 나오는 오디오 (맞으면 안 됨)
+    parts = [track, other] + [track] * (args.loops - 1)
+    stream = np.concatenate(parts)
+    stream += 0.003 * np.random.default_rng(0).standard_normal(len(stream)).astype(np.float32)
+
+    other_start = len(track) / SAMPLE_RATE
+    other_end = other_start + len(other) / SAMPLE_RATE
+
+    cache = TranscriptCache(FingerprintConfig(), SAMPLE_RATE)
+    window = args.hop + args.overlap
+    end = window
+    windows, false_hits, cost = 0, 0, []
+
+    while end <= len(stream) / SAMPLE_RATE:
+        start = end - window
+        audio = stream[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)]
+
+        t0 = time.perf_counter()
+        fp = cache.fingerprint(audio, start)
+        hit = cache.lookup(fp, start, end, args.hop)
+        cost.append(time.perf_counter() - t0)
+
+        if hit is not None:
+            false_hits += other_start < end - args.hop and end <= other_end
+            cache.record(fp, start, end, hit)
+        else:
+            cache.record(fp, start, end, Transcript(text=""), 0.0)
+
+        windows += 1
+        end += args.hop
+
+    stats = cache.stats()
+    repeated = (args.loops - 1) * args.seconds / args.hop
+    print(f"\n트랙 {args.seconds:.0f}s × {args.loops}, 윈도우 {window:.1f}s (hop {args.hop:.1f}s), 윈도우 {windows}개")
+    print(f"- 적중: {stats['hits']} (반복 구간 윈도우 약 {repeated:.0f}개), 잘못 맞음: {false_hits}")
+    print(f"- 지문 + 조회: 평균 {np.mean(cost) * 1000:.2f} ms, p99 {np.percentile(cost, 99) * 1000:.2f} ms / 윈도우")
+    print(f"- 색인 해시 수: {stats['indexed_hashes']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# bench_resample.py
+#
+# 캡처 콜백에서 도는 다운믹스 + 스트리밍 리샘플(→ 16kHz 모노)의 CPU 비용.
+# - 입력 rate (48000 / 44100) × 채널 수 × 콜백 블록 길이별로
+#   오디오 1초당 CPU 시간(ms)과 블록 하나당 처리 시간(µs)을 잰다
+# - 블록을 나눠 넣은 결과가 한 번에 넣은 결과와 같은지도 확인한다 (필터 상태 유지)
+#
+# 사용 예:
+#   python bench_resample.py
+#   python bench_resample.py --rates 48000 --blocks 10 20 --seconds 30
+
+import argparse
+import time
+
+import numpy as np
+
+from audio.resample import StreamingResampler, downmix
+
+TARGET_RATE = 16000
+
+
+def make_input(rate: int, channels: int, seconds: float) -> np.ndarray:
+    # 말소리 대역 톤 + 잡음 (내용은 비용에 영향 없음)
+    t = np.arange(int(rate * seconds)) / rate
+    mono = 0.2 * np.sin(2 * np.pi * 220 * t) * (1 + 0.5 * np.sin(2 * np.pi * 3 * t))
+    mono += 0.01 * np.random.default_rng(0).standard_normal(len(t))
+    return np.repeat(mono[:, None], channels, axis=1).astype(np.float32)
+
+
+def run(rate: int, channels: int, block_ms: float, seconds: float) -> tuple:
+    audio = make_input(rate, channels, seconds)
+    block = max(1, int(rate * block_ms / 1000))
+    resampler = StreamingResampler(rate, TARGET_RATE)
+
+    outputs = []
+    started = time.process_time()
+    for i in range(0, len(audio), block):
+        outputs.append(resampler.process(downmix(audio[i:i + block])))
+    cpu = time.process_time() - started
+
+    streamed = np.concatenate(outputs)
+    whole = StreamingResampler(rate, TARGET_RATE).process(downmix(audio))
+    max_diff = float(np.abs(streamed - whole).max()) if len(whole) else 0.0
+
+    n_blocks = -(-len(audio) // block)
+    return cpu / seconds * 1000, cpu / n_blocks * 1e6, resampler.taps, max_diff
+
+
+def main():
+    parser = argparse.ArgumentParser(description="downmix + streaming resampler CPU cost")
+    parser.add_argument("--rates", type=int, nargs="+", default=[48000, 44100])
+    parser.add_argument("--channels", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--blocks", type=float, nargs="+", default=[10.0, 20.0, 40.0], help="콜백 블록 길이 (ms)")
+    parser.add_argument("--seconds", type=float, default=20.0, help="측정할 오디오 길이")
+    args = parser.parse_args()
+
+    print(f"\n→ {TARGET_RATE}Hz mono, 오디오 {args.seconds:.0f}s 기준")
+    print(f"{'rate':>6} {'ch':>3} {'block':>7} {'taps':>5} {'CPU ms/s':>9} {'µs/block':>9} {'max diff':>9}")
+
+    for rate in args.rates:
+        for channels in args.channels:
+            for block_ms in args.blocks:
+                cpu_ms, per_block_us, taps, diff = run(rate, channels, block_ms, args.seconds)
+                print(
+                    f"{rate:>6} {channels:>3} {block_ms:>5.0f}ms {taps:>5} "
+                    f"{cpu_ms:>9.3f} {per_block_us:>9.1f} {diff:>9.1e}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# bench_stt_batch.py
+#
+# 동시 발화 스트림 수(1/4/8)에 따른 STT 처리량 비교.
+# - 각 스트림은 발화 하나를 보내고 결과를 받으면 다음 발화를 보낸다 (말하는 사람 한 명처럼)
+# - 순차 처리(batch_max_size=1)와 배치 스케줄러를 같은 조건에서 돌린다
+#
+# 사용 예:
+#   python bench_stt_batch.py --audio sample_ko.wav --model small --device cuda
+#   python bench_stt_batch.py --streams 1 4 8 --utterances 6
+
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from core.config import STTConfig
+from stt.batching import BatchingScheduler
+from stt.engine import create_stt_engine
+
+SAMPLE_RATE = 16000
+
+
+def load_utterance(path: str | None, seconds: float) -> np.ndarray:
+    if path:
+        from faster_whisper import decode_audio
+        audio = decode_audio(path, sampling_rate=SAMPLE_RATE)
+        return audio[: int(seconds * SAMPLE_RATE)].astype(np.float32)
+
+    # 음성 파일이 없으면 말소리 비슷한 변조 톤으로 대체 (처리량 비교용)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    tone = 0.1 * np.sin(2 * np.pi * 180 * t) * (1 + 0.5 * np.sin(2 * np.pi * 4 * t))
+    return tone.astype(np.float32)
+
+
+def run_streams(engine, utterance: np.ndarray, streams: int, per_stream: int, batch_size: int) -> float:
+    """streams 개 스트림이 per_stream 개씩 발화를 보낼 때 전체 소요 시간."""
+    scheduler = BatchingScheduler(engine, max_batch_size=batch_size, max_wait_ms=30.0).start()
+
+    def speaker():
+        for _ in range(per_stream):
+            done = threading.Event()
+            scheduler.submit(utterance, SAMPLE_RATE, lambda text, started_at: done.set())
+            done.wait()
+
+    threads = [threading.Thread(target=speaker) for _ in range(streams)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    scheduler.stop()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="batched STT throughput benchmark")
+    parser.add_argument("--audio", default=None, help="발화로 쓸 음성 파일 (없으면 합성 톤)")
+    parser.add_argument("--seconds", type=float, default=4.0, help="발화 길이")
+    parser.add_argument("--streams", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--utterances", type=int, default=4, help="스트림당 발화 수")
+    parser.add_argument("--model", default="small")
+    parser.add_argument("--device", default="auto")
+    parser.add_argument("--compute-type", default="auto")
+    parser.add_argument("--language", default="ko")
+    args = parser.parse_args()
+
+    cfg = STTConfig(
+        model_name=args.model,
+        device=args.device,
+        compute_type=args.compute_type,
+        speech_language=args.language,
+    )
+    engine = create_stt_engine(cfg)
+    utterance = load_utterance(args.audio, args.seconds)
+    utter_sec = len(utterance) / SAMPLE_RATE
+
+    # 워밍업
+    engine.transcribe_batch([utterance, utterance], SAMPLE_RATE)
+
+    print(f"\n발화 길이 {utter_sec:.1f}s, 스트림당 {args.utterances}개")
+    print(f"{'streams':>8} {'mode':>10} {'wall(s)':>9} {'audio s/s':>10} {'speedup':>8}")
+
+    for n in args.streams:
+        audio_total = n * args.utterances * utter_sec
+
+        seq = run_streams(engine, utterance, n, args.utterances, batch_size=1)
+        bat = run_streams(engine, utterance, n, args.utterances, batch_size=max(n, 1))
+
+        print(f"{n:>8} {'sequential':>10} {seq:>9.2f} {audio_total / seq:>10.1f} {'1.00x':>8}")
+        print(f"{n:>8} {'batched':>10} {bat:>9.2f} {audio_total / bat:>10.1f} {seq / bat:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
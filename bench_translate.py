@@ -0,0 +1,146 @@
+# bench_translate.py
+#
+# 번역 백엔드 비교: transformers pipeline vs CTranslate2(int8)
+# - 문장당 지연 (p50 / 평균 / 최대)
+# - 모델을 올린 뒤 프로세스 메모리(RSS)
+# - 같은 문장을 반복했을 때 결과 캐시 효과
+#
+# 백엔드마다 별도 프로세스로 돌려 메모리가 섞이지 않게 한다.
+#
+# 사용 예:
+#   python bench_translate.py --src ko --tgt en
+#   python bench_translate.py --backends ctranslate2 --repeat 5
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+# 자막 로그에서 자주 보이는 길이/형태의 문장들
+SENTENCES = {
+    "ko": [
+        "고맙습니다.",
+        "좋습니다.",
+        "잠깐만 기다려 주세요.",
+        "오늘 회의는 여기까지 하겠습니다.",
+        "다음 주 화요일까지 보고서를 보내 주실 수 있나요?",
+        "지금 화면 공유가 잘 보이시나요?",
+        "그 부분은 제가 다시 확인해 보고 말씀드리겠습니다.",
+        "게임 끝나고 같이 저녁 먹으러 갈래요?",
+    ],
+    "en": [
+        "Thank you.",
+        "Sounds good.",
+        "Please wait a moment.",
+        "That's all for today's meeting.",
+        "Could you send me the report by next Tuesday?",
+        "Can you see my screen share right now?",
+        "Let me double-check that part and get back to you.",
+        "Do you want to grab dinner together after the game?",
+    ],
+}
+
+
+def rss_mb() -> float:
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        import resource
+        # Linux 는 KB 단위 (최대 RSS)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_child(args) -> None:
+    """백엔드 하나를 측정하고 결과를 JSON 한 줄로 출력."""
+    from core.config import TranslateConfig
+    from core import translate
+
+    sentences = SENTENCES.get(args.src, SENTENCES["en"])
+    # 첫 측정에서는 캐시를 꺼서 모델 자체의 지연을 잰다
+    cfg = TranslateConfig(backend=args.backend, cache_size=0)
+
+    t0 = time.perf_counter()
+    translate.translate_text("warm up", args.src, args.tgt, cfg=cfg)
+    load_sec = time.perf_counter() - t0
+
+    latencies = []
+    for _ in range(args.repeat):
+        for s in sentences:
+            t = time.perf_counter()
+            translate.translate_text(s, args.src, args.tgt, cfg=cfg)
+            latencies.append(time.perf_counter() - t)
+
+    # 같은 문장 반복 시 캐시 적용 (한 번 채운 뒤 측정)
+    cached_cfg = TranslateConfig(backend=args.backend)
+    for s in sentences:
+        translate.translate_text(s, args.src, args.tgt, cfg=cached_cfg)
+    cached = []
+    for _ in range(args.repeat):
+        for s in sentences:
+            t = time.perf_counter()
+            translate.translate_text(s, args.src, args.tgt, cfg=cached_cfg)
+            cached.append(time.perf_counter() - t)
+
+    lat = np.array(latencies) * 1000
+    print(json.dumps({
+        "backend": args.backend,
+        "load_sec": load_sec,
+        "p50_ms": float(np.percentile(lat, 50)),
+        "mean_ms": float(lat.mean()),
+        "max_ms": float(lat.max()),
+        "cached_mean_ms": float(np.mean(cached) * 1000),
+        "rss_mb": rss_mb(),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="translation backend benchmark")
+    parser.add_argument("--src", default="ko")
+    parser.add_argument("--tgt", default="en")
+    parser.add_argument("--backends", nargs="+", default=["transformers", "ctranslate2"])
+    parser.add_argument("--repeat", type=int, default=3, help="문장 세트 반복 횟수")
+    parser.add_argument("--backend", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend:
+        run_child(args)
+        return
+
+    print(f"\n{args.src} → {args.tgt}, 문장 {len(SENTENCES.get(args.src, SENTENCES['en']))}개 × {args.repeat}")
+    print(
+        f"{'backend':>13} {'load(s)':>8} {'p50(ms)':>8} {'mean(ms)':>9} "
+        f"{'max(ms)':>8} {'cached(ms)':>10} {'RSS(MB)':>8}"
+    )
+
+    for backend in args.backends:
+        proc = subprocess.run(
+            [
+                sys.executable, os.path.abspath(__file__),
+                "--backend", backend,
+                "--src", args.src,
+                "--tgt", args.tgt,
+                "--repeat", str(args.repeat),
+            ],
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+        )
+        lines = [l for l in proc.stdout.splitlines() if l.startswith("{")]
+        if proc.returncode != 0 or not lines:
+            print(f"{backend:>13} 실패:\n{proc.stderr.strip()[-800:]}")
+            continue
+
+        r = json.loads(lines[-1])
+        print(
+            f"{backend:>13} {r['load_sec']:>8.1f} {r['p50_ms']:>8.1f} {r['mean_ms']:>9.1f} "
+            f"{r['max_ms']:>8.1f} {r['cached_mean_ms']:>10.3f} {r['rss_mb']:>8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+# core/async_session.py
+
+import asyncio
+import threading
+from concurrent.futures import Executor
+from dataclasses import replace
+from typing import Optional, Sequence
+
+from core.config import AppConfig, SourceConfig
+from core.events import CaptionEvent
+from core.streaming import MultiSourcePipeline, run_stream_pipeline_fixed, run_stream_pipeline_vad
+from stt.engine import create_stt_engine
+from stt.governor import attach_governor
+
+# 세션이 끝났다는 표시 (자막 큐의 마지막 항목)
+_CLOSED = object()
+
+
+async def load_stt_engine(app_cfg: AppConfig, executor: Optional[Executor] = None):
+    """
+    모델 로드 + 워밍업을 executor 에서 한다 (이벤트 루프를 막지 않음).
+    돌려받은 엔진을 여러 CaptionSession 에 넘기면 모델 하나를 같이 쓴다.
+    (말하는 언어 / Whisper 번역 여부 / 언어 고정은 세션마다 각자의 app_cfg.stt 를 따른다)
+    """
+
+    def load():
+        engine = create_stt_engine(app_cfg.stt)
+        engine.warmup(app_cfg.audio.sample_rate)
+        attach_governor(engine, app_cfg.governor)
+        return engine
+
+    return await asyncio.get_running_loop().run_in_executor(executor, load)
+
+
+class CaptionSession:
+    """
+    asyncio 용 자막 세션. 디스코드 봇처럼 이벤트 루프 하나에 세션을 여러 개 띄울 때 쓴다.
+
+        engine = await load_stt_engine(cfg)
+        async with CaptionSession(cfg, speakers=["alice", "bob"], stt_engine=engine,
+                                  pcm_rate=48000, pcm_channels=2) as session:
+            session.push("alice", pcm)        # 사용자별 PCM (int16 bytes 등, 막히지 않음)
+            async for event in session:       # CaptionEvent (partial / final / translation)
+                ...
+
+    - speakers 를 주면 push 소스 다중 화자 파이프라인 (add_speaker / remove_speaker 로 바꿀 수 있음),
+      없으면 app_cfg.sources 또는 mode("dialog" / "bgm") 의 장치 캡처
+    - pcm_rate / pcm_channels: 봇이 넣는 PCM 형식 (다르면 소스마다 다운믹스 + 리샘플)
+    - 시작 / 종료(남은 오디오 drain) 처럼 막히는 일은 executor 에서, 캡처·VAD·STT·번역은
+      파이프라인 스레드에서 돌고, 자막만 call_soon_threadsafe 로 루프에 넘어온다
+      (장치 캡처 모드는 세션 내내 막히는 runner 를 세션 전용 스레드에서 돌려 executor 를 잡아두지 않는다)
+    - remove_speaker 뒤에 들어온 push 처럼 없는 화자의 PCM 은 경고 한 번 후 버린다
+    - 소비가 느려 max_pending 을 넘으면 오래된 자막부터 버린다 (dropped)
+    """
+
+    def __init__(
+        self,
+        app_cfg: AppConfig,
+        mode: str = "dialog",
+        speakers: Optional[Sequence[str]] = None,
+        stt_engine=None,
+        partials: bool = True,
+        max_pending: int = 256,
+        executor: Optional[Executor] = None,
+        pcm_rate: int = 0,
+        pcm_channels: int = 1,
+    ):
+        self.app_cfg = app_cfg
+        self.mode = mode
+        self.stt_engine = stt_engine
+        self.partials = partials
+        self.max_pending = max_pending
+        self.executor = executor
+        self.pcm_rate = pcm_rate
+        self.pcm_channels = pcm_channels
+        self.dropped = 0
+
+        self._speakers = list(speakers) if speakers is not None else None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._pipeline: Optional[MultiSourcePipeline] = None
+        self._runner: Optional[asyncio.Future] = None
+        self._stop_event = threading.Event()
+        self._closed = False
+        self._unknown_speakers: set = set()   # 경고를 이미 찍은 없는 화자
+
+    # ---------------- 수명 ---------------- #
+    async def __aenter__(self) -> "CaptionSession":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+
+        if self.stt_engine is None:
+            self.stt_engine = await load_stt_engine(self.app_cfg, self.executor)
+
+        if self._speakers is not None or self.app_cfg.sources:
+            cfg = self.app_cfg
+            if self._speakers is not None:
+                cfg = replace(cfg, sources=[self._speaker_source(name) for name in self._speakers])
+            self._pipeline = MultiSourcePipeline(cfg, self._on_caption, stt_engine=self.stt_engine)
+            await self._loop.run_in_executor(self.executor, self._pipeline.start)
+            return
+
+        # 장치 캡처: 블로킹 파이프라인을 세션 전용 스레드에서 돌린다
+        # (공유 executor 스레드를 세션 내내 차지하면 다른 세션의 시작 / 종료가 밀림)
+        runner = run_stream_pipeline_vad if self.mode == "dialog" else run_stream_pipeline_fixed
+        self._runner = self._loop.create_future()
+        threading.Thread(
+            target=self._run_device, args=(runner,), name=f"caption-session-{self.mode}", daemon=True
+        ).start()
+
+    def _run_device(self, runner) -> None:
+        # 세션 전용 스레드
+        error = None
+        try:
+            runner(self.app_cfg, self._on_caption, self.stt_engine, self._stop_event)
+        except Exception as e:
+            error = e
+        try:
+            self._loop.call_soon_threadsafe(self._finish_runner, error)
+        except RuntimeError:
+            pass   # 루프가 이미 닫힘
+
+    def _finish_runner(self, error: Optional[BaseException]) -> None:
+        # 이벤트 루프 스레드
+        if not self._runner.done():
+            if error is None:
+                self._runner.set_result(None)
+            else:
+                self._runner.set_exception(error)
+        self._deliver(_CLOSED)
+
+    async def aclose(self) -> None:
+        """캡처를 멈추고 이미 들어온 오디오의 자막까지 내보낸 뒤 끝낸다."""
+        if self._closed or self._loop is None:
+            return
+        self._closed = True
+
+        if self._pipeline is not None:
+            await self._loop.run_in_executor(self.executor, self._pipeline.stop)
+            self._deliver(_CLOSED)
+        elif self._runner is not None:
+            self._stop_event.set()
+            try:
+                await self._runner
+            except Exception as e:
+                print(f"[SESSION][ERROR] 파이프라인 종료 중 오류: {e}")
+
+    # ---------------- 입력 (push 소스) ---------------- #
+    def push(self, speaker: str, pcm) -> None:
+        """
+        speakers 모드에서 화자 하나의 PCM 을 넣는다 (링버퍼에 쓰기만 하므로 루프에서 바로 불러도 됨).
+        없는 화자(remove_speaker 뒤 등)면 버린다 (화자마다 경고 한 번).
+        """
+        try:
+            self._require_pipeline().push(speaker, pcm)
+        except KeyError:
+            if speaker not in self._unknown_speakers:
+                self._unknown_speakers.add(speaker)
+                print(f"[SESSION][WARN] 없는 화자 '{speaker}' 의 PCM 을 버립니다")
+
+    def add_speaker(self, speaker: str) -> None:
+        self._require_pipeline().add_source(self._speaker_source(speaker))
+        self._unknown_speakers.discard(speaker)
+
+    def remove_speaker(self, speaker: str) -> None:
+        self._require_pipeline().remove_source(speaker)
+
+    def _speaker_source(self, speaker: str) -> SourceConfig:
+        return SourceConfig(name=speaker, kind="push", channels=self.pcm_channels, sample_rate=self.pcm_rate)
+
+    def _require_pipeline(self) -> MultiSourcePipeline:
+        if self._pipeline is None:
+            raise RuntimeError("push 입력은 speakers 로 시작한 세션에서만 쓸 수 있습니다.")
+        return self._pipeline
+
+    # ---------------- 출력 (async iterator) ---------------- #
+    def __aiter__(self) -> "CaptionSession":
+        return self
+
+    async def __anext__(self) -> CaptionEvent:
+        if self._queue is None:
+            raise StopAsyncIteration
+
+        item = await self._queue.get()
+        if item is _CLOSED:
+            self._queue.put_nowait(_CLOSED)   # 다른 소비자도 끝나도록 남겨 둔다
+            raise StopAsyncIteration
+        return item
+
+    def _on_caption(self, event: CaptionEvent) -> None:
+        # 파이프라인 sink 스레드에서 불린다
+        if event.kind == "partial" and not self.partials:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._deliver, event)
+        except RuntimeError:
+            pass   # 루프가 이미 닫힘
+
+    def _deliver(self, item) -> None:
+        # 이벤트 루프 스레드
+        if item is not _CLOSED and self._queue.qsize() >= self.max_pending:
+            dropped = self._queue.get_nowait()
+            if dropped is _CLOSED:
+                self._queue.put_nowait(dropped)
+                return
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 100 == 0:
+                print(f"[SESSION][WARN] 자막 소비가 밀려 오래된 자막을 버림 (dropped_total={self.dropped})")
+        self._queue.put_nowait(item)
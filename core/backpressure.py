@@ -0,0 +1,210 @@
+# core/backpressure.py
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Generic, List, Optional, TypeVar
+
+import numpy as np
+
+from core.debug_config import DEBUG
+from core.events import SttJob
+
+T = TypeVar("T")
+
+POLICIES = ("drop_oldest", "merge", "skip_to_live")
+
+
+class BackpressureQueue(Generic[T]):
+    """
+    캡처 → STT 사이의 지연 예산(latency budget) 기반 큐.
+
+    큐가 가득 차거나, 가장 오래된 작업이 latency_budget_sec 보다 오래 기다리면
+    설정된 정책으로 밀린 오디오를 정리한다. put() 은 절대 막히지 않는다.
+
+    - "drop_oldest" : 예산을 넘긴 오래된 발화/청크를 통째로 버림 (최신 하나는 남김)
+    - "merge"       : 밀린 작업을 merge_fn 으로 합쳐 디코딩 횟수를 줄임. 합친 뒤에도 예산 / maxsize 를
+                      넘으면 오래된 것부터 버린다 (지연 상한 유지)
+    - "skip_to_live": 가장 최근 작업 하나만 남기고 전부 버림
+
+    close() 뒤에는 남은 작업을 다 꺼내고 나면 get() 이 None 을 돌려준다 (core.runtime 의 inbox 로 쓸 때).
+
+    kind == "partial" 인 작업은 중간 자막 스냅샷이라 새 partial 이 오면 예전 것을 버리고,
+    밀리기 시작하면 가장 먼저 버린다. (버려진 오디오 통계에는 넣지 않는다)
+
+    작업 객체는 kind, created_at(time.monotonic), duration_sec 속성을 가져야 한다.
+    """
+
+    def __init__(
+        self,
+        policy: str = "drop_oldest",
+        latency_budget_sec: float = 5.0,
+        maxsize: int = 20,
+        merge_fn: Optional[Callable[[List[T]], List[T]]] = None,
+        on_drop: Optional[Callable[[T], None]] = None,
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"지원하지 않는 backpressure 정책: {policy} (가능: {', '.join(POLICIES)})")
+        if policy == "merge" and merge_fn is None:
+            raise ValueError("merge 정책에는 merge_fn 이 필요합니다.")
+
+        self.policy = policy
+        self.latency_budget_sec = latency_budget_sec
+        self.maxsize = maxsize
+        self.merge_fn = merge_fn
+        self.on_drop = on_drop
+
+        self._items: Deque[T] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+        # 통계
+        self.dropped_items = 0
+        self.dropped_audio_sec = 0.0
+        self.merged_items = 0
+        self.max_wait_sec = 0.0
+
+    # ---------------- public ---------------- #
+    def put(self, item: T) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            if item.kind == "partial":
+                self._drop_where(lambda it: it.kind == "partial")
+
+            self._items.append(item)
+            if len(self._items) > self.maxsize:
+                self._relieve(reason="full")
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[T]:
+        with self._cond:
+            self._cond.wait_for(lambda: self._items or self._closed, timeout=timeout)
+            if not self._items:
+                return None
+
+            if self._oldest_age() > self.latency_budget_sec:
+                self._relieve(reason="budget")
+
+            item = self._items.popleft()
+            self.max_wait_sec = max(self.max_wait_sec, time.monotonic() - item.created_at)
+            return item
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def stats(self) -> dict:
+        return {
+            "backpressure_policy": self.policy,
+            "dropped_items": self.dropped_items,
+            "dropped_audio_sec": round(self.dropped_audio_sec, 3),
+            "merged_items": self.merged_items,
+            "max_queue_wait_sec": round(self.max_wait_sec, 3),
+            "queue_depth": len(self._items),
+        }
+
+    # ---------------- 내부 (self._cond 잡은 상태) ---------------- #
+    def _oldest_age(self) -> float:
+        return time.monotonic() - self._items[0].created_at
+
+    def _drop(self, item: T, count_audio: bool = True) -> None:
+        if count_audio:
+            self.dropped_items += 1
+            self.dropped_audio_sec += item.duration_sec
+        if self.on_drop is not None:
+            self.on_drop(item)
+
+    def _drop_where(self, pred: Callable[[T], bool]) -> None:
+        kept: Deque[T] = deque()
+        for it in self._items:
+            if pred(it):
+                self._drop(it, count_audio=False)
+            else:
+                kept.append(it)
+        self._items = kept
+
+    def _relieve(self, reason: str) -> None:
+        # 밀리기 시작하면 중간 자막 스냅샷부터 버린다 (마지막 하나는 남겨 둠)
+        newest = self._items[-1]
+        self._drop_where(lambda it: it.kind == "partial" and it is not newest)
+
+        before = len(self._items)
+        dropped_before = self.dropped_audio_sec
+
+        if self.policy == "skip_to_live":
+            while len(self._items) > 1:
+                self._drop(self._items.popleft())
+
+        elif self.policy == "drop_oldest":
+            while len(self._items) > 1 and (
+                len(self._items) > self.maxsize or self._oldest_age() > self.latency_budget_sec
+            ):
+                self._drop(self._items.popleft())
+
+        elif self.policy == "merge":
+            finals = [it for it in self._items if it.kind != "partial"]
+            if len(finals) > 1:
+                merged = self.merge_fn(finals)
+                self.merged_items += len(finals) - len(merged)
+                partials = [it for it in self._items if it.kind == "partial"]
+                self._items = deque(merged + partials)
+
+            # 합쳐도 밀리면 (지속 과부하) drop_oldest 처럼 오래된 것부터 버려 지연 상한을 지킨다
+            while len(self._items) > 1 and (
+                len(self._items) > self.maxsize or self._oldest_age() > self.latency_budget_sec
+            ):
+                self._drop(self._items.popleft())
+
+        if DEBUG or self.dropped_audio_sec > dropped_before:
+            print(
+                f"[WARN] STT 지연 ({reason}): policy={self.policy}, "
+                f"queue {before}→{len(self._items)}, "
+                f"dropped_total={self.dropped_audio_sec:.1f}s"
+            )
+
+
+def merge_stt_jobs(jobs: List[SttJob], max_sec: float, gap_sec: float = 0.3) -> List[SttJob]:
+    """
+    대화 모드 merge 정책용: 밀린 확정 발화들을 짧은 무음을 사이에 두고 이어 붙인다.
+    - 합친 길이가 max_sec 를 넘지 않도록 앞에서부터 묶음을 나눈다
+    - 합쳐진 발화의 caption_id 는 merged_ids 로 남겨, 떠 있던 중간 자막을 지울 수 있게 한다
+    """
+    groups: List[List[SttJob]] = []
+    for job in jobs:
+        if groups:
+            group = groups[-1]
+            total = sum(j.duration_sec for j in group) + gap_sec * len(group) + job.duration_sec
+            if total <= max_sec and job.sample_rate == group[0].sample_rate:
+                group.append(job)
+                continue
+        groups.append([job])
+
+    merged = []
+    for group in groups:
+        if len(group) == 1:
+            merged.append(group[0])
+            continue
+
+        first = group[0]
+        gap = np.zeros(int(first.sample_rate * gap_sec), dtype=np.float32)
+        parts = []
+        for j in group:
+            parts.extend([j.audio, gap])
+
+        ids = [i for j in group[1:] for i in [j.caption_id] + j.merged_ids]
+        merged.append(SttJob(
+            "final",
+            first.caption_id,
+            np.concatenate(parts[:-1]),
+            first.sample_rate,
+            audio_start=first.audio_start,
+            created_at=first.created_at,
+            merged_ids=first.merged_ids + ids,
+        ))
+
+    return merged
@@ -0,0 +1,203 @@
+# core/caption_sink.py
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import asdict
+from typing import Deque, Dict, List, Optional, Tuple
+
+from core.config import CaptionLogConfig
+from core.events import CaptionEvent
+
+# JSONL 한 줄에 남기는 자막 필드 (CaptionEvent / IPC 자막 메시지 공통)
+RECORD_FIELDS = (
+    "caption_id", "kind", "text", "original", "speaker", "language", "audio_start", "audio_end",
+)
+
+
+class CaptionSink:
+    """
+    확정 자막을 JSONL 로 디스크에 이어 쓰는 백그라운드 기록기.
+
+    - write() 는 메모리 큐에 넣기만 하고 바로 돌아온다 (STT / GUI 스레드를 막지 않음)
+    - 기록 스레드가 flush_interval_sec 마다 모인 줄을 한 번에 쓰고, fsync_interval_sec 마다 fsync
+      → 프로그램이 죽어도 마지막 몇 초를 빼고는 남는다
+    - 큐는 max_pending 줄까지만 (디스크가 멈춰도 메모리가 계속 늘지 않음, 넘치면 오래된 것부터 버림)
+    - 종료 시 같은 이름으로 .srt / .vtt 를 만든다 (오디오 타임스탬프 기준)
+
+    partial 은 기록하지 않는다. translation 은 같은 caption_id 의 final 을 대체한다.
+    """
+
+    def __init__(self, path: str, cfg: Optional[CaptionLogConfig] = None):
+        self.cfg = cfg or CaptionLogConfig()
+        self.path = path
+
+        self._pending: Deque[str] = deque()
+        self._cond = threading.Condition()
+        self._closing = False
+        self.dropped = 0
+        self.written = 0
+
+        # 세션(캡처 시작)마다 오디오 시간이 0 부터 다시 시작하므로, 세션 시작 벽시계를 같이 남긴다
+        self._session = 0
+        self._session_started = time.time()
+
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._writer, name="caption-sink", daemon=True)
+        self._thread.start()
+        print(f"[LOG] 자막 기록: {path}")
+
+    # ---------------- public ---------------- #
+    def new_session(self) -> None:
+        """캡처를 새로 시작할 때 호출 (오디오 타임스탬프 기준점이 바뀜)."""
+        self._session += 1
+        self._session_started = time.time()
+
+    def write(self, event: CaptionEvent) -> None:
+        self.write_record(asdict(event))
+
+    def write_record(self, msg: dict) -> None:
+        """CaptionEvent 를 dict 로 바꾼 것 또는 IPC 로 받은 자막 메시지."""
+        if msg.get("kind") == "partial":
+            return
+
+        record = {key: msg.get(key) for key in RECORD_FIELDS}
+        record["ts"] = time.time()
+        record["session"] = self._session
+        record["session_started"] = self._session_started
+        line = json.dumps(record, ensure_ascii=False)
+
+        with self._cond:
+            self._pending.append(line)
+            if len(self._pending) > self.cfg.max_pending:
+                self._pending.popleft()
+                self.dropped += 1
+                if self.dropped == 1 or self.dropped % 100 == 0:
+                    print(f"[LOG][WARN] 자막 기록이 밀려 오래된 줄을 버림 (dropped_total={self.dropped})")
+            self._cond.notify()
+
+    def close(self, export: bool = True) -> None:
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        self._thread.join(timeout=5.0)
+
+        if export and self.written:
+            base, _ = os.path.splitext(self.path)
+            if self.cfg.export_srt:
+                export_subtitles(self.path, base + ".srt", fmt="srt")
+            if self.cfg.export_vtt:
+                export_subtitles(self.path, base + ".vtt", fmt="vtt")
+            print(f"[LOG] 자막 저장 완료: {base}.*")
+
+    # ---------------- writer ---------------- #
+    def _writer(self) -> None:
+        last_fsync = time.monotonic()
+
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._closing, timeout=self.cfg.flush_interval_sec)
+                lines = list(self._pending)
+                self._pending.clear()
+                closing = self._closing
+
+            if lines:
+                try:
+                    self._file.write("\n".join(lines) + "\n")
+                    self._file.flush()
+                    self.written += len(lines)
+                except OSError as e:
+                    print(f"[LOG][ERROR] 자막 기록 실패: {e}")
+
+            now = time.monotonic()
+            if closing or (lines and now - last_fsync >= self.cfg.fsync_interval_sec):
+                try:
+                    os.fsync(self._file.fileno())
+                except OSError:
+                    pass
+                last_fsync = now
+
+            if closing:
+                self._file.close()
+                return
+
+
+# ---------------- SRT / WebVTT ---------------- #
+def _timestamp(sec: float, sep: str) -> str:
+    ms = max(0, int(round(sec * 1000)))
+    h, ms = divmod(ms, 3_600_000)
+    m, ms = divmod(ms, 60_000)
+    s, ms = divmod(ms, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}{sep}{ms:03d}"
+
+
+def load_cues(jsonl_path: str) -> List[Tuple[float, float, str]]:
+    """
+    JSONL 기록 → (시작, 끝, 텍스트) 목록. 시간은 파일의 첫 세션 시작 기준 초.
+    - 같은 (session, caption_id) 는 마지막 기록(번역문)이 이긴다, 빈 텍스트는 지워진 자막
+    - 끊겨서 반쯤 쓰인 마지막 줄은 건너뛴다
+    """
+    latest: Dict[Tuple[int, int], dict] = {}
+    first_started: Optional[float] = None
+
+    with open(jsonl_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if first_started is None:
+                first_started = rec.get("session_started", 0.0)
+            latest[(rec.get("session", 0), rec["caption_id"])] = rec
+
+    cues = []
+    for rec in latest.values():
+        text = (rec.get("text") or "").strip()
+        if not text or text == "...":
+            continue
+        if rec.get("speaker"):
+            text = f"{rec['speaker']}: {text}"
+
+        offset = rec.get("session_started", 0.0) - (first_started or 0.0)
+        start = offset + (rec.get("audio_start") or 0.0)
+        end = offset + (rec.get("audio_end") or 0.0)
+        cues.append((start, end, text))
+
+    cues.sort(key=lambda c: c[0])
+
+    # 겹치는 구간(슬라이딩 윈도우)은 다음 자막 시작에서 끊는다
+    fixed = []
+    for i, (start, end, text) in enumerate(cues):
+        if i + 1 < len(cues) and cues[i + 1][0] > start:
+            end = min(end, cues[i + 1][0])
+        fixed.append((start, max(end, start + 0.5), text))
+    return fixed
+
+
+def export_subtitles(jsonl_path: str, out_path: str, fmt: str = "srt") -> int:
+    cues = load_cues(jsonl_path)
+
+    with open(out_path, "w", encoding="utf-8") as f:
+        if fmt == "vtt":
+            f.write("WEBVTT\n\n")
+            for start, end, text in cues:
+                f.write(f"{_timestamp(start, '.')} --> {_timestamp(end, '.')}\n{text}\n\n")
+        else:
+            for i, (start, end, text) in enumerate(cues, 1):
+                f.write(f"{i}\n{_timestamp(start, ',')} --> {_timestamp(end, ',')}\n{text}\n\n")
+
+    return len(cues)
+
+
+def open_caption_sink(cfg: CaptionLogConfig, path: Optional[str] = None) -> Optional[CaptionSink]:
+    """설정이 꺼져 있으면 None. path 가 없으면 cfg.dir/captions_<시각>.jsonl"""
+    if not cfg.enabled:
+        return None
+    if path is None:
+        path = os.path.join(cfg.dir, time.strftime("captions_%Y%m%d_%H%M%S.jsonl"))
+    return CaptionSink(path, cfg)
@@ -1,6 +1,7 @@
 # core/config.py
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Dict, Optional
 
 @dataclass
 class AudioConfig:
@@ -8,6 +9,21 @@ class AudioConfig:
     sample_rate: int = 16000
     channels: int = 1              # 🔥 새로 추가 (모노)
     chunk_duration_sec: float = 0.5  # 프레임 길이(예: 0.5초)
+    ring_buffer_sec: float = 60.0    # 연속 캡처 링버퍼 길이 (큐에 쌓인 프레임보다 넉넉하게)
+    native_capture: bool = True      # 장치 기본 rate/채널로 열고 직접 다운믹스 + 리샘플 (드라이버 변환에 맡기지 않음)
+
+
+@dataclass
+class SourceConfig:
+    """
+    다중 화자 모드의 오디오 소스 하나 (화자 한 명)
+    """
+
+    name: str                        # 자막에 붙는 화자 태그
+    kind: str = "device"             # "device" (입력 장치) | "push" (API 로 PCM 을 밀어 넣음)
+    device_name: str = ""            # kind="device" 일 때 장치 이름 일부
+    channels: int = 1                # kind="push" 일 때 들어오는 PCM 채널 수
+    sample_rate: int = 0             # kind="push" 일 때 들어오는 PCM rate (0 이면 AudioConfig.sample_rate, 디스코드는 48000)
 
 
 @dataclass
@@ -17,18 +33,219 @@ class STTConfig:
     """
 
     engine_type: str = "faster-whisper"
-    model_name: str = "small"
-    device: str = "cuda"
-    compute_type: str = "float16"
+    # "auto" 면 create_stt_engine 이 하드웨어를 보고 고른다 (stt.autoconfig)
+    model_name: str = "auto"          # 목표 RTF 를 지키는 가장 큰 후보 모델 (측정 결과는 디스크에 캐시)
+    device: str = "auto"              # "cuda" | "cpu" | "auto"
+    compute_type: str = "auto"        # GPU: float16, CPU: int8
+    cpu_threads: int = 0              # 0 이면 코어 수 / num_workers
+
+    target_rtf: float = 0.3           # 모델 자동 선택 기준 (디코딩 시간 / 오디오 길이, 중간 자막 여유 포함)
+    model_candidates: list[str] = field(default_factory=lambda: ["tiny", "base", "small", "medium", "large-v3"])
+    autoconfig_cache: str = "models/stt_autoconfig.json"   # 빈 문자열이면 캐시 안 함
 
     # 🔽 반드시 기본값 필요
     speech_language: str = "auto"     # 입력 음성 언어 ("auto", "ko", "en")
     caption_language: str = "same"    # 출력 자막 언어 ("same", "ko", "en", "ja", "zh")
 
+    # 자막 언어가 영어면 별도 번역 모델 없이 Whisper 의 task="translate" 로 바로 영어 자막을 만든다
+    # (large-v3-turbo 처럼 translate 학습이 빠진 모델이면 False)
+    whisper_translate: bool = True
+
+    # auto 모드 언어 고정: 확률 lang_lock_prob 이상으로 같은 언어가 lang_lock_count 번 감지되면 고정
+    language_lock: bool = True
+    lang_lock_count: int = 3
+    lang_lock_prob: float = 0.8
+    lang_recheck_every: int = 20        # 고정 후 이 발화 수마다 한 번 다시 감지
+    lang_unlock_logprob: float = -1.0   # 고정 언어로 디코딩한 결과가 이보다 나쁘면 고정 해제
+
+    # 발화가 밀릴 때 한 번에 묶어서 디코딩 (1 이면 배치 안 함)
+    batch_max_size: int = 8
+    batch_max_wait_ms: float = 30.0   # 첫 발화가 들어온 뒤 같은 배치를 기다리는 시간
+    num_workers: int = 0              # 동시에 디코딩하는 STT 워커 수 (모델은 하나를 공유, 0 이면 자동)
+
+    # 부하가 심할 때 governor 가 마지막 단계에서 쓰는 작은 모델 (None 이면 사용 안 함)
+    fallback_model_name: Optional[str] = "base"
+
+@dataclass
+class VADConfig:
+    """
+    대화 모드 VAD / endpoint 설정
+    """
+
+    backend: str = "energy"          # "energy" | "onnx"
+    frame_ms: int = 20               # 판정 단위 서브프레임 길이 (10~30ms, backend="onnx" 는 32)
+    block_ms: int = 40               # 캡처에서 한 번에 읽는 길이 (frame_ms 의 배수 권장)
+
+    speech_ratio: float = 3.0        # 노이즈 바닥 대비 이 배수 이상이면 음성
+    min_energy: float = 0.003        # RMS 절대 하한 (노이즈 바닥이 아주 낮을 때)
+    max_zcr: float = 0.35            # 이보다 ZCR 이 높고 에너지가 애매하면 잡음으로 간주
+    noise_adapt: float = 0.05        # 노이즈 바닥 상승 속도 (블록당)
+
+    start_ms: int = 60               # 이만큼 연속으로 음성이면 발화 시작
+    hangover_ms: int = 160           # 이만큼 연속으로 무음이면 발화 끝 (endpoint)
+    preroll_ms: int = 200            # 발화 시작 앞에 붙일 직전 오디오
+
+    min_utter_sec: float = 0.8
+    max_utter_sec: float = 15.0
+
+    onnx_model_path: Optional[str] = None   # silero 계열 ONNX (backend="onnx" 일 때)
+    onnx_threshold: float = 0.5
+
+
+@dataclass
+class GovernorConfig:
+    """
+    STT 실시간 계수(RTF) 기반 디코딩 품질 조절 설정
+    """
+
+    enabled: bool = True
+    rtf_high: float = 0.8        # RTF EMA 가 이보다 크면 품질을 한 단계 낮춤
+    rtf_low: float = 0.35        # 이보다 작고 큐가 비어 있으면 회복 후보
+    queue_high: int = 3          # STT 대기 작업이 이만큼 쌓이면 낮춤
+    queue_low: int = 0
+    ema_alpha: float = 0.3
+    cooldown: int = 3            # 단계 변경 후 이만큼 관측할 때까지는 유지
+    recover_count: int = 5       # 여유 상태가 이만큼 이어지면 한 단계 올림
+
+
+@dataclass
+class BackpressureConfig:
+    """
+    캡처 → STT 사이 과부하 정책
+    - "drop_oldest": 오래된 발화를 통째로 버림
+    - "merge": 밀린 작업을 하나로 합쳐 한 번에 디코딩
+    - "skip_to_live": 최신 작업만 남기고 실시간으로 건너뜀
+    """
+
+    dialog_policy: str = "merge"
+    bgm_policy: str = "skip_to_live"
+    latency_budget_sec: float = 5.0   # 가장 오래된 작업이 이보다 오래 기다리면 정책 적용
+    max_queue: int = 20
+    max_merge_sec: float = 28.0       # merge 로 만든 오디오 최대 길이 (Whisper 30초 창 이내)
+
+
+@dataclass
+class StreamingConfig:
+    """
+    스트리밍 파이프라인 동작 설정
+    """
+
+    # 대화 모드: 말하는 도중 중간 자막
+    partial_captions: bool = True
+    partial_interval_sec: float = 1.0   # 발화 오디오가 이만큼 늘 때마다 다시 디코딩
+    partial_min_sec: float = 1.0        # 이보다 짧은 발화는 중간 자막을 만들지 않음
+
+    # 브금/영상 모드: 겹치는 슬라이딩 윈도우 (False 면 기존처럼 chunk_duration_sec 단위로 자름)
+    sliding_window: bool = True
+    window_hop_sec: float = 1.5          # 새 자막을 시도하는 간격
+    window_overlap_sec: float = 3.5      # 직전 윈도우와 겹치는 길이 (윈도우 = hop + overlap)
+    window_commit_margin_sec: float = 0.6  # 윈도우 끝에서 이만큼은 다음 윈도우에서 확정
+
+
+@dataclass
+class SpeechGateConfig:
+    """
+    브금/영상 모드: 말소리가 없는 청크(무음 / 음악만)는 STT 전에 버린다 (audio.speech_gate)
+    """
+
+    enabled: bool = True
+    backend: str = "spectral"          # "spectral" | "onnx" (vad.onnx_model_path 의 모델을 같이 씀)
+    frame_ms: int = 32                 # 판정 프레임 (silero ONNX 는 16kHz 에서 512 샘플 = 32ms)
+    min_speech_sec: float = 0.15       # 말소리 프레임이 이만큼은 있어야 STT 로 보냄
+    max_flatness: float = 0.5          # 대역 내 spectral flatness 가 이보다 크면 잡음 프레임
+    min_band_ratio: float = 0.5        # 300~3400Hz 에너지 비율이 이보다 작으면 말소리 아님
+    min_modulation: float = 0.45       # 에너지 포락선의 음절 속도(2~8Hz) 성분 비율 하한 (지속음 음악 거름)
+    hangover_chunks: int = 1           # 말소리 청크 뒤 이만큼은 판정 없이 통과 (말끝 / 다음 윈도우로 미룬 단어 보호)
+
+
+@dataclass
+class FingerprintConfig:
+    """
+    브금/영상 모드: 반복되는 오디오의 자막 재사용 (stt.transcript_cache)
+    """
+
+    enabled: bool = True
+    history_sec: float = 600.0         # 지문 + 받아 적은 단어를 기억하는 최근 구간 길이
+    peaks_per_frame: int = 5           # 스펙트럼 프레임마다 쓰는 피크 수
+    fan_out: int = 6                   # 피크 하나와 짝짓는 뒤쪽 피크 수 (해시 수 ∝ 피크 수 × fan_out)
+    min_hashes: int = 30               # 이보다 적게 맞으면 (또는 지문이 이보다 작으면) 재사용하지 않음
+    min_match_ratio: float = 0.2       # 윈도우 해시 중 같은 시간 차로 맞아야 하는 비율
+    align_tolerance_sec: float = 0.5   # 고정 청크 모드: 과거 청크 경계와 이만큼 안으로 맞아야 재사용
+
+
+@dataclass
+class TranslateConfig:
+    """
+    번역(opus-mt) 설정
+    - "transformers": HuggingFace pipeline (PyTorch)
+    - "ctranslate2" : CTranslate2 로 변환한 int8 모델 (CPU 에서 빠르고 메모리가 적음)
+    """
+
+    backend: str = "transformers"
+    ct2_model_dir: str = "models/opus-mt-{src}-{tgt}-ct2"   # 없으면 처음 쓸 때 변환해서 저장
+    ct2_compute_type: str = "int8"
+    ct2_device: str = "cpu"
+    ct2_threads: int = 0              # 0 이면 CTranslate2 기본값
+    beam_size: int = 2
+    cache_size: int = 512             # 문장 단위 번역 결과 LRU 캐시 (0 이면 끔)
+    retry_backoff_sec: float = 30.0   # 모델 로드가 일시적으로 실패하면 이만큼 쉬었다 다시 시도 (실패마다 2배, 최대 10분)
+
+
+@dataclass
+class MetricsConfig:
+    """
+    단계별 지연 계측 (core.metrics)
+    """
+
+    enabled: bool = True
+    window: int = 2048                 # 히스토그램 분위수를 계산할 최근 관측 수
+    trace_path: Optional[str] = None   # JSONL trace 파일 (None 이면 안 씀)
+    trace_frames: bool = False         # trace 에 VAD 블록 단위 기록까지 남김 (파일이 커짐)
+    http_port: int = 0                 # 127.0.0.1:<port>/metrics (0 이면 끔)
+
+
+@dataclass
+class CaptionLogConfig:
+    """
+    확정 자막 기록 (core.caption_sink)
+    """
+
+    enabled: bool = True
+    dir: str = "captions"
+    flush_interval_sec: float = 0.5    # 모아 둔 줄을 파일에 쓰는 간격
+    fsync_interval_sec: float = 2.0    # 디스크까지 확실히 내리는 간격
+    max_pending: int = 2000            # 메모리에 쌓아 둘 최대 줄 수
+    export_srt: bool = True            # 종료 시 .srt / .vtt 도 만든다
+    export_vtt: bool = True
+
+
+@dataclass
+class RuntimeConfig:
+    """
+    스테이지 그래프 실행 설정 (core.runtime)
+    """
+
+    channel_size: int = 64             # 스테이지 사이 기본 큐 크기 (가득 차면 앞단이 기다림)
+    # 예: {"stt": 2, "translate": 2}. 상태 없는 단계만 (대화 모드 stt 는 배치 스케줄러를 쓸 때, translate)
+    stage_threads: Dict[str, int] = field(default_factory=dict)
+    drain_timeout_sec: float = 5.0     # 종료 시 단계마다 남은 작업을 기다리는 최대 시간
+
+
 @dataclass
 class AppConfig:
     audio: AudioConfig
     stt: STTConfig
+    vad: VADConfig = field(default_factory=VADConfig)
+    streaming: StreamingConfig = field(default_factory=StreamingConfig)
+    speech_gate: SpeechGateConfig = field(default_factory=SpeechGateConfig)
+    fingerprint: FingerprintConfig = field(default_factory=FingerprintConfig)
+    governor: GovernorConfig = field(default_factory=GovernorConfig)
+    backpressure: BackpressureConfig = field(default_factory=BackpressureConfig)
+    translate: TranslateConfig = field(default_factory=TranslateConfig)
+    metrics: MetricsConfig = field(default_factory=MetricsConfig)
+    caption_log: CaptionLogConfig = field(default_factory=CaptionLogConfig)
+    runtime: RuntimeConfig = field(default_factory=RuntimeConfig)
+    sources: list[SourceConfig] = field(default_factory=list)   # 비어 있으면 audio.device_name 하나
 
 
 def load_default_config() -> AppConfig:
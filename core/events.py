@@ -0,0 +1,114 @@
+# core/events.py
+
+import inspect
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+
+@dataclass
+class CaptionEvent:
+    """
+    파이프라인이 caption_callback 으로 내보내는 자막 이벤트
+
+    - kind="partial": 아직 말하는 중인 발화의 중간 결과 (같은 caption_id 로 계속 갱신)
+    - kind="final"  : 발화가 끝나고 확정된 결과 (원문)
+    - kind="translation": 번역 단계가 끝난 뒤 같은 caption_id 의 final 자막을 번역문으로 교체
+    """
+
+    kind: str
+    caption_id: int
+    text: str            # 자막에 표시할 텍스트
+    original: str = ""   # STT 원문
+    speaker: str = ""    # 다중 소스 모드에서 화자(소스) 이름
+    language: str = ""   # original 의 언어 (Whisper 감지/지정 언어, translate 면 "en") → 번역 원본 언어
+    audio_start: float = 0.0   # 캡처 시작 기준 오디오 구간 (초)
+    audio_end: float = 0.0
+    timings: Dict[str, float] = field(default_factory=dict)   # 단계별 소요 시간 (초)
+
+
+CaptionCallback = Callable[[CaptionEvent], None]
+
+# 예전 콜백 형식: (표시할 자막, STT 원문 또는 무음이면 None)
+LegacyCaptionCallback = Callable[[str, Optional[str]], None]
+
+
+def adapt_caption_callback(callback):
+    """
+    예전 (caption, original) 두 인자 콜백이면 CaptionEvent 를 풀어서 넘기는 콜백으로 감싼다.
+    - partial 은 넘기지 않는다 (예전에는 확정 자막만 있었음)
+    - 번역이 켜져 있으면 final(원문) 다음에 translation(번역문)이 같은 콜백으로 한 번 더 온다
+    """
+    if callback is None:
+        return None
+    try:
+        params = inspect.signature(callback).parameters.values()
+    except (TypeError, ValueError):
+        return callback
+
+    required = [
+        p for p in params
+        if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) and p.default is p.empty
+    ]
+    if len(required) < 2:
+        return callback
+
+    print("[WARN] caption_callback(caption, original) 형식은 예전 방식입니다. CaptionEvent 하나를 받도록 바꿔 주세요.")
+
+    def legacy(event: CaptionEvent) -> None:
+        if event.kind != "partial":
+            callback(event.text, event.original or None)
+
+    return legacy
+
+# 프로세스 전체에서 유일한 자막 번호 (상주 워커에서 세션이 바뀌어도 겹치지 않게)
+_caption_ids = itertools.count(1)
+
+
+def next_caption_id() -> int:
+    return next(_caption_ids)
+
+
+@dataclass
+class SttJob:
+    """
+    캡처/VAD 스레드 → STT 스레드로 넘기는 작업 단위
+    """
+
+    kind: str            # "partial" | "final"
+    caption_id: int
+    audio: np.ndarray
+    sample_rate: int
+    audio_start: float = 0.0   # 캡처 시작 기준 (초)
+    created_at: float = field(default_factory=time.monotonic)
+    merged_ids: List[int] = field(default_factory=list)   # backpressure merge 로 합쳐진 다른 발화들
+
+    @property
+    def duration_sec(self) -> float:
+        return len(self.audio) / self.sample_rate
+
+    @property
+    def audio_end(self) -> float:
+        return self.audio_start + self.duration_sec
+
+
+@dataclass
+class AudioWindow:
+    """
+    브금/영상 모드 캡처 스레드 → STT 스레드 작업 단위 (고정 청크 또는 슬라이딩 윈도우)
+    """
+
+    audio: np.ndarray
+    sample_rate: int
+    start_sec: float     # 스트림 시작 기준
+    end_sec: float
+    new_sec: float       # 이 윈도우에서 처음 들어온 오디오 길이 (hop)
+    created_at: float = field(default_factory=time.monotonic)
+    kind: str = "final"
+
+    @property
+    def duration_sec(self) -> float:
+        return self.new_sec
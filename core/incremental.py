@@ -0,0 +1,59 @@
+# core/incremental.py
+
+import re
+from typing import List, Tuple
+
+# 띄어쓰기가 없는 문자 (한자, 가나, 전각 기호) 는 한 글자씩 비교한다
+_CJK = "\u3000-\u303f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef"
+_TOKEN_RE = re.compile(f"(\\s*)([{_CJK}]|[^\\s{_CJK}]+)")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    비교 단위로 자른다. 띄어 쓰는 언어는 단어, 일본어 / 중국어는 글자 단위.
+    토큰은 앞 공백(있으면 " " 하나)을 포함하므로 이어 붙이면 원래 문장이 된다.
+    """
+    return [(" " if space else "") + token for space, token in _TOKEN_RE.findall(text.strip())]
+
+
+class LocalAgreement:
+    """
+    LocalAgreement-2 규칙으로 중간 결과의 안정된 앞부분을 확정한다.
+
+    - 같은 발화를 점점 길게 다시 디코딩한 연속 두 가설이
+      공통으로 가진 앞부분(단어 단위, 일본어 / 중국어는 글자 단위)은 더 이상 바뀌지 않는다고 보고 확정
+    - 확정된 부분은 이후 가설이 달라져도 되돌리지 않는다 (화면 깜빡임 방지)
+    """
+
+    def __init__(self):
+        self.committed: List[str] = []
+        self._prev: List[str] = []
+
+    def reset(self) -> None:
+        self.committed = []
+        self._prev = []
+
+    def update(self, text: str) -> Tuple[List[str], List[str]]:
+        """
+        새 가설을 넣고 (확정된 단어들, 아직 불안정한 꼬리 단어들) 을 돌려준다.
+        """
+        words = tokenize(text)
+
+        n = len(self.committed)
+        agreed = n
+        limit = min(len(words), len(self._prev))
+        while agreed < limit and words[agreed] == self._prev[agreed]:
+            agreed += 1
+
+        # 확정 구간이 새 가설의 앞부분과 일치할 때만 확정을 늘린다
+        if words[:n] == self.committed:
+            self.committed = words[:agreed]
+            tail = words[agreed:]
+        else:
+            tail = words[n:]
+
+        self._prev = words
+        return self.committed, tail
+
+    def text(self, tail: List[str]) -> str:
+        return "".join(self.committed + tail).strip()
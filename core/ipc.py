@@ -0,0 +1,114 @@
+# core/ipc.py
+
+import json
+import socket
+import struct
+import threading
+import time
+from dataclasses import asdict
+from typing import Iterator, Optional
+
+from core.events import CaptionEvent
+
+# 프레임 = 4바이트 big-endian 길이 + UTF-8 JSON 본문
+_HEADER = struct.Struct(">I")
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+
+
+class FrameChannel:
+    """
+    로컬 소켓 위의 길이 접두 JSON 메시지 채널 (stt_worker ↔ overlay).
+
+    - 로그(stdout)와 분리된 전용 채널이라, 자막 이벤트를 줄 단위로 훑어 파싱할 필요가 없다
+    - send() 는 여러 스레드에서 호출해도 프레임이 섞이지 않는다
+    """
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._send_lock = threading.Lock()
+
+    def send(self, msg: dict) -> None:
+        body = json.dumps(msg, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        with self._send_lock:
+            self.sock.sendall(_HEADER.pack(len(body)) + body)
+
+    def _recv_exact(self, n: int) -> Optional[bytes]:
+        buf = bytearray(n)
+        view = memoryview(buf)
+        got = 0
+        while got < n:
+            r = self.sock.recv_into(view[got:], n - got)
+            if r == 0:
+                return None
+            got += r
+        return bytes(buf)
+
+    def recv(self) -> Optional[dict]:
+        """다음 메시지. 상대가 연결을 닫으면 None."""
+        try:
+            header = self._recv_exact(_HEADER.size)
+            if header is None:
+                return None
+
+            (length,) = _HEADER.unpack(header)
+            if length > MAX_FRAME_BYTES:
+                raise ValueError(f"IPC 프레임이 너무 큽니다: {length} bytes")
+
+            body = self._recv_exact(length)
+            if body is None:
+                return None
+        except OSError:
+            return None
+
+        return json.loads(body.decode("utf-8"))
+
+    def __iter__(self) -> Iterator[dict]:
+        while True:
+            msg = self.recv()
+            if msg is None:
+                return
+            yield msg
+
+    def close(self) -> None:
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class IpcServer:
+    """
+    overlay 쪽: 127.0.0.1 의 빈 포트에서 워커 접속을 기다린다.
+    워커를 다시 띄워도 같은 포트를 계속 쓴다.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.bind((host, port))
+        self._sock.listen(1)
+        self.port = self._sock.getsockname()[1]
+
+    def accept(self, timeout: Optional[float] = None) -> Optional[FrameChannel]:
+        self._sock.settimeout(timeout)
+        try:
+            conn, _ = self._sock.accept()
+        except socket.timeout:
+            return None
+        conn.settimeout(None)
+        return FrameChannel(conn)
+
+    def close(self) -> None:
+        self._sock.close()
+
+
+def connect_ipc(port: int, host: str = "127.0.0.1") -> FrameChannel:
+    """워커 쪽: overlay 의 IpcServer 에 접속."""
+    return FrameChannel(socket.create_connection((host, port)))
+
+
+def caption_message(event: CaptionEvent) -> dict:
+    msg = asdict(event)
+    msg["type"] = "caption"
+    msg["sent_at"] = time.time()   # overlay 쪽에서 IPC 지연 계산용 (같은 PC 라 벽시계 비교)
+    return msg
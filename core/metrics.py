@@ -0,0 +1,257 @@
+# core/metrics.py
+
+import json
+import queue
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Deque, Dict, Optional
+
+import numpy as np
+
+from core.config import MetricsConfig
+from core.events import CaptionEvent
+
+QUANTILES = (0.5, 0.95, 0.99)
+PREFIX = "capcap_"
+
+
+class RollingHistogram:
+    """
+    최근 window 개 관측값으로 p50/p95/p99 를 계산한다.
+    count / total 은 처음부터 누적 (Prometheus summary 의 _count / _sum).
+    """
+
+    def __init__(self, window: int = 2048):
+        self.values: Deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.values.append(value)
+        self.count += 1
+        self.total += value
+
+    def quantiles(self) -> Dict[float, float]:
+        if not self.values:
+            return {q: 0.0 for q in QUANTILES}
+        qs = np.quantile(np.fromiter(self.values, dtype=np.float64), QUANTILES)
+        return dict(zip(QUANTILES, qs.tolist()))
+
+
+class MetricsRegistry:
+    """
+    단계별 지연 히스토그램 + 게이지 + JSONL trace.
+
+    - observe(name, value): 히스토그램에 관측값 추가 (초 단위는 이름을 *_sec 로)
+    - add_collector(name, fn): 스냅샷/스크레이프 때마다 fn() 의 숫자 값을 게이지로 읽는다
+      (governor.metrics(), BackpressureQueue.stats() 등)
+    - trace(kind, **fields): trace 파일이 열려 있으면 한 줄짜리 JSON 으로 기록 (백그라운드 스레드)
+    """
+
+    def __init__(self, window: int = 2048):
+        self.window = window
+        self._hists: Dict[str, RollingHistogram] = {}
+        self._gauges: Dict[str, float] = {}
+        self._collectors: Dict[str, Callable[[], dict]] = {}
+        self._lock = threading.Lock()
+
+        self.trace_frames = False
+        self._trace_queue: Optional["queue.SimpleQueue[Optional[str]]"] = None
+        self._trace_thread: Optional[threading.Thread] = None
+
+    # ---------------- 기록 ---------------- #
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            hist = self._hists.get(name)
+            if hist is None:
+                hist = self._hists[name] = RollingHistogram(self.window)
+            hist.observe(value)
+
+    def set_gauge(self, name: str, value: float) -> None:
+        self._gauges[name] = value
+
+    def add_collector(self, name: str, fn: Callable[[], dict]) -> None:
+        self._collectors[name] = fn
+
+    def remove_collector(self, name: str, fn: Optional[Callable[[], dict]] = None) -> None:
+        """fn 을 주면 그 fn 이 아직 등록돼 있을 때만 지운다 (다음 세션이 같은 이름으로 다시 등록했으면 그대로 둠)."""
+        if fn is None or self._collectors.get(name) is fn:
+            self._collectors.pop(name, None)
+
+    def observe_caption(self, event: CaptionEvent) -> None:
+        """파이프라인이 자막을 내보낼 때: 단계별 소요 시간과 end-of-speech→자막 지연."""
+        for stage, sec in event.timings.items():
+            self.observe(f"{event.kind}_{stage}_sec", sec)
+
+        self.trace(
+            "caption",
+            caption_id=event.caption_id,
+            caption_kind=event.kind,
+            speaker=event.speaker,
+            language=event.language,
+            audio_start=round(event.audio_start, 3),
+            audio_end=round(event.audio_end, 3),
+            chars=len(event.text),
+            timings={k: round(v, 4) for k, v in event.timings.items()},
+        )
+
+    # ---------------- trace (JSONL) ---------------- #
+    @property
+    def tracing(self) -> bool:
+        return self._trace_queue is not None
+
+    def open_trace(self, path: str, trace_frames: bool = False) -> None:
+        if self._trace_queue is not None:
+            return
+
+        self.trace_frames = trace_frames
+        self._trace_queue = queue.SimpleQueue()
+        self._trace_thread = threading.Thread(
+            target=self._trace_writer, args=(path, self._trace_queue), name="metrics-trace", daemon=True
+        )
+        self._trace_thread.start()
+        print(f"[METRICS] trace → {path}")
+
+    def close_trace(self) -> None:
+        if self._trace_queue is None:
+            return
+        self._trace_queue.put(None)
+        self._trace_thread.join(timeout=2.0)
+        self._trace_queue = None
+        self._trace_thread = None
+
+    def trace(self, kind: str, **fields) -> None:
+        q = self._trace_queue
+        if q is None:
+            return
+        fields["ts"] = time.time()
+        fields["kind"] = kind
+        q.put(json.dumps(fields, ensure_ascii=False))
+
+    @staticmethod
+    def _trace_writer(path: str, q: "queue.SimpleQueue[Optional[str]]") -> None:
+        with open(path, "a", encoding="utf-8") as f:
+            while True:
+                line = q.get()
+                if line is None:
+                    return
+                f.write(line + "\n")
+                # 밀린 줄은 한 번에 쓰고 flush
+                while True:
+                    try:
+                        line = q.get_nowait()
+                    except queue.Empty:
+                        break
+                    if line is None:
+                        return
+                    f.write(line + "\n")
+                f.flush()
+
+    # ---------------- 읽기 ---------------- #
+    def _collect_gauges(self) -> Dict[str, float]:
+        gauges = dict(self._gauges)
+        for prefix, fn in list(self._collectors.items()):
+            try:
+                values = fn()
+            except Exception as e:
+                print(f"[METRICS][WARN] collector '{prefix}' 실패: {e}")
+                continue
+            for key, value in values.items():
+                if isinstance(value, (int, float)):   # bool 포함, 문자열은 제외
+                    gauges[f"{prefix}_{key}"] = float(value)
+        return gauges
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            hists = {
+                name: {
+                    "count": h.count,
+                    "sum": h.total,
+                    **{f"p{int(q * 100)}": v for q, v in h.quantiles().items()},
+                }
+                for name, h in self._hists.items()
+            }
+        return {"histograms": hists, "gauges": self._collect_gauges()}
+
+    def render_prometheus(self) -> str:
+        snap = self.snapshot()
+        lines = []
+
+        for name, h in sorted(snap["histograms"].items()):
+            metric = PREFIX + name
+            lines.append(f"# TYPE {metric} summary")
+            for q in QUANTILES:
+                lines.append(f'{metric}{{quantile="{q}"}} {h[f"p{int(q * 100)}"]:.6g}')
+            lines.append(f"{metric}_sum {h['sum']:.6g}")
+            lines.append(f"{metric}_count {h['count']}")
+
+        for name, value in sorted(snap["gauges"].items()):
+            metric = PREFIX + name
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value:.6g}")
+
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """
+    127.0.0.1 에서 Prometheus 텍스트(/metrics)와 JSON 스냅샷(/metrics.json)을 내준다.
+    """
+
+    def __init__(self, registry: MetricsRegistry, port: int, host: str = "127.0.0.1"):
+        registry_ref = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body = registry_ref.render_prometheus().encode("utf-8")
+                    ctype = "text/plain; version=0.0.4; charset=utf-8"
+                elif self.path == "/metrics.json":
+                    body = json.dumps(registry_ref.snapshot()).encode("utf-8")
+                    ctype = "application/json"
+                else:
+                    self.send_error(404)
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass   # 스크레이프마다 로그 찍지 않음
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.port = self.httpd.server_address[1]
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="metrics-http", daemon=True)
+
+    def start(self) -> "MetricsServer":
+        self._thread.start()
+        print(f"[METRICS] http://127.0.0.1:{self.port}/metrics")
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+# 프로세스 전체에서 하나
+metrics = MetricsRegistry()
+_server: Optional[MetricsServer] = None
+
+
+def start_metrics(cfg: MetricsConfig) -> None:
+    """설정에 따라 trace 파일과 HTTP 엔드포인트를 켠다. (여러 번 불러도 한 번만)"""
+    global _server
+
+    if not cfg.enabled:
+        return
+
+    metrics.window = cfg.window
+    if cfg.trace_path:
+        metrics.open_trace(cfg.trace_path, trace_frames=cfg.trace_frames)
+    if cfg.http_port and _server is None:
+        _server = MetricsServer(metrics, cfg.http_port).start()
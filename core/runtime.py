@@ -0,0 +1,366 @@
+# core/runtime.py
+
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Generic, List, Optional, TypeVar
+
+from core.config import RuntimeConfig
+from core.metrics import metrics
+
+T = TypeVar("T")
+
+# 스테이지가 다음 스테이지로 결과를 넘길 때 부르는 함수
+Emit = Callable[[Any], None]
+StageFn = Callable[[Any, Emit], None]
+SourceFn = Callable[[Emit, threading.Event], None]
+
+
+class Channel(Generic[T]):
+    """
+    스테이지 사이의 기본 큐 (크기 제한 + close).
+
+    - put() 은 자리가 날 때까지 막힌다 → 뒷단이 밀리면 앞단도 같이 느려진다
+      (오디오는 링버퍼가 받아 두므로 캡처가 멈추지는 않음)
+    - get() 은 항목이 올 때까지 막히고, 닫혔고 비어 있으면 None
+    - 닫힌 뒤의 put() 은 버린다
+
+    BackpressureQueue 도 같은 put / get / close / qsize 를 가지므로 inbox 로 바꿔 끼울 수 있다.
+    """
+
+    def __init__(self, maxsize: int = 0):
+        self.maxsize = maxsize
+        self._items: Deque[T] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def put(self, item: T) -> None:
+        with self._cond:
+            if self.maxsize > 0:
+                self._cond.wait_for(lambda: self._closed or len(self._items) < self.maxsize)
+            if self._closed:
+                return
+            self._items.append(item)
+            self._cond.notify_all()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[T]:
+        with self._cond:
+            self._cond.wait_for(lambda: self._items or self._closed, timeout=timeout)
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+
+class _Reorder:
+    """스레드 여러 개가 도는 스테이지의 결과를 들어온 순서대로 내보낸다."""
+
+    def __init__(self, out: Emit):
+        self.out = out
+        self._next = 0
+        self._done: Dict[int, List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def release(self, seq: int, outputs: List[Any]) -> None:
+        with self._lock:
+            self._done[seq] = outputs
+            while self._next in self._done:
+                for item in self._done.pop(self._next):
+                    self.out(item)
+                self._next += 1
+
+
+class Stage:
+    """
+    inbox 에서 항목을 꺼내 fn(item, out) 을 부르는 처리 단계.
+
+    - stateful=True 면 (VAD 상태, LocalAgreement 등) 스레드 하나로 고정
+    - 아니면 threads 개 (RuntimeConfig.stage_threads 로 이름별 덮어쓰기) 가 같이 돌고,
+      fn 이 돌아오기 전에 out 으로 낸 결과는 들어온 순서대로 다음 단계에 넘어간다
+      (그래서 여러 스레드로 도는 단계는 결과를 fn 안에서 바로 내야 한다)
+    - on_drain(out): 이 단계 스레드가 모두 끝난 뒤, 다음 단계를 닫기 전에 한 번 불린다
+      (자체 워커를 가진 BatchingScheduler / TranslationStage 를 비우거나 남은 발화를 내보낼 때)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: StageFn,
+        inbox=None,
+        threads: int = 1,
+        stateful: bool = False,
+        on_drain: Optional[Callable[[Emit], None]] = None,
+    ):
+        self.name = name
+        self.fn = fn
+        self.inbox = inbox
+        self.threads = 1 if stateful else max(1, threads)
+        self.stateful = stateful
+        self.on_drain = on_drain
+
+        self.processed = 0
+        self.errors = 0
+        self.busy_sec = 0.0
+
+
+class StageGraph:
+    """
+    소스 → 스테이지 → ... → 마지막 스테이지 로 이어지는 파이프라인 실행기.
+
+        graph = StageGraph("dialog", app_cfg.runtime)
+        graph.add_source("capture", reader_source(reader, block), on_stop=capture.stop)
+        graph.add_stage("segment", segment, stateful=True)
+        graph.add_stage("stt", transcribe, inbox=job_queue)
+        graph.add_stage("sink", sink, stateful=True)
+        graph.run(stop_event)
+
+    - 스테이지는 추가한 순서대로 이어진다. 소스는 모두 첫 스테이지로 보낸다
+    - 스레드는 전부 막히는 대기(get / Condition)로 기다린다 (바쁜 대기 없음)
+    - stop(drain=True): 소스를 멈춘 뒤 앞 단계부터 inbox 를 닫고, 남은 항목을 다 처리하면
+      다음 단계를 닫는다 → 이미 들어온 오디오는 자막까지 나온다
+    """
+
+    def __init__(self, name: str, cfg: Optional[RuntimeConfig] = None):
+        self.name = name
+        self.cfg = cfg or RuntimeConfig()
+
+        self._sources: List[tuple] = []
+        self._stages: List[Stage] = []
+        self._by_name: Dict[str, Stage] = {}
+        self._threads: Dict[str, List[threading.Thread]] = {}
+        self._source_threads: List[threading.Thread] = []
+        self._sources_lock = threading.Lock()
+
+        self._stop = threading.Event()
+        self._sources_done = threading.Event()
+        self._watching = False
+        self._discard = False
+        self._started = False
+
+    # ---------------- 구성 ---------------- #
+    def add_source(self, name: str, fn: SourceFn, on_stop: Optional[Callable[[], None]] = None) -> "StageGraph":
+        """
+        fn(out, stop_event): stop_event 가 set 될 때까지 (또는 입력이 끝날 때까지) out 으로 내보낸다.
+        실행 중에 추가하면 바로 스레드를 띄운다 (봇에 새 화자가 들어올 때 등).
+        """
+        with self._sources_lock:
+            self._sources.append((name, fn, on_stop))
+            if self._started:
+                self._start_source(name, fn)
+        return self
+
+    def add_stage(
+        self,
+        name: str,
+        fn: StageFn,
+        inbox=None,
+        threads: int = 1,
+        stateful: bool = False,
+        on_drain: Optional[Callable[[Emit], None]] = None,
+    ) -> "StageGraph":
+        configured = self.cfg.stage_threads.get(name)
+        if configured is not None:
+            if stateful and configured > 1:
+                print(f"[PIPE][WARN] '{name}' 단계는 상태가 있어 스레드 1개로 돕니다 (설정 {configured})")
+            else:
+                threads = configured
+
+        stage = Stage(
+            name,
+            fn,
+            inbox if inbox is not None else Channel(self.cfg.channel_size),
+            threads=threads,
+            stateful=stateful,
+            on_drain=on_drain,
+        )
+        self._stages.append(stage)
+        self._by_name[name] = stage
+        return self
+
+    def put(self, name: str, item: Any) -> None:
+        """이름으로 스테이지 inbox 에 직접 넣는다 (별도 스레드가 결과를 되돌려 줄 때)."""
+        self._by_name[name].inbox.put(item)
+
+    # ---------------- 실행 ---------------- #
+    def start(self) -> "StageGraph":
+        if self._started:
+            return self
+        if not self._stages:
+            raise ValueError(f"'{self.name}' 파이프라인에 스테이지가 없습니다.")
+        self._started = True
+
+        for i, stage in enumerate(self._stages):
+            out = self._stages[i + 1].inbox.put if i + 1 < len(self._stages) else _discard_output
+            reorder = _Reorder(out) if stage.threads > 1 else None
+            take_lock = threading.Lock()
+            seq = itertools.count()
+
+            threads = []
+            for n in range(stage.threads):
+                t = threading.Thread(
+                    target=self._stage_worker,
+                    args=(stage, out, reorder, take_lock, seq),
+                    name=f"{self.name}-{stage.name}-{n}",
+                    daemon=True,
+                )
+                t.start()
+                threads.append(t)
+            self._threads[stage.name] = threads
+
+        with self._sources_lock:
+            for name, fn, _ in self._sources:
+                self._start_source(name, fn)
+        return self
+
+    def _start_source(self, name: str, fn: SourceFn) -> None:
+        t = threading.Thread(
+            target=self._source_worker,
+            args=(name, fn, self._stages[0].inbox.put),
+            name=f"{self.name}-{name}",
+            daemon=True,
+        )
+        t.start()
+        self._source_threads.append(t)
+
+        # 지켜보는 스레드가 없으면 (처음, 또는 소스가 모두 끝난 뒤 다시 추가될 때) 새로 띄운다.
+        # 모든 소스가 끝나면 wait() 를 깨운다 (_sources_lock 안에서 불림)
+        if not self._watching:
+            self._watching = True
+            self._sources_done.clear()
+            threading.Thread(target=self._watch_sources, name=f"{self.name}-sources", daemon=True).start()
+
+    def wait(self, stop_event: Optional[threading.Event] = None) -> None:
+        """
+        stop_event 가 set 되거나, 소스가 모두 끝나거나, Ctrl+C 가 들어올 때까지 대기.
+        (메인 스레드가 Ctrl+C 를 받을 수 있게 짧게 끊어서 기다린다)
+        """
+        try:
+            while not self._sources_done.wait(0.5):
+                if stop_event is not None and stop_event.is_set():
+                    return
+        except KeyboardInterrupt:
+            pass
+
+    def stop(self, drain: bool = True) -> None:
+        with self._sources_lock:
+            if not self._started:
+                return
+            self._stop.set()
+            self._discard = not drain
+            self._started = False
+            sources = list(self._sources)
+            source_threads = list(self._source_threads)
+
+        for name, _, on_stop in sources:
+            if on_stop is not None:
+                on_stop()
+        for t in source_threads:
+            t.join(timeout=self.cfg.drain_timeout_sec)
+
+        for i, stage in enumerate(self._stages):
+            stage.inbox.close()
+            for t in self._threads.get(stage.name, []):
+                t.join(timeout=self.cfg.drain_timeout_sec)
+                if t.is_alive():
+                    print(f"[PIPE][WARN] '{stage.name}' 단계가 {self.cfg.drain_timeout_sec}s 안에 끝나지 않음")
+
+            if stage.on_drain is not None:
+                out = self._stages[i + 1].inbox.put if i + 1 < len(self._stages) else _discard_output
+                try:
+                    stage.on_drain(out)
+                except Exception as e:
+                    print(f"[PIPE][ERROR] '{stage.name}' 정리 실패: {e}")
+
+    def run(self, stop_event: Optional[threading.Event] = None) -> None:
+        """start → wait → stop(drain)."""
+        self.start()
+        self.wait(stop_event)
+        self.stop()
+
+    def stats(self) -> dict:
+        out = {}
+        for stage in self._stages:
+            out[f"{stage.name}_queue_depth"] = stage.inbox.qsize()
+            out[f"{stage.name}_processed"] = stage.processed
+            out[f"{stage.name}_errors"] = stage.errors
+            out[f"{stage.name}_busy_sec"] = round(stage.busy_sec, 3)
+        return out
+
+    # ---------------- workers ---------------- #
+    def _source_worker(self, name: str, fn: SourceFn, out: Emit) -> None:
+        try:
+            fn(out, self._stop)
+        except Exception as e:
+            print(f"[PIPE][ERROR] 소스 '{name}' 중단: {e}")
+
+    def _watch_sources(self) -> None:
+        # 실행 중에 추가되는 소스도 기다린다
+        joined = 0
+        while True:
+            with self._sources_lock:
+                if joined >= len(self._source_threads):
+                    self._watching = False
+                    self._sources_done.set()
+                    return
+                t = self._source_threads[joined]
+            t.join()
+            joined += 1
+
+    def _stage_worker(self, stage: Stage, out: Emit, reorder: Optional[_Reorder], take_lock, seq) -> None:
+        while True:
+            with take_lock:
+                item = stage.inbox.get()
+                n = next(seq)
+            if item is None:
+                return
+
+            outputs: List[Any] = []
+            t0 = time.perf_counter()
+            try:
+                if not self._discard:
+                    stage.fn(item, outputs.append if reorder is not None else out)
+            except Exception as e:
+                stage.errors += 1
+                print(f"[PIPE][ERROR] '{stage.name}' 처리 실패: {e}")
+            elapsed = time.perf_counter() - t0
+
+            if reorder is not None:
+                reorder.release(n, outputs)
+
+            stage.processed += 1
+            stage.busy_sec += elapsed
+            metrics.observe(f"stage_{stage.name}_sec", elapsed)
+
+
+def _discard_output(item: Any) -> None:
+    pass
+
+
+def reader_source(reader, num_frames: int, timeout: float = 1.0, on_read: Optional[Callable[[], None]] = None) -> SourceFn:
+    """
+    RingBufferReader 를 num_frames 샘플씩 읽어 내보내는 소스 (zero-copy 뷰).
+    링버퍼가 닫히면 남은 오디오까지 읽고 끝난다.
+    """
+
+    def loop(out: Emit, stop: threading.Event) -> None:
+        while not stop.is_set():
+            frame = reader.read(num_frames, timeout=timeout)
+            if frame is None:
+                if reader.ring.closed:
+                    return
+                continue
+            if on_read is not None:
+                on_read()
+            out(frame)
+
+    return loop
@@ -1,257 +1,816 @@
 # core/streaming.py
 
 import threading
-import queue
 import time
-from typing import Tuple, Callable, Optional
+from typing import Optional
 
 import numpy as np
 
-from core.config import AppConfig
-from audio.capture import resolve_device_index, record_once_with_index
-from stt.engine import create_stt_engine
-from core.debug_config import DEBUG, DEBUG_VAD, DEBUG_STT, DEBUG_CAPTURE
-from core.translate import translate_text
+from core.config import AppConfig, SourceConfig
+from audio.capture import open_continuous_capture
+from audio.sources import open_source
+from audio.utterance_buffer import UtteranceBuffer
+from stt.engine import SessionLanguage, Transcript, create_stt_engine
+from stt.batching import BatchingScheduler
+from stt.governor import attach_governor
+from stt.transcript_cache import create_transcript_cache
+from audio.speech_gate import create_speech_gate
+from core.debug_config import DEBUG_VAD, DEBUG_STT, DEBUG_CAPTURE
+from core.translation_stage import create_translation_stage
+from core.events import AudioWindow, CaptionCallback, CaptionEvent, SttJob, adapt_caption_callback, next_caption_id
+from core.metrics import metrics
+from core.backpressure import BackpressureQueue, merge_stt_jobs
+from core.incremental import LocalAgreement
+from core.window_merge import WindowMerger
+from core.runtime import StageGraph, reader_source
+from audio.vad import VADSegmenter
+
+
+def _observe_block(reader, sr: int, origin: int, vad_sec: Optional[float] = None, source: str = "") -> None:
+    """
+    캡처 블록 하나를 읽은 직후: 링버퍼에 남은 (아직 처리 못 한) 오디오 = 캡처 지연, VAD 처리 시간.
+    """
+    lag_sec = reader.available() / sr
+    metrics.observe("capture_lag_sec", lag_sec)
+    if vad_sec is not None:
+        metrics.observe("vad_block_sec", vad_sec)
 
+    if metrics.trace_frames:
+        metrics.trace(
+            "frame",
+            source=source,
+            pos=round((reader.pos - origin) / sr, 3),
+            capture_lag=round(lag_sec, 4),
+            vad=round(vad_sec, 6) if vad_sec is not None else None,
+        )
 
-AudioChunk = Tuple[np.ndarray, int]
-CaptionCallback = Callable[[str, Optional[str]], None]
 
-def process_caption_text(
-    stt_text: str,
-    app_cfg: AppConfig,
-) -> tuple[str, str]:
+def _utterance_capacity_sec(vad_cfg) -> float:
+    # 가장 긴 발화 + 프리롤 + 블록 하나가 들어가면 보통은 버퍼를 늘릴 일이 없다
+    return vad_cfg.max_utter_sec + (vad_cfg.preroll_ms + vad_cfg.start_ms + vad_cfg.block_ms) / 1000
+
+
+class _ClearCaptions:
+    """대화 모드 post 단계로 보내는 표시: STT 없이 끝난 발화들 (중간 자막이 떠 있으면 지운다)."""
+
+    def __init__(self, caption_ids: "list[int]"):
+        self.caption_ids = caption_ids
+
+
+def _register_collectors(
+    stt_engine, speech, job_queue=None, scheduler=None, translator=None, graph=None, transcript_cache=None, speech_gate=None
+) -> dict:
+    """
+    세션 동안 /metrics 스크레이프 때 읽을 게이지들 (언어 고정, 큐 깊이, 버린 오디오, governor 상태, 단계별 처리량 등).
+    """
+    collectors = {"language": speech.stats}
+    if stt_engine.governor is not None:
+        collectors["governor"] = stt_engine.governor.metrics
+    if job_queue is not None:
+        collectors["backpressure"] = job_queue.stats
+    if scheduler is not None:
+        collectors["scheduler"] = scheduler.stats
+    if translator is not None:
+        collectors["translation"] = translator.stats
+    if graph is not None:
+        collectors["pipeline"] = graph.stats
+    if transcript_cache is not None:
+        collectors["fingerprint"] = transcript_cache.stats
+    if speech_gate is not None:
+        collectors["speech_gate"] = speech_gate.stats
+
+    for name, fn in collectors.items():
+        metrics.add_collector(name, fn)
+    return collectors
+
+
+def _unregister_collectors(collectors: dict) -> None:
+    # 이 세션이 등록한 것만 지운다 (늦게 끝난 세션이 다음 세션의 게이지를 지우지 않도록)
+    for name, fn in collectors.items():
+        metrics.remove_collector(name, fn)
+
+
+def _engine_with_governor(app_cfg: AppConfig, stt_engine=None):
     """
-    STT 결과를 받아서:
-    - original_text: STT 원문
-    - caption_text: 자막에 표시할 텍스트 (번역 적용)
+    미리 로드된 엔진이 있으면 재사용 (상주 워커), 없으면 새로 만든다.
+    언어 설정 / 언어 고정 상태(SessionLanguage)는 엔진이 아니라 세션마다 새로 만든다.
     """
-    original_text = stt_text.strip()
-    if not original_text:
-        return "", ""
+    if stt_engine is None:
+        stt_engine = create_stt_engine(app_cfg.stt)
+    if stt_engine.governor is None:
+        attach_governor(stt_engine, app_cfg.governor)
+    return stt_engine, stt_engine.governor, SessionLanguage(app_cfg.stt)
 
-    speech_lang = app_cfg.stt.speech_language
-    caption_lang = app_cfg.stt.caption_language
 
-    if caption_lang == speech_lang:
-        return original_text, original_text
+def _caption_sink(caption_callback: Optional[CaptionCallback]):
+    """마지막 단계: 자막 지연을 기록하고 콜백으로 내보낸다 (콜백은 항상 이 스레드 하나에서 불림)."""
+    caption_callback = adapt_caption_callback(caption_callback)
 
-    translated = translate_text(
-        text=original_text,
-        src=speech_lang,
-        tgt=caption_lang,
-    )
+    def sink(event: CaptionEvent, out) -> None:
+        if event.original:
+            metrics.observe_caption(event)
 
-    return original_text, translated
+        if caption_callback:
+            caption_callback(event)
+        elif event.kind != "partial" and event.original:
+            print(f">>> [{event.speaker or 'CAPTION'}] {event.text}")
 
-# ------------------- 1) 디코 대화용 (VAD + endpoint) ------------------- #
-def run_stream_pipeline_vad(app_cfg: AppConfig, caption_callback=None):
+    return sink
 
-    from core.debug_config import DEBUG, DEBUG_VAD, DEBUG_STT, DEBUG_CAPTURE
 
-    audio_cfg = app_cfg.audio
-    stt_cfg = app_cfg.stt
+def _add_caption_stages(graph: StageGraph, app_cfg: AppConfig, caption_callback: Optional[CaptionCallback]):
+    """
+    STT 뒤에 붙는 공통 단계: (필요할 때만) translate → sink.
+    원문 자막을 먼저 내보내고, 번역문은 TranslationStage 가 끝나는 대로 같은 caption_id 로 sink 에 넣는다.
+    """
+    translator = create_translation_stage(app_cfg, lambda event: graph.put("sink", event))
 
-    frame_sec = audio_cfg.chunk_duration_sec  # 0.5초
+    if translator is not None:
+        def translate(event: CaptionEvent, out) -> None:
+            out(event)
+            if event.kind == "final":
+                translator.submit(event)
 
-    # VAD 파라미터
-    VOICE_ENERGY_TH   = 0.005
-    SILENCE_ENERGY_TH = 0.004
-    MIN_UTTER_SEC     = 0.8
-    MAX_UTTER_SEC     = 15.0
-    END_SILENCE_SEC   = 0.40
+        # 원문을 바로 넘기고 번역은 TranslationStage 에 맡기므로 상태가 없다 (stage_threads 로 늘릴 수 있음)
+        graph.add_stage("translate", translate, on_drain=lambda out: translator.stop())
 
-    print("=== STREAM (VAD + endpoint, 디코 대화용) ===")
+    graph.add_stage("sink", _caption_sink(caption_callback), stateful=True)
+    return translator
 
-    device_index = resolve_device_index(audio_cfg)
-    stt_engine = create_stt_engine(stt_cfg)
 
-    audio_queue: "queue.Queue[AudioChunk]" = queue.Queue(maxsize=20)
-    stop_flag = threading.Event()
+# ------------------- 1) 디코 대화용 (VAD + endpoint) ------------------- #
+def run_stream_pipeline_vad(
+    app_cfg: AppConfig,
+    caption_callback: Optional[CaptionCallback] = None,
+    stt_engine=None,
+    stop_event: Optional[threading.Event] = None,
+):
+    """
+    capture → segment(VAD + 발화 버퍼) → stt → post(LocalAgreement) → translate → sink
+    """
+    audio_cfg = app_cfg.audio
+    stt_cfg = app_cfg.stt
+    vad_cfg = app_cfg.vad
+    stream_cfg = app_cfg.streaming
 
-    current_frames = []
-    current_dur = 0.0
-    silence_dur = 0.0
-    in_speech = False
+    print("=== STREAM (VAD + endpoint, 디코 대화용) ===")
 
-    # ---------------- capture thread ---------------- #
-    def capture_worker():
-        while not stop_flag.is_set():
-            audio_data, sr = record_once_with_index(audio_cfg, device_index)
+    stt_engine, governor, speech = _engine_with_governor(app_cfg, stt_engine)
+    capture = open_continuous_capture(audio_cfg)
+    reader = capture.reader()
+    sr = capture.sample_rate
+    origin = reader.pos
+    block_samples = int(sr * vad_cfg.block_ms / 1000)
+    segmenter = VADSegmenter(vad_cfg, sr)
+
+    # segment → stt : 중간(partial) / 확정(final) 작업 단위로 전달
+    # 과부하 시에는 지연 예산을 넘긴 작업을 정책(merge / drop_oldest / skip_to_live)대로 정리
+    bp_cfg = app_cfg.backpressure
+    job_queue: "BackpressureQueue[SttJob]" = BackpressureQueue(
+        policy=bp_cfg.dialog_policy,
+        latency_budget_sec=bp_cfg.latency_budget_sec,
+        maxsize=bp_cfg.max_queue,
+        merge_fn=lambda jobs: merge_stt_jobs(jobs, bp_cfg.max_merge_sec),
+        on_drop=lambda job: on_drop(job),
+    )
 
-            if DEBUG_CAPTURE:
-                print(f"[CAP] frame captured ({frame_sec}s), samples={len(audio_data)}")
+    def on_drop(job: SttJob) -> None:
+        if job.kind == "partial":
+            partial_pending.clear()
+            return
+        # 버린 확정 발화(와 거기 합쳐져 있던 발화)의 중간 자막은 post 단계가 지운다
+        graph.put("post", _ClearCaptions([job.caption_id] + job.merged_ids))
+
+    # 발화 오디오는 미리 잡아 둔 버퍼에 제자리로 쓴다 (프리롤 포함)
+    utterance = UtteranceBuffer(sr, _utterance_capacity_sec(vad_cfg))
+    caption_id = next_caption_id()
+    last_partial_dur = 0.0
+    consumed = 0   # segment 단계가 VAD 에 넘긴 샘플 수 (캡처 시작 기준)
+
+    # 큐에 올라가 있지만 아직 처리되지 않은 partial 이 있으면 새 partial 을 만들지 않는다
+    partial_pending = threading.Event()
+
+    def _audio_now() -> float:
+        # 지금까지 VAD 에 넘긴 오디오의 끝 (초)
+        return consumed / sr
+
+    # ---------------- segment: 발화 확정 → STT 큐 ---------------- #
+    def submit_utterance(out):
+        nonlocal caption_id, last_partial_dur
+
+        dur = utterance.duration_sec
+        had_partial = last_partial_dur > 0
+        last_partial_dur = 0.0
+        finished_id, caption_id = caption_id, next_caption_id()
+
+        if not len(utterance) or dur < vad_cfg.min_utter_sec:
+            utterance.clear()
+            # partial_min_sec < min_utter_sec 설정이면 중간 자막이 이미 떴을 수 있다 → post 단계가 지운다
+            if had_partial:
+                graph.put("post", _ClearCaptions([finished_id]))
+            return
 
-            try:
-                audio_queue.put((audio_data, sr), timeout=1.0)
-            except queue.Full:
-                print("[WARN] audio queue full, dropping frame")
+        audio = utterance.detach()
+        out(SttJob("final", finished_id, audio, sr, audio_start=_audio_now() - dur))
 
-    # ---------------- finalize utterance ---------------- #
-    def finalize_utterance():
-        nonlocal current_frames, current_dur
+    def submit_partial(out):
+        nonlocal last_partial_dur
 
-        if not current_frames or current_dur < MIN_UTTER_SEC:
-            current_frames = []
-            current_dur = 0.0
+        last_partial_dur = utterance.duration_sec
+        if partial_pending.is_set():
             return
 
-        audio = np.concatenate(current_frames, axis=0)
-        sr = audio_cfg.sample_rate
+        # 복사 없는 스냅샷: 이후 오디오는 뒤에만 쓰이고, 확정 시에는 detach 되므로 안전
+        partial_pending.set()
+        out(SttJob(
+            "partial", caption_id, utterance.view(), sr,
+            audio_start=_audio_now() - utterance.duration_sec,
+        ))
+
+    def segment(block: np.ndarray, out):
+        nonlocal consumed
+
+        if DEBUG_CAPTURE:
+            print(f"[CAP] block captured ({vad_cfg.block_ms}ms), samples={len(block)}")
+
+        t_vad = time.perf_counter()
+        vad_events = segmenter.process(block)
+        metrics.observe("vad_block_sec", time.perf_counter() - t_vad)
+        consumed += len(block)
+
+        for kind, audio in vad_events:
+            if kind == "end":
+                if DEBUG_VAD:
+                    print(f"[VAD] endpoint: duration={utterance.duration_sec:.2f}s")
+                submit_utterance(out)
+                continue
 
-        if DEBUG_STT:
-            print(f"[STT] START: duration={current_dur:.2f}s")
+            utterance.append(audio)
+            current_dur = utterance.duration_sec
+
+            if current_dur >= vad_cfg.max_utter_sec:
+                # 너무 긴 발화는 잘라서 먼저 보내고, 이어지는 오디오는 새 발화로
+                submit_utterance(out)
+            elif (
+                stream_cfg.partial_captions
+                and current_dur >= stream_cfg.partial_min_sec
+                and current_dur - last_partial_dur >= stream_cfg.partial_interval_sec
+            ):
+                submit_partial(out)
+
+    # ---------------- stt ---------------- #
+    # 확정 발화는 배치 스케줄러로 넘겨, 밀려 있을 때 한 번에 디코딩한다
+    scheduler = None
+    if stt_cfg.batch_max_size > 1:
+        scheduler = BatchingScheduler(
+            stt_engine,
+            max_batch_size=stt_cfg.batch_max_size,
+            max_wait_ms=stt_cfg.batch_max_wait_ms,
+            num_workers=stt_cfg.num_workers,
+            speech=speech,
+        ).start()
+
+    finalized_upto = -1
+    finalized_lock = threading.Lock()
+
+    def transcribe(job: SttJob, out):
+        nonlocal finalized_upto
+
+        backlog = scheduler.pending() if scheduler is not None else 0
+        metrics.observe("stt_queue_depth", job_queue.qsize() + backlog)
+        if governor is not None:
+            governor.update_queue_depth(job_queue.qsize() + backlog)
+
+        t_start = time.monotonic()
+
+        if job.kind == "partial":
+            partial_pending.clear()
+            with finalized_lock:
+                if job.caption_id <= finalized_upto:
+                    return
+            result = stt_engine.transcribe(job.audio, job.sample_rate, fast=True, speech=speech)
+            out((job, result, t_start, time.monotonic()))
+            return
 
-        stt_text = stt_engine.transcribe(audio, sr).strip()
+        with finalized_lock:
+            finalized_upto = max([finalized_upto, job.caption_id] + job.merged_ids)
 
         if DEBUG_STT:
-            print(f"[STT] RAW: '{stt_text}'")
+            print(f"[STT] START: duration={job.duration_sec:.2f}s")
 
-        original, caption = process_caption_text(stt_text, app_cfg)
+        if scheduler is None:
+            result = stt_engine.transcribe(job.audio, job.sample_rate, speech=speech)
+            out((job, result, t_start, time.monotonic()))
+            return
 
-        if not original:
-            current_frames = []
-            current_dur = 0.0
+        # 스케줄러 안에 너무 많이 쌓이지 않게 해서, 밀린 작업은 job_queue 의 정책을 받게 한다
+        scheduler.wait_for_capacity(stt_cfg.batch_max_size)
+        # 결과는 스케줄러 워커가 나중에 내므로 out 이 아니라 post 단계로 바로 넣는다
+        # (여러 스레드로 도는 단계의 out 은 fn 이 돌아온 뒤에는 쓸 수 없음)
+        scheduler.submit(
+            job.audio, job.sample_rate,
+            lambda result, _: graph.put("post", (job, result, t_start, time.monotonic())),   # 배치 대기 포함
+        )
+
+    # ---------------- post: 중간 자막 안정화 + 자막 이벤트 ---------------- #
+    agreements: dict[int, LocalAgreement] = {}
+    partial_has_shown: dict[int, bool] = {}
+    closed_upto = -1   # 이 번호까지는 final 을 보냈거나 지웠다 (늦게 온 partial 은 무시)
+
+    def clear_captions(ids: "list[int]", out) -> None:
+        # 중간 자막이 떠 있던 발화는 빈 final 로 화면에서 지운다
+        for caption_id in ids:
+            agreements.pop(caption_id, None)
+            if partial_has_shown.pop(caption_id, False):
+                out(CaptionEvent("final", caption_id, "", ""))
+
+    def postprocess(item, out):
+        nonlocal closed_upto
+
+        if isinstance(item, _ClearCaptions):
+            clear_captions(item.caption_ids, out)
+            closed_upto = max([closed_upto] + item.caption_ids)
             return
 
-        if caption_callback:
-            caption_callback(caption, original)
-        else:
-            print(">>>", caption)
+        job, result, t_start, t_done = item
+        stt_text = result.text.strip()
+        timings = {
+            "queue_wait": t_start - job.created_at,
+            "stt": t_done - t_start,
+            "e2e": time.monotonic() - job.created_at,   # endpoint → 자막
+        }
 
-        current_frames = []
-        current_dur = 0.0
+        if job.kind == "partial":
+            if not stt_text or job.caption_id <= closed_upto:
+                return
 
-    # ---------------- stt worker ---------------- #
-    def stt_worker():
-        nonlocal current_frames, current_dur, silence_dur, in_speech
+            agreement = agreements.setdefault(job.caption_id, LocalAgreement())
+            _, tail = agreement.update(stt_text)
+            text = agreement.text(tail)
 
-        while not stop_flag.is_set():
-            try:
-                frame, sr = audio_queue.get(timeout=1.0)
-            except queue.Empty:
-                continue
+            if DEBUG_STT:
+                print(f"[STT] PARTIAL #{job.caption_id}: committed={len(agreement.committed)} '{text}'")
+
+            partial_has_shown[job.caption_id] = True
+            out(CaptionEvent(
+                "partial", job.caption_id, text, text,
+                language=result.text_language,
+                audio_start=job.audio_start,
+                audio_end=job.audio_end,
+                timings=timings,
+            ))
+            return
+
+        agreements.pop(job.caption_id, None)
+        had_partial = partial_has_shown.pop(job.caption_id, False)
+        closed_upto = max([closed_upto, job.caption_id] + job.merged_ids)
 
-            energy = float(np.mean(np.abs(frame)))
+        # backpressure 로 다른 발화에 합쳐진 발화의 중간 자막은 지운다
+        clear_captions(job.merged_ids, out)
 
-            if DEBUG_VAD:
-                print(f"[VAD] energy={energy:.5f}")
+        if DEBUG_STT:
+            print(f"[STT] RAW ({result.language}): '{stt_text}'")
 
-            if energy > VOICE_ENERGY_TH:
-                current_frames.append(frame)
-                current_dur += frame_sec
-                silence_dur = 0.0
-                in_speech = True
+        if not stt_text and not had_partial:
+            return
 
-                if current_dur >= MAX_UTTER_SEC:
-                    finalize_utterance()
-                    in_speech = False
-                    silence_dur = 0.0
+        out(CaptionEvent(
+            "final", job.caption_id, stt_text, stt_text,
+            language=result.text_language,
+            audio_start=job.audio_start,
+            audio_end=job.audio_end,
+            timings=timings,
+        ))
+
+    # ---------------- 그래프 ---------------- #
+    graph = StageGraph("dialog", app_cfg.runtime)
+    graph.add_source(
+        "capture",
+        reader_source(reader, block_samples, on_read=lambda: _observe_block(reader, sr, origin)),
+        on_stop=capture.stop,
+    )
+    # 종료 시 말하던 중인 발화도 마저 자막으로
+    graph.add_stage("segment", segment, stateful=True, on_drain=submit_utterance)
+    # 배치 스케줄러를 쓰면 stt 단계는 제출만 하므로 상태가 없다 (stage_threads["stt"] 로 늘릴 수 있음).
+    # 직접 디코딩할 때는 partial / final 순서를 지키도록 스레드 하나
+    graph.add_stage(
+        "stt", transcribe, inbox=job_queue, stateful=scheduler is None,
+        on_drain=lambda out: scheduler.stop() if scheduler is not None else None,
+    )
+    graph.add_stage("post", postprocess, stateful=True)
+    translator = _add_caption_stages(graph, app_cfg, caption_callback)
 
-            else:
-                if in_speech:
-                    silence_dur += frame_sec
-                    if silence_dur >= END_SILENCE_SEC:
-                        finalize_utterance()
-                        in_speech = False
-                        silence_dur = 0.0
-
-    t1 = threading.Thread(target=capture_worker, daemon=True)
-    t2 = threading.Thread(target=stt_worker, daemon=True)
-    t1.start()
-    t2.start()
-
-    try:
-        while True:
-            time.sleep(0.05)   # 🌟 렉 방지
-    except KeyboardInterrupt:
-        stop_flag.set()
-        t1.join(timeout=2.0)
-        t2.join(timeout=2.0)
-
-
-# ------------------- 2) 브금/영상용 (고정 길이 청크) ------------------- #
+    collectors = _register_collectors(stt_engine, speech, job_queue, scheduler, translator, graph)
+    graph.run(stop_event)
+
+    stats = job_queue.stats()
+    if translator is not None:
+        stats.update(translator.stats())
+    _unregister_collectors(collectors)
+    print(f"[*] 대화 모드 종료: {stats}")
+
+
+# ------------------- 2) 브금/영상용 (고정 길이 청크 / 슬라이딩 윈도우) ------------------- #
 def run_stream_pipeline_fixed(
     app_cfg: AppConfig,
     caption_callback: Optional[CaptionCallback] = None,
+    stt_engine=None,
+    stop_event: Optional[threading.Event] = None,
 ) -> None:
     """
     브금/영상 모드 (고정 청크 + 파이프라인):
 
-    - audio_cfg.chunk_duration_sec (예: 7초) 길이로 고정 녹음
-    - 캡처 스레드: 7초씩 계속 녹음해서 큐에 넣기
-    - STT 스레드: 큐에서 꺼내서 STT → 자막 출력
+    - capture: audio_cfg.chunk_duration_sec (예: 7초) 길이로 링버퍼에서 잘라 큐에 넣기
+    - stt: 큐에서 꺼내서 STT (지문 캐시가 윈도우 순서에 의존하므로 스레드 하나)
+    - post: 자막 이벤트로 바꿔 내보내기
     - 녹음과 STT를 겹쳐서 돌려, 체감 딜레이를 줄인다.
+    - STT 앞에서 말소리가 없는 윈도우는 버리고 (speech_gate), 반복 오디오는 지난 자막을 재사용 (fingerprint)
+
+    streaming.sliding_window=True 이면:
+    - window_hop_sec 마다 최근 (hop + overlap) 초 윈도우를 디코딩
+    - post 단계가 단어 타임스탬프로 겹친 구간을 병합해 새로 확정된 단어만 자막으로 내보낸다
     """
     audio_cfg = app_cfg.audio
     stt_cfg = app_cfg.stt
+    stream_cfg = app_cfg.streaming
 
-    chunk_sec = audio_cfg.chunk_duration_sec
+    sliding = stream_cfg.sliding_window
+    if sliding:
+        hop_sec = stream_cfg.window_hop_sec
+        window_sec = hop_sec + stream_cfg.window_overlap_sec
+    else:
+        hop_sec = window_sec = audio_cfg.chunk_duration_sec
 
     print("=== discord_capcap :: STREAM (고정 청크, 브금/영상용 파이프라인) ===")
     print(f"- device: {audio_cfg.device_name}")
-    print(f"- chunk: {chunk_sec} sec")
-    print(f"- model: {stt_cfg.model_name}, device={stt_cfg.device}, lang={stt_cfg.language}")
+    if sliding:
+        print(f"- window: {window_sec} sec (hop {hop_sec} sec)")
+    else:
+        print(f"- chunk: {hop_sec} sec")
+    print(f"- model: {stt_cfg.model_name}, device={stt_cfg.device}, lang={stt_cfg.speech_language}")
     print()
 
-    device_index = resolve_device_index(audio_cfg)
-    stt_engine = create_stt_engine(stt_cfg)
-
-    audio_queue: "queue.Queue[AudioChunk]" = queue.Queue(maxsize=3)
-    stop_flag = threading.Event()
-
-    # ---------------- 캡처 스레드 ---------------- #
-    def capture_worker():
-        while not stop_flag.is_set():
-            start_t = time.time()
-            audio_data, sr = record_once_with_index(audio_cfg, device_index)
-            rec_dur = time.time() - start_t
-            print(f"[*] 캡처 완료: {rec_dur:.2f}s, samples={len(audio_data)}")
-
-            try:
-                audio_queue.put((audio_data, sr), timeout=1.0)
-            except queue.Full:
-                print("[WARN] fixed-mode audio_queue full, dropping chunk")
-
-    # ---------------- STT 스레드 ---------------- #
-    def stt_worker():
-        while not stop_flag.is_set():
-            try:
-                audio_data, sr = audio_queue.get(timeout=1.0)
-            except queue.Empty:
+    stt_engine, governor, speech = _engine_with_governor(app_cfg, stt_engine)
+    capture = open_continuous_capture(audio_cfg)
+    reader = capture.reader()
+    sr = capture.sample_rate
+    hop_samples = int(sr * hop_sec)
+    window_samples = int(sr * window_sec)
+    origin = reader.pos
+
+    def merge_windows(windows: "list[AudioWindow]") -> "list[AudioWindow]":
+        # 밀린 윈도우들을 링버퍼에서 하나의 긴 구간으로 다시 잘라 (복사) 한 번에 디코딩
+        end_sec = windows[-1].end_sec
+        start_sec = max(windows[0].start_sec, end_sec - bp_cfg.max_merge_sec)
+        end = origin + int(round(end_sec * sr))
+        snap = capture.ring.snapshot(origin + int(round(start_sec * sr)), end)
+        if snap is None:
+            return windows   # 링버퍼에서 이미 지나감 → 각자 복사본으로 디코딩
+        start, audio_data = snap
+
+        # 링버퍼에서 덮어써진 앞부분은 빠진다
+        start_sec = (start - origin) / sr
+        return [AudioWindow(
+            audio_data,
+            sr,
+            start_sec,
+            end_sec,
+            new_sec=min(sum(w.new_sec for w in windows), end_sec - start_sec),
+            created_at=windows[0].created_at,
+        )]
+
+    bp_cfg = app_cfg.backpressure
+    audio_queue: "BackpressureQueue[AudioWindow]" = BackpressureQueue(
+        policy=bp_cfg.bgm_policy,
+        latency_budget_sec=bp_cfg.latency_budget_sec,
+        maxsize=bp_cfg.max_queue,
+        merge_fn=merge_windows,
+    )
+
+    # ---------------- capture: hop 마다 윈도우 ---------------- #
+    def capture_windows(out, stop: threading.Event):
+        while not stop.is_set():
+            hop = reader.read(hop_samples, timeout=hop_sec + 1.0)
+            if hop is None:
+                if capture.ring.closed:
+                    return
+                continue
+            _observe_block(reader, sr, origin)
+
+            # 큐에서 기다리는 동안 링버퍼가 덮어쓸 수 있으므로 복사해서 넣는다 (윈도우 하나에 수백 KB)
+            snap = capture.ring.snapshot(max(origin, reader.pos - window_samples), reader.pos)
+            if snap is None:
+                print("[WARN] 캡처 윈도우가 링버퍼에서 이미 지나가 건너뜁니다.")
                 continue
+            start, audio_data = snap
+            end = start + len(audio_data)
 
-            stt_start = time.time()
+            if DEBUG_CAPTURE:
+                print(f"[*] 캡처 완료: {(end - start) / sr:.2f}s, samples={len(audio_data)}")
+
+            out(AudioWindow(
+                audio_data,
+                sr,
+                (start - origin) / sr,
+                (end - origin) / sr,
+                new_sec=hop_sec,
+            ))
+
+    # ---------------- stt ---------------- #
+    # 말소리가 없는 윈도우(무음 / 음악만)는 디코딩하지 않는다
+    gate = create_speech_gate(app_cfg.speech_gate, app_cfg.vad, sr)
+    margin_sec = stream_cfg.window_commit_margin_sec if sliding else 0.0
+
+    # 루프 BGM / 다시 재생한 클립: 지문이 과거 구간과 맞으면 그때 받아 적은 단어를 재사용
+    cache = create_transcript_cache(app_cfg.fingerprint, sr, margin_sec)
+
+    def has_speech(window: AudioWindow) -> bool:
+        audio = window.audio
+        if sliding:
+            # 이번 윈도우에서 확정될 수 있는 꼬리(새 오디오 + 앞뒤 commit margin)만 본다.
+            # 그 앞은 이전 윈도우들에서 이미 자막이 나간 구간
+            tail = int((window.new_sec + 2 * margin_sec) * window.sample_rate)
+            audio = audio[-tail:]
+        return gate.check(audio, len(window.audio) / window.sample_rate)
+
+    def transcribe(window: AudioWindow, out):
+        metrics.observe("stt_queue_depth", audio_queue.qsize())
+        if governor is not None:
+            governor.update_queue_depth(audio_queue.qsize())
+
+        t_start = time.monotonic()
+        if gate is not None and not has_speech(window):
             if DEBUG_STT:
-                print(f"[*] STT 호출(FIXED): duration≈{chunk_sec:.2f}s, samples={len(audio_data)}")
+                print(f"[*] STT 생략(말소리 없음): {window.start_sec:.2f}~{window.end_sec:.2f}s")
+            out((window, Transcript(text=""), t_start, time.monotonic()))
+            return
 
-            stt_text = stt_engine.transcribe(audio_data, sr).strip()
+        fp = None
+        if cache is not None:
+            fp = cache.fingerprint(window.audio, window.start_sec)
+            result = cache.lookup(fp, window.start_sec, window.end_sec, window.new_sec if sliding else None)
+            if result is not None:
+                cache.record(fp, window.start_sec, window.end_sec, result)
+                if DEBUG_STT:
+                    print(f"[*] STT 생략(지문 일치): {window.start_sec:.2f}~{window.end_sec:.2f}s → '{result.text}'")
+                out((window, result, t_start, time.monotonic()))
+                return
 
-            original, caption = process_caption_text(stt_text, app_cfg)
+        if DEBUG_STT:
+            print(
+                f"[*] STT 호출(FIXED): {window.start_sec:.2f}~{window.end_sec:.2f}s, "
+                f"samples={len(window.audio)}"
+            )
+
+        t_decode = time.monotonic()
+        if sliding:
+            result = stt_engine.transcribe_words(window.audio, window.sample_rate, speech=speech)
+        else:
+            result = stt_engine.transcribe(window.audio, window.sample_rate, speech=speech)
+        t_done = time.monotonic()
+
+        if gate is not None:
+            gate.observe_decode(len(window.audio) / window.sample_rate, t_done - t_decode)
+        if cache is not None:
+            cache.record(fp, window.start_sec, window.end_sec, result, t_done - t_decode)
+        out((window, result, t_start, t_done))
+
+    # ---------------- post ---------------- #
+    merger = WindowMerger(stream_cfg.window_commit_margin_sec)
+
+    def postprocess(item, out):
+        window, result, t_start, t_done = item
+
+        if sliding:
+            stt_text = merger.merge(result.words, window.start_sec, window.end_sec)
+            if not stt_text:
+                # 겹친 구간만 다시 읽혔거나 무음 → 화면은 그대로 둔다
+                return
+        else:
+            stt_text = result.text
+
+        # 무음 청크는 "..." 로 화면만 비운다 (번역/지연 기록 대상 아님)
+        original = stt_text.strip()
+        out(CaptionEvent(
+            "final", next_caption_id(), original or "...", original,
+            language=result.text_language,
+            audio_start=window.start_sec,
+            audio_end=window.end_sec,
+            timings={
+                "queue_wait": t_start - window.created_at,
+                "stt": t_done - t_start,
+                "e2e": time.monotonic() - window.created_at,   # 윈도우 끝 → 자막
+            },
+        ))
+
+    # ---------------- 그래프 ---------------- #
+    graph = StageGraph("bgm", app_cfg.runtime)
+    graph.add_source("capture", capture_windows, on_stop=capture.stop)
+    # 지문 캐시(decoded_upto, 색인)는 윈도우가 순서대로 와야 맞으므로 스레드 하나로 고정
+    graph.add_stage("stt", transcribe, inbox=audio_queue, stateful=True)
+    graph.add_stage("post", postprocess, stateful=True)
+    translator = _add_caption_stages(graph, app_cfg, caption_callback)
+
+    collectors = _register_collectors(stt_engine, speech, audio_queue, None, translator, graph, cache, gate)
+    graph.run(stop_event)
+
+    stats = audio_queue.stats()
+    if translator is not None:
+        stats.update(translator.stats())
+    if gate is not None:
+        stats["speech_gate"] = gate.stats()
+    if cache is not None:
+        stats["fingerprint"] = cache.stats()
+    _unregister_collectors(collectors)
+    print(f"[*] 브금/영상 모드 종료: {stats}")
+
+# ------------------- 3) 다중 화자 (소스별 VAD + 공유 STT 워커 풀) ------------------- #
+class MultiSourcePipeline:
+    """
+    여러 오디오 소스(장치 / push PCM)를 각자의 VAD 상태로 나누고,
+    확정된 발화는 하나의 BatchingScheduler(모델 하나 + 워커 풀)로 보낸다.
 
-            if not original:
-                if caption_callback:
-                    caption_callback("...", None)
-                continue
+    vad-<이름> 소스들 → stt(스케줄러에 제출) → translate → sink
+
+    - 소스마다 캡처+VAD 스레드 하나
+    - STT 는 화자별 라운드로빈으로 공정하게 배치 → 한 화자가 말을 많이 해도 다른 화자가 밀리지 않음
+    - 자막 이벤트에는 speaker 로 소스 이름이 붙는다
+    - 중간(partial) 자막은 단일 소스 대화 모드에서만 지원
+    - 실행 중(start() 뒤, stop() 전)에 add_source / remove_source 로 화자를 붙이고 뗄 수 있다
+    """
 
-            if caption_callback:
-                caption_callback(caption, original)
+    def __init__(
+        self,
+        app_cfg: AppConfig,
+        caption_callback: Optional[CaptionCallback] = None,
+        stt_engine=None,
+    ):
+        self.app_cfg = app_cfg
+        self.caption_callback = caption_callback
+        self.stt_engine, self.governor, self.speech = _engine_with_governor(app_cfg, stt_engine)
+
+        stt_cfg = app_cfg.stt
+        self.scheduler = BatchingScheduler(
+            self.stt_engine,
+            max_batch_size=stt_cfg.batch_max_size,
+            max_wait_ms=stt_cfg.batch_max_wait_ms,
+            num_workers=stt_cfg.num_workers,
+            speech=self.speech,
+        )
+
+        self.sources = {}
+        self.graph: Optional[StageGraph] = None
+        self.translator = None
+        self._collectors: dict = {}
+
+    def start(self) -> "MultiSourcePipeline":
+        self.scheduler.start()
+
+        self.graph = StageGraph("multi", self.app_cfg.runtime)
+        for src_cfg in self.app_cfg.sources:
+            self.add_source(src_cfg)
+
+        self.graph.add_stage("stt", self._transcribe, stateful=True, on_drain=lambda out: self.scheduler.stop())
+        self.translator = _add_caption_stages(self.graph, self.app_cfg, self.caption_callback)
+        self.graph.start()
+
+        self._collectors = _register_collectors(
+            self.stt_engine, self.speech, None, self.scheduler, self.translator, self.graph
+        )
+        print(f"[*] 다중 소스 시작: {', '.join(self.sources)}")
+        return self
+
+    def wait(self, stop_event: Optional[threading.Event] = None) -> None:
+        if self.graph is not None:
+            self.graph.wait(stop_event)
+
+    def stop(self) -> None:
+        if self.graph is not None:
+            self.graph.stop()
+            self.graph = None
+        self.translator = None
+        _unregister_collectors(self._collectors)
+
+    def add_source(self, src_cfg: SourceConfig) -> None:
+        """화자 하나를 연다. start() 뒤 (실행 중) 에만 부를 수 있고, 바로 VAD 스레드가 붙는다."""
+        if self.graph is None:
+            raise RuntimeError("add_source 는 start() 뒤, stop() 전에만 쓸 수 있습니다.")
+        if src_cfg.name in self.sources:
+            raise ValueError(f"이미 있는 소스 이름: {src_cfg.name}")
+
+        source = open_source(src_cfg, self.app_cfg.audio)
+        self.sources[src_cfg.name] = source
+        self.graph.add_source(
+            f"vad-{src_cfg.name}",
+            lambda out, stop: self._source_worker(src_cfg.name, source, out, stop),
+            on_stop=source.stop,
+        )
+
+    def remove_source(self, name: str) -> None:
+        """화자 하나를 닫는다. 말하던 중인 발화는 마저 자막으로 나온다."""
+        source = self.sources.pop(name, None)
+        if source is not None:
+            source.stop()
+            # 고정된 언어가 나간 화자의 것이었을 수 있으므로 남은 화자로 다시 감지 (이 파이프라인만)
+            self.speech.reset()
+
+    def push(self, name: str, pcm) -> None:
+        """kind="push" 소스에 PCM 을 밀어 넣는다. 없는 (닫힌) 소스면 KeyError."""
+        source = self.sources.get(name)
+        if source is None:
+            raise KeyError(f"없는 소스: {name}")
+        source.push(pcm)
+
+    # ---------------- 소스별 capture + VAD ---------------- #
+    def _source_worker(self, name: str, source, out, stop: threading.Event) -> None:
+        vad_cfg = self.app_cfg.vad
+        reader = source.reader()
+        sr = source.sample_rate
+        origin = reader.pos
+        block_samples = int(sr * vad_cfg.block_ms / 1000)
+        segmenter = VADSegmenter(vad_cfg, sr)
+
+        utterance = UtteranceBuffer(sr, _utterance_capacity_sec(vad_cfg))
+
+        def submit():
+            dur = utterance.duration_sec
+            if len(utterance) and dur >= vad_cfg.min_utter_sec:
+                audio_end = (reader.pos - origin) / sr
+                out((name, utterance.detach(), sr, audio_end - dur, time.monotonic()))
             else:
-                print(f">>> [CAPTION] {caption}")
-
-    t_cap = threading.Thread(target=capture_worker, daemon=True)
-    t_stt = threading.Thread(target=stt_worker, daemon=True)
-    t_cap.start()
-    t_stt.start()
-
-    try:
-        while True:
-            time.sleep(0.1)
-    except KeyboardInterrupt:
-        stop_flag.set()
-        t_cap.join(timeout=2.0)
-        t_stt.join(timeout=2.0)
-        print("[*] 브금/영상 모드 종료")
+                utterance.clear()
+
+        while not stop.is_set():
+            block = reader.read(block_samples, timeout=1.0)
+            if block is None:
+                if source.ring.closed:
+                    break
+                continue
+
+            t_vad = time.perf_counter()
+            vad_events = segmenter.process(block)
+            _observe_block(reader, sr, origin, time.perf_counter() - t_vad, source=name)
+
+            for kind, audio in vad_events:
+                if kind == "end":
+                    submit()
+                    continue
+
+                utterance.append(audio)
+                if utterance.duration_sec >= vad_cfg.max_utter_sec:
+                    submit()
+
+        # 종료 시 말하던 중인 발화도 마저 자막으로
+        submit()
+
+    # ---------------- stt ---------------- #
+    def _transcribe(self, item, out) -> None:
+        name, audio, sr, audio_start, t_submit = item
+        caption_id = next_caption_id()
+
+        if DEBUG_STT:
+            print(f"[STT] [{name}] START: duration={len(audio) / sr:.2f}s")
+
+        def on_result(result: Transcript, t_start: float):
+            t_done = time.monotonic()
+            original = result.text.strip()
+            if not original:
+                return
+
+            out(CaptionEvent(
+                "final", caption_id, original, original,
+                speaker=name,
+                language=result.text_language,
+                audio_start=audio_start,
+                audio_end=audio_start + len(audio) / sr,
+                timings={
+                    "queue_wait": t_start - t_submit,     # 스케줄러 배치 대기
+                    "stt": t_done - t_start,              # 배치 디코딩
+                    "e2e": time.monotonic() - t_submit,   # endpoint → 자막 (submit 은 endpoint 직후)
+                },
+            ))
+
+        self.scheduler.submit(audio, sr, on_result, source=name)
+        if self.governor is not None:
+            self.governor.update_queue_depth(self.scheduler.pending())
+
+
+def run_stream_pipeline_multi(
+    app_cfg: AppConfig,
+    caption_callback: Optional[CaptionCallback] = None,
+    stt_engine=None,
+    stop_event: Optional[threading.Event] = None,
+) -> None:
+    if not app_cfg.sources:
+        raise ValueError("다중 소스 모드에는 app_cfg.sources 가 필요합니다.")
+
+    print("=== STREAM (다중 화자, 소스별 VAD + 공유 STT) ===")
+
+    pipeline = MultiSourcePipeline(app_cfg, caption_callback, stt_engine=stt_engine).start()
+    pipeline.wait(stop_event)
+    pipeline.stop()
+    print("[*] 다중 화자 모드 종료")
+
 
 # 기존 코드와의 호환을 위해 기본 run_stream_pipeline은 VAD 버전으로 매핑
 def run_stream_pipeline(
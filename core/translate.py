@@ -1,7 +1,22 @@
 # core/translate.py
 
-from transformers import pipeline
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
 from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from core.config import TranslateConfig
+
+_DEFAULT_CFG = TranslateConfig()
+
+
+def _model_name(src: str, tgt: str) -> str:
+    return f"Helsinki-NLP/opus-mt-{src}-{tgt}"
+
 
 # -------------------------------
 # 내부 캐시: 언어쌍별 번역기
@@ -11,8 +26,11 @@ from functools import lru_cache
 def _load_translator(src: str, tgt: str):
     """
     HuggingFace 번역 파이프라인 로드 (언어쌍별 캐싱)
+    transformers / torch 는 이 백엔드를 쓸 때만 import 한다 (ctranslate2 백엔드 메모리 / 시작 시간 절약)
     """
-    model_name = f"Helsinki-NLP/opus-mt-{src}-{tgt}"
+    from transformers import pipeline
+
+    model_name = _model_name(src, tgt)
     print(f"[TRANSLATE] loading model: {model_name}")
 
     return pipeline(
@@ -21,16 +39,223 @@ def _load_translator(src: str, tgt: str):
     )
 
 
+class _CTranslate2Translator:
+    """
+    CTranslate2 로 변환한 opus-mt 모델 (faster-whisper 와 같은 런타임).
+    토크나이저(sentencepiece)는 원래 HF 모델 것을 그대로 쓴다.
+    """
+
+    def __init__(self, src: str, tgt: str, model_dir: str, device: str, compute_type: str, threads: int):
+        import ctranslate2
+        from transformers import AutoTokenizer
+
+        model_name = _model_name(src, tgt)
+        if not os.path.isdir(model_dir):
+            # 처음 한 번만: HF 모델을 CTranslate2 형식으로 변환 (torch 필요)
+            print(f"[TRANSLATE] converting {model_name} → {model_dir} ({compute_type})")
+            from ctranslate2.converters import TransformersConverter
+            TransformersConverter(model_name).convert(model_dir, quantization=compute_type)
+
+        print(f"[TRANSLATE] loading CTranslate2 model: {model_dir} ({device}, {compute_type})")
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.translator = ctranslate2.Translator(
+            model_dir,
+            device=device,
+            compute_type=compute_type,
+            intra_threads=threads,
+        )
+
+    def translate(self, text: str, beam_size: int) -> str:
+        tokens = self.tokenizer.convert_ids_to_tokens(self.tokenizer.encode(text))
+        results = self.translator.translate_batch(
+            [tokens],
+            beam_size=beam_size,
+            max_decoding_length=400,
+        )
+        out_ids = self.tokenizer.convert_tokens_to_ids(results[0].hypotheses[0])
+        return self.tokenizer.decode(out_ids, skip_special_tokens=True)
+
+
+@lru_cache(maxsize=8)
+def _load_ct2_translator(
+    src: str,
+    tgt: str,
+    model_dir: str,
+    device: str,
+    compute_type: str,
+    threads: int,
+) -> _CTranslate2Translator:
+    return _CTranslate2Translator(src, tgt, model_dir, device, compute_type, threads)
+
+
+# -------------------------------
+# 문장 단위 결과 캐시
+# -------------------------------
+
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키용 정규화: 유니코드 NFKC + 공백 정리."""
+    return _WS_RE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+class TranslationCache:
+    """
+    (src, tgt, 정규화된 원문) → 번역문 LRU 캐시.
+    "고맙습니다", "좋습니다" 처럼 자막에서 계속 반복되는 짧은 문장은 모델을 다시 돌리지 않는다.
+    """
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[tuple[str, str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple[str, str, str]) -> Optional[str]:
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: tuple[str, str, str], value: str) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {
+            "translate_cache_size": len(self._items),
+            "translate_cache_hits": self.hits,
+            "translate_cache_misses": self.misses,
+        }
+
+
+# (backend, cache_size) → 결과 캐시. 크기는 만들 때 한 번만 정하고, 설정이 다르면 캐시도 따로 쓴다
+_caches: Dict[Tuple[str, int], TranslationCache] = {}
+_caches_lock = threading.Lock()
+
+
+def _get_cache(cfg: TranslateConfig) -> Optional[TranslationCache]:
+    if cfg.cache_size <= 0:
+        return None
+    key = (cfg.backend, cfg.cache_size)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = TranslationCache(cfg.cache_size)
+        return cache
+
+
+# 모델이 없는 (backend, src, tgt). lru_cache 는 예외를 캐시하지 않으므로,
+# 없는 언어쌍(예: opus-mt-ko-ja)을 자막마다 다시 찾지 않도록 따로 기억한다.
+_unavailable_pairs: set[tuple[str, str, str]] = set()
+# 일시적으로 로드에 실패한 (backend, src, tgt) → (다시 시도할 시각, 다음 대기 시간).
+# 네트워크 타임아웃 / CUDA OOM / 변환 중단 같은 실패는 재시작 없이 나중에 다시 시도한다.
+_retry_at: Dict[Tuple[str, str, str], Tuple[float, float]] = {}
+_unavailable_lock = threading.Lock()
+
+_MAX_RETRY_BACKOFF_SEC = 600.0
+
+
+def _is_missing_model(e: BaseException) -> bool:
+    """
+    HF 에 모델이 아예 없다는 오류인지 판단한다.
+    transformers 는 RepositoryNotFoundError 를 OSError 로 감싸서 다시 던지므로 __cause__ 까지 본다.
+    연결 실패 / 타임아웃도 OSError 이므로 OSError 는 "모델 식별자가 아님" 메시지일 때만 인정한다.
+    """
+    try:
+        from huggingface_hub.utils import RepositoryNotFoundError
+    except ImportError:
+        RepositoryNotFoundError = None
+
+    err: Optional[BaseException] = e
+    while err is not None:
+        if RepositoryNotFoundError is not None and isinstance(err, RepositoryNotFoundError):
+            return True
+        err = err.__cause__
+
+    return isinstance(e, OSError) and "is not a valid model identifier" in str(e)
+
+
+def _mark_failed(pair: Tuple[str, str, str], e: Exception, cfg: TranslateConfig) -> None:
+    src, tgt = pair[1], pair[2]
+    if _is_missing_model(e):
+        with _unavailable_lock:
+            _unavailable_pairs.add(pair)
+            _retry_at.pop(pair, None)
+        print(f"[TRANSLATE][WARN] {src}→{tgt} 번역 모델이 없어 원문으로 표시합니다: {e}")
+        return
+
+    with _unavailable_lock:
+        _, backoff = _retry_at.get(pair, (0.0, cfg.retry_backoff_sec))
+        _retry_at[pair] = (time.monotonic() + backoff, min(backoff * 2, _MAX_RETRY_BACKOFF_SEC))
+    print(
+        f"[TRANSLATE][WARN] {src}→{tgt} 번역 모델 로드 실패, {backoff:.0f}초 동안 원문으로 표시하고 다시 시도합니다: {e}"
+    )
+
+
+def _get_translator(src: str, tgt: str, cfg: TranslateConfig):
+    if cfg.backend == "ctranslate2":
+        return _load_ct2_translator(
+            src,
+            tgt,
+            cfg.ct2_model_dir.format(src=src, tgt=tgt),
+            cfg.ct2_device,
+            cfg.ct2_compute_type,
+            cfg.ct2_threads,
+        )
+    return _load_translator(src, tgt)
+
+
+def _run_translator(translator, text: str, cfg: TranslateConfig) -> str:
+    if cfg.backend == "ctranslate2":
+        return translator.translate(text, beam_size=cfg.beam_size)
+
+    result = translator(
+        text,
+        max_length=400,
+        clean_up_tokenization_spaces=True,
+    )
+    return result[0]["translation_text"]
+
+
+def is_pair_available(src: str, tgt: str, cfg: Optional[TranslateConfig] = None) -> bool:
+    """
+    모델이 없는 언어쌍이거나, 로드 실패 후 대기 중인 언어쌍이면 False.
+    (아직 시도하지 않은 쌍은 True)
+    """
+    cfg = cfg or _DEFAULT_CFG
+    if src == "auto":
+        return False
+    pair = (cfg.backend, src, tgt)
+    if pair in _unavailable_pairs:
+        return False
+    retry = _retry_at.get(pair)
+    return retry is None or time.monotonic() >= retry[0]
+
+
 # -------------------------------
 # 외부에서 호출되는 함수
 # -------------------------------
 
-def translate_text(text: str, src: str, tgt: str) -> str:
+def translate_text(text: str, src: str, tgt: str, cfg: Optional[TranslateConfig] = None) -> str:
     """
-    STT 결과를 로컬 HuggingFace 모델로 번역한다.
+    STT 결과를 로컬 opus-mt 모델로 번역한다.
     - 완전 무료
     - 오프라인 가능
+    - cfg.backend 로 transformers / ctranslate2(int8) 선택
     """
+    cfg = cfg or _DEFAULT_CFG
 
     if not text or not text.strip():
         return ""
@@ -39,16 +264,46 @@ def translate_text(text: str, src: str, tgt: str) -> str:
     if src == tgt or tgt == "same":
         return text
 
+    # 감지 언어가 없거나 모델이 없는 언어쌍은 원문 그대로
+    if not is_pair_available(src, tgt, cfg):
+        return text
+
+    normalized = normalize_text(text)
+    key = (src, tgt, normalized)
+    cache = _get_cache(cfg)
+
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None:
+        return cached
+
     try:
-        translator = _load_translator(src, tgt)
-        result = translator(
-            text,
-            max_length=400,
-            clean_up_tokenization_spaces=True,
-        )
-        return result[0]["translation_text"]
+        translator = _get_translator(src, tgt, cfg)
+    except Exception as e:
+        _mark_failed((cfg.backend, src, tgt), e, cfg)
+        return text
+
+    if (cfg.backend, src, tgt) in _retry_at:
+        with _unavailable_lock:
+            _retry_at.pop((cfg.backend, src, tgt), None)
 
+    try:
+        translated = _run_translator(translator, normalized, cfg)
     except Exception as e:
         print(f"[TRANSLATE][ERROR] {e}")
         # 실패 시 원문 그대로 반환 (서비스 죽지 않게)
         return text
+
+    if cache is not None:
+        cache.put(key, translated)
+    return translated
+
+
+def translation_cache_stats() -> dict:
+    """모든 결과 캐시의 합계."""
+    with _caches_lock:
+        caches = list(_caches.values())
+    totals = {"translate_cache_size": 0, "translate_cache_hits": 0, "translate_cache_misses": 0}
+    for cache in caches:
+        for k, v in cache.stats().items():
+            totals[k] += v
+    return totals
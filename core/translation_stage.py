@@ -0,0 +1,144 @@
+# core/translation_stage.py
+
+import threading
+import time
+from collections import deque
+from dataclasses import replace
+from typing import Deque, Optional, Tuple
+
+from core.config import AppConfig, TranslateConfig
+from core.events import CaptionCallback, CaptionEvent
+from core.translate import translate_text, translation_cache_stats
+from stt.engine import whisper_translates
+
+
+class TranslationStage:
+    """
+    STT 뒤에 붙는 비동기 번역 단계 (자체 큐 + 워커 스레드).
+
+    - STT 쪽은 원문 자막을 바로 내보내고 submit() 만 호출한다 → 번역 지연이 STT 처리량에 영향 없음
+    - 번역이 끝나면 같은 caption_id 로 kind="translation" 이벤트를 보내 자막을 교체한다
+    - 원본 언어는 자막마다 Whisper 가 감지한 event.language 를 쓴다 (없으면 src).
+      이미 자막 언어로 말한 발화는 번역하지 않는다
+    - 번역이 밀려 큐가 maxsize 를 넘으면 가장 오래된 요청을 버린다 (그 자막은 원문으로 남음)
+    """
+
+    def __init__(
+        self,
+        src: str,
+        tgt: str,
+        emit: CaptionCallback,
+        maxsize: int = 32,
+        cfg: Optional[TranslateConfig] = None,
+    ):
+        self.src = src
+        self.tgt = tgt
+        self.emit = emit
+        self.maxsize = maxsize
+        self.cfg = cfg
+
+        self._items: Deque[Tuple[CaptionEvent, float]] = deque()
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+        self.translated = 0
+        self.skipped = 0
+        self.dropped = 0
+
+    def start(self) -> "TranslationStage":
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._worker, name="translate", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """이미 들어온 요청은 번역하고 종료."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _source_language(self, event: CaptionEvent) -> str:
+        return event.language or self.src
+
+    def submit(self, event: CaptionEvent) -> None:
+        if not event.original:
+            return
+
+        src = self._source_language(event)
+        if src in ("", "auto") or src == self.tgt:
+            self.skipped += 1
+            return
+
+        with self._cond:
+            self._items.append((event, time.monotonic()))
+            if len(self._items) > self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+                print(f"[WARN] 번역 지연: 오래된 번역 요청을 버림 (dropped_total={self.dropped})")
+            self._cond.notify()
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def stats(self) -> dict:
+        return {
+            "translated": self.translated,
+            "translation_skipped": self.skipped,
+            "translation_dropped": self.dropped,
+            "translation_queue_depth": len(self._items),
+            **translation_cache_stats(),
+        }
+
+    # ---------------- worker ---------------- #
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._items or self._stopping)
+                if not self._items:
+                    return
+                event, queued_at = self._items.popleft()
+
+            t_start = time.monotonic()
+            translated = translate_text(
+                event.original, src=self._source_language(event), tgt=self.tgt, cfg=self.cfg
+            )
+            t_done = time.monotonic()
+
+            # 실패하면 translate_text 가 원문을 돌려주므로 이미 떠 있는 자막 그대로
+            if not translated or translated == event.original:
+                continue
+
+            self.translated += 1
+            timings = dict(event.timings)
+            timings["translate_wait"] = t_start - queued_at
+            timings["translate"] = t_done - t_start
+            if "e2e" in timings:
+                timings["e2e"] += t_done - queued_at
+
+            try:
+                self.emit(replace(event, kind="translation", text=translated, timings=timings))
+            except Exception as e:
+                print(f"[TRANSLATE][ERROR] 자막 콜백 실패: {e}")
+
+
+def create_translation_stage(
+    app_cfg: AppConfig,
+    emit: CaptionCallback,
+) -> Optional[TranslationStage]:
+    """
+    자막 언어가 음성 언어와 다를 때만 번역 단계를 만들어 시작한다. (필요 없으면 None)
+    음성 언어가 auto 면 자막마다 감지된 언어로 번역한다.
+    영어 자막은 Whisper 가 직접 번역하므로 만들지 않는다.
+    """
+    src = app_cfg.stt.speech_language
+    tgt = app_cfg.stt.caption_language
+    if tgt in ("same", src) or whisper_translates(app_cfg.stt):
+        return None
+
+    return TranslationStage(src, tgt, emit, cfg=app_cfg.translate).start()
@@ -0,0 +1,70 @@
+# core/window_merge.py
+
+import re
+from collections import deque
+from typing import List
+
+from stt.engine import Word
+
+
+_PUNCT_RE = re.compile(r"[^\w]+", re.UNICODE)
+
+
+def _norm(word: str) -> str:
+    return _PUNCT_RE.sub("", word).lower()
+
+
+class WindowMerger:
+    """
+    겹치는 슬라이딩 윈도우의 단어 가설을 하나의 자막 흐름으로 합친다.
+
+    - 단어 시간을 스트림 절대 시간으로 바꿔, 이미 내보낸 구간(committed_end) 이후의 단어만 사용
+    - 윈도우 오른쪽 끝 commit_margin_sec 안의 단어는 잘린 단어일 수 있어 다음 윈도우로 미룸
+    - 타임스탬프가 조금 흔들려 같은 단어가 다시 나오면, 직전에 내보낸 꼬리와
+      새 단어들의 앞부분을 텍스트로 비교해 중복을 제거
+    """
+
+    def __init__(self, commit_margin_sec: float = 0.6, dedup_max_words: int = 6):
+        self.commit_margin_sec = commit_margin_sec
+        self.dedup_max_words = dedup_max_words
+        self.committed_end = 0.0
+        self._recent: "deque[str]" = deque(maxlen=dedup_max_words)
+
+    def reset(self) -> None:
+        self.committed_end = 0.0
+        self._recent.clear()
+
+    def merge(self, words: List[Word], window_start: float, window_end: float) -> str:
+        """
+        윈도우 하나의 단어 가설을 넣고, 새로 확정된 텍스트를 돌려준다 (없으면 "").
+        """
+        stable_end = window_end - self.commit_margin_sec
+
+        fresh = []
+        for w in words:
+            start = window_start + w.start
+            end = window_start + w.end
+            if (start + end) / 2 <= self.committed_end:
+                continue
+            if end > stable_end:
+                break
+            fresh.append((end, w.text))
+
+        if not fresh:
+            return ""
+
+        # 직전 꼬리와 겹치는 앞부분 제거
+        normed = [_norm(text) for _, text in fresh]
+        recent = list(self._recent)
+        for k in range(min(len(recent), len(normed)), 0, -1):
+            if recent[-k:] == normed[:k]:
+                fresh = fresh[k:]
+                normed = normed[k:]
+                break
+
+        if not fresh:
+            return ""
+
+        self.committed_end = fresh[-1][0]
+        self._recent.extend(n for n in normed if n)
+        return "".join(text for _, text in fresh).strip()
@@ -1,2 +1,28 @@
-import torch
-torch.cuda.is_available()
\ No newline at end of file
+# main_console.py
+#
+# 이 머신에서 STT 가 어떤 설정으로 돌지 확인한다.
+# - CUDA / 연산 형식 / 스레드 수 감지 결과
+# - --probe: 후보 모델 RTF 를 재서 model_name="auto" 가 고를 모델 (결과는 캐시에 저장)
+
+import argparse
+
+from core.config import load_default_config
+from stt.autoconfig import autoconfigure, detect_hardware
+
+
+def main():
+    parser = argparse.ArgumentParser(description="STT hardware check")
+    parser.add_argument("--probe", action="store_true", help="모델 자동 선택 측정까지 실행")
+    args = parser.parse_args()
+
+    hw = detect_hardware()
+    print(f"[HW] device={hw.device}, compute_type={hw.compute_type}, cuda_devices={hw.cuda_devices}")
+    print(f"[HW] cores={hw.cores}, cpu_threads={hw.cpu_threads}, num_workers={hw.num_workers}")
+
+    if args.probe:
+        stt_cfg = load_default_config().stt
+        autoconfigure(stt_cfg, hw)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,40 @@
 # main_overlay.py
+import json
 import sys
 import subprocess
 import threading
-from datetime import datetime
+import time
 
 from PyQt6 import QtWidgets
 
+from core.caption_sink import open_caption_sink
+from core.config import load_default_config
+from core.ipc import IpcServer
 from ui.overlay import CaptionOverlay
 
 
-def start_worker(mode: str, speech_lang: str, caption_lang: str):
+def start_worker(mode: str, speech_lang: str, caption_lang: str, ipc_port: int):
+    """
+    상주 모드(--serve)로 워커를 띄운다.
+    모델은 워커가 살아 있는 동안 한 번만 로드되고, 세션은 stdin 명령으로 시작/전환한다.
+    자막 이벤트는 ipc_port 의 전용 채널로 받고, stdout 은 로그로만 쓴다.
+    """
     python_exe = sys.executable
 
     cmd = [
         python_exe,
         "-u",
         "stt_worker.py",
+        "--serve",
         "--mode", mode,
         "--speech-lang", speech_lang,
         "--caption-lang", caption_lang,
+        "--ipc-port", str(ipc_port),
     ]
 
     return subprocess.Popen(
         cmd,
+        stdin=subprocess.PIPE,
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
         text=True,
@@ -31,9 +43,22 @@ def start_worker(mode: str, speech_lang: str, caption_lang: str):
     )
 
 
-def main():
-    caption_log: list[str] = []
+_stdin_lock = threading.Lock()
+
+
+def send_command(proc, **msg) -> None:
+    if proc is None or proc.poll() is not None or proc.stdin is None:
+        return
+    try:
+        # IPC 리더 스레드와 GUI 스레드가 같이 쓴다
+        with _stdin_lock:
+            proc.stdin.write(json.dumps(msg) + "\n")
+            proc.stdin.flush()
+    except OSError as e:
+        print(f"[UI] 워커 명령 전송 실패: {e}")
 
+
+def main():
     app = QtWidgets.QApplication(sys.argv)
 
     overlay = CaptionOverlay()
@@ -62,38 +87,104 @@ def main():
     caption_sel = input("번호 입력 (기본 1): ").strip()
     caption_lang = {"2": "ko", "3": "en"}.get(caption_sel, "same")
 
-    # ================= 종료 시 저장 =================
-    def save_caption_log():
-        if not caption_log:
-            return
+    # ================= 자막 기록 =================
+    # 확정 자막을 바로바로 JSONL 로 남기고, 종료 시 .srt / .vtt 로 내보낸다
+    caption_sink = open_caption_sink(load_default_config().caption_log)
+    if caption_sink is not None:
+        app.aboutToQuit.connect(caption_sink.close)
 
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"captions_{ts}.txt"
+    # ================= 모드 전환 (모델 재로드 없이) =================
+    session = {"mode": mode, "speech_lang": speech_lang, "caption_lang": caption_lang}
+    worker = {"proc": None}
 
-        with open(filename, "w", encoding="utf-8") as f:
-            for line in caption_log:
-                f.write(line + "\n")
+    def on_mode_change(new_mode: str):
+        session["mode"] = new_mode
+        if caption_sink is not None:
+            caption_sink.new_session()
+        send_command(worker["proc"], cmd="reconfigure", mode=new_mode)
+        print(f"[UI] 모드 전환 요청: {new_mode}")
 
-        print(f"[UI] 자막 로그 저장 완료: {filename}")
+    overlay.mode_change_requested.connect(on_mode_change)
 
-    app.aboutToQuit.connect(save_caption_log)
+    def stop_worker():
+        send_command(worker["proc"], cmd="quit")
+
+    app.aboutToQuit.connect(stop_worker)
+
+    # ================= Worker IPC / 로그 =================
+    ipc = IpcServer()
+
+    # caption_id → (수신 시각, IPC 지연). 화면에 반영되면 워커로 지연을 돌려보낸다
+    received: dict[int, tuple[float, float]] = {}
+    max_received = 256   # 반영 알림을 못 받은 항목이 쌓이지 않도록 오래된 것부터 버린다
+    received_lock = threading.Lock()   # reader 스레드와 UI 스레드가 같이 쓴다
+
+    def on_rendered(caption_id: int):
+        with received_lock:
+            entry = received.pop(caption_id, None)
+        if entry is None:
+            return
+        recv_at, ipc_sec = entry
+        send_command(
+            worker["proc"],
+            cmd="observe",
+            caption_id=caption_id,
+            values={"ipc": ipc_sec, "render": time.perf_counter() - recv_at},
+        )
+
+    overlay.caption_rendered.connect(on_rendered)
+
+    def pump_logs(proc):
+        assert proc.stdout is not None
+        for line in proc.stdout:
+            print("[WORKER]", line.rstrip("\n"))
+
+    def handle_message(proc, msg: dict):
+        msg_type = msg.get("type")
+
+        if msg_type == "ready":
+            if caption_sink is not None:
+                caption_sink.new_session()
+            send_command(proc, cmd="start", **session)
+        elif msg_type == "caption":
+            text = msg.get("text", "").strip()
+            if text and msg.get("speaker"):
+                text = f"{msg['speaker']}: {text}"
+
+            caption_id = int(msg["caption_id"])
+            is_final = msg.get("kind") != "partial"   # final / translation
+            if "sent_at" in msg:
+                entry = (time.perf_counter(), max(0.0, time.time() - msg["sent_at"]))
+                with received_lock:
+                    received.pop(caption_id, None)   # 다시 넣어 가장 최근 항목으로
+                    received[caption_id] = entry
+                    while len(received) > max_received:
+                        del received[next(iter(received))]
+            overlay.caption_event.emit(caption_id, text, is_final)
+
+            if is_final and caption_sink is not None:
+                caption_sink.write_record(msg)
 
-    # ================= Worker stdout reader =================
     def reader():
         while True:
-            proc = start_worker(mode, speech_lang, caption_lang)
+            proc = start_worker(
+                session["mode"], session["speech_lang"], session["caption_lang"], ipc.port
+            )
+            worker["proc"] = proc
             print("[UI] STT Worker Started")
+            threading.Thread(target=pump_logs, args=(proc,), daemon=True).start()
 
-            assert proc.stdout is not None
-            for line in proc.stdout:
-                line = line.rstrip("\n")
-                print("[WORKER]", line)
+            # 워커가 모델을 올리는 동안 접속을 기다린다 (그 사이 죽으면 다시 띄움)
+            channel = None
+            while channel is None and proc.poll() is None:
+                channel = ipc.accept(timeout=1.0)
 
-                if line.startswith(">>> CAPTION:"):
-                    caption = line.replace(">>> CAPTION:", "", 1).strip()
-                    overlay.caption_changed.emit(caption)
-                    caption_log.append(caption)
+            if channel is not None:
+                for msg in channel:
+                    handle_message(proc, msg)
+                channel.close()
 
+            proc.wait()
             print("[UI] Worker exited. Restarting...")
 
     threading.Thread(target=reader, daemon=True).start()
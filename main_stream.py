@@ -20,11 +20,11 @@ def main():
     choice = input("번호 입력 (1/2, 기본 1): ").strip()
 
     if choice == "2":
-        cfg.stt.language = "en"
+        cfg.stt.speech_language = "en"
     else:
-        cfg.stt.language = "ko"
+        cfg.stt.speech_language = "ko"
 
-    print(f"[*] 선택된 언어: {cfg.stt.language}")
+    print(f"[*] 선택된 언어: {cfg.stt.speech_language}")
 
     audio_cfg = cfg.audio
     print(f"[*] 현재 오디오 장치 부분 이름: '{audio_cfg.device_name}'")
@@ -0,0 +1,233 @@
+# stt/autoconfig.py
+
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import List, Optional
+
+import numpy as np
+
+# 후보 모델의 상대 비용 (파라미터 수 비율, tiny = 1). 작은 것부터 재어 올라갈 때 다음 모델 RTF 예상에 쓴다
+MODEL_COST = {
+    "tiny": 1.0,
+    "base": 1.9,
+    "small": 6.3,
+    "medium": 19.7,
+    "large-v3": 39.7,
+}
+
+PROBE_SAMPLE_RATE = 16000
+
+
+@dataclass
+class HardwareInfo:
+    device: str            # "cuda" | "cpu"
+    compute_type: str
+    cpu_threads: int
+    num_workers: int
+    cores: int
+    cuda_devices: int = 0
+
+
+def _cpu_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:   # Windows / macOS
+        return os.cpu_count() or 1
+
+
+def detect_hardware() -> HardwareInfo:
+    """
+    CTranslate2(faster-whisper 백엔드)로 GPU 와 지원 연산 형식을 확인해 기본값을 고른다.
+    - GPU: float16 (안 되면 int8_float16 → int8), 워커 2개로 배치 + 중간 자막을 겹쳐 돌림
+    - CPU: int8 (AVX2/AVX-512 VNNI 경로), 코어를 워커 수로 나눠 cpu_threads
+    """
+    cores = _cpu_cores()
+
+    try:
+        import ctranslate2
+        cuda_devices = ctranslate2.get_cuda_device_count()
+    except Exception as e:   # ctranslate2 없음 / CUDA 런타임 오류
+        print(f"[HW][WARN] CUDA 확인 실패 → CPU 사용: {e}")
+        ctranslate2 = None
+        cuda_devices = 0
+
+    if cuda_devices > 0:
+        supported = ctranslate2.get_supported_compute_types("cuda")
+        compute_type = next(
+            (ct for ct in ("float16", "int8_float16", "int8") if ct in supported),
+            "float32",
+        )
+        return HardwareInfo("cuda", compute_type, cpu_threads=min(4, cores), num_workers=2,
+                            cores=cores, cuda_devices=cuda_devices)
+
+    supported = ctranslate2.get_supported_compute_types("cpu") if ctranslate2 is not None else set()
+    compute_type = "int8" if "int8" in supported else "float32"
+    num_workers = 2 if cores >= 8 else 1
+    return HardwareInfo("cpu", compute_type, cpu_threads=max(1, cores // num_workers),
+                        num_workers=num_workers, cores=cores)
+
+
+def _probe_audio(seconds: float) -> np.ndarray:
+    # 말소리 비슷한 합성 신호 (배음 + 음절 속도 진폭 변조). 실제 RTF 의 대략적인 대용
+    t = np.arange(int(seconds * PROBE_SAMPLE_RATE)) / PROBE_SAMPLE_RATE
+    f0 = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / PROBE_SAMPLE_RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None)
+    noise = 0.005 * np.random.default_rng(0).standard_normal(len(t))
+    return (0.1 * voice * envelope + noise).astype(np.float32)
+
+
+def measure_rtf(model_name: str, hw: HardwareInfo, seconds: float = 8.0) -> float:
+    """모델 하나를 올려 probe 오디오를 두 번(첫 번째는 워밍업) 디코딩한 RTF."""
+    from faster_whisper import WhisperModel
+
+    model = WhisperModel(model_name, device=hw.device, compute_type=hw.compute_type, cpu_threads=hw.cpu_threads)
+    audio = _probe_audio(seconds)
+
+    def decode():
+        segments, _ = model.transcribe(audio, language="en", beam_size=1, temperature=0.0)
+        list(segments)
+
+    decode()
+    started = time.perf_counter()
+    decode()
+    rtf = (time.perf_counter() - started) / seconds
+    del model
+    return rtf
+
+
+def pick_model(candidates: List[str], hw: HardwareInfo, target_rtf: float) -> tuple:
+    """
+    작은 모델부터 재어 올라가며 target_rtf 를 만족하는 가장 큰 모델을 고른다.
+    - 다음 모델의 예상 RTF(지금 RTF × 비용 비율)가 목표의 두 배를 넘으면 받아 보지도 않는다
+    - 하나도 만족하지 못하면 가장 작은 모델 (그 모델의 측정 RTF 와 함께)
+    → (모델, 그 모델의 RTF, 측정 실패 여부). 실패가 있었으면 캐시에 남기지 않는다
+    """
+    ordered = sorted(candidates, key=lambda m: MODEL_COST.get(m, 10.0))
+    best, best_rtf = ordered[0], None
+    prev_name, prev_rtf = None, None
+    failed = False
+
+    for name in ordered:
+        if prev_rtf is not None:
+            predicted = prev_rtf * MODEL_COST.get(name, 10.0) / MODEL_COST.get(prev_name, 10.0)
+            if predicted > 2 * target_rtf:
+                print(f"[HW] {name}: 예상 RTF {predicted:.2f} → 측정 생략")
+                break
+
+        try:
+            rtf = measure_rtf(name, hw)
+        except Exception as e:
+            print(f"[HW][WARN] {name} 측정 실패: {e}")
+            failed = True
+            break
+
+        print(f"[HW] {name}: RTF {rtf:.3f} (목표 {target_rtf})")
+        if rtf > target_rtf:
+            if name == best:
+                # 느린 하드웨어: 가장 작은 모델도 목표를 못 맞춰도 결과는 측정된 것 (다음 실행에 다시 재지 않음)
+                best_rtf = rtf
+                print(f"[HW][WARN] 가장 작은 모델({name})도 목표 RTF 를 넘습니다.")
+            break
+        best, best_rtf = name, rtf
+        prev_name, prev_rtf = name, rtf
+
+    return best, best_rtf, failed
+
+
+def _cache_key(hw: HardwareInfo, candidates: List[str], target_rtf: float) -> str:
+    try:
+        import faster_whisper
+        version = getattr(faster_whisper, "__version__", "")
+    except ImportError:
+        version = ""
+    return json.dumps(
+        [hw.device, hw.compute_type, hw.cpu_threads, hw.cores, hw.cuda_devices, sorted(candidates), target_rtf, version]
+    )
+
+
+def _load_cache(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(path: str, cache: dict) -> None:
+    dirname = os.path.dirname(path)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def autoconfigure(cfg, hw: Optional[HardwareInfo] = None) -> None:
+    """
+    STTConfig 의 "auto" / 0 항목을 하드웨어에 맞게 채운다 (cfg 를 제자리에서 바꿈).
+    - device / compute_type / cpu_threads / num_workers: detect_hardware()
+    - model_name="auto": 마이크로 벤치마크로 목표 RTF 를 지키는 가장 큰 모델,
+      결과는 하드웨어별로 autoconfig_cache 에 남겨 다음 실행부터는 측정하지 않는다
+    """
+    hw = hw or detect_hardware()
+
+    if cfg.device == "cuda" and hw.device != "cuda":
+        print("[HW][WARN] CUDA 장치가 없어 CPU 로 실행합니다.")
+        cfg.device = "auto"
+        if cfg.compute_type in ("float16", "int8_float16"):
+            cfg.compute_type = "auto"
+
+    if cfg.device == "auto":
+        cfg.device = hw.device
+    if cfg.compute_type == "auto":
+        cfg.compute_type = hw.compute_type if cfg.device == hw.device else "int8"
+    if not cfg.cpu_threads:
+        cfg.cpu_threads = hw.cpu_threads
+    if not cfg.num_workers:
+        cfg.num_workers = hw.num_workers
+
+    if cfg.model_name == "auto":
+        probe_hw = HardwareInfo(cfg.device, cfg.compute_type, cfg.cpu_threads, 1, hw.cores, hw.cuda_devices)
+        key = _cache_key(probe_hw, cfg.model_candidates, cfg.target_rtf)
+        cache = _load_cache(cfg.autoconfig_cache) if cfg.autoconfig_cache else {}
+
+        if key in cache:
+            cfg.model_name = cache[key]["model_name"]
+            print(f"[HW] 캐시된 모델 선택: {cfg.model_name} (RTF {cache[key].get('rtf')})")
+        else:
+            print(f"[HW] 모델 선택 측정 중... (후보 {', '.join(cfg.model_candidates)}, 목표 RTF {cfg.target_rtf})")
+            cfg.model_name, rtf, failed = pick_model(cfg.model_candidates, probe_hw, cfg.target_rtf)
+            # 측정이 실패했으면(오프라인 / CUDA 오류 등) 이번 실행만 그 결과로, 캐시에는 남기지 않는다
+            if cfg.autoconfig_cache and not failed:
+                cache[key] = {"model_name": cfg.model_name, "rtf": rtf, "probed_at": time.time(), "hardware": asdict(probe_hw)}
+                try:
+                    _save_cache(cfg.autoconfig_cache, cache)
+                except OSError as e:
+                    print(f"[HW][WARN] 측정 결과 저장 실패: {e}")
+
+    _fit_fallback_model(cfg)
+
+    print(
+        f"[HW] STT 설정: model={cfg.model_name}, device={cfg.device}, compute_type={cfg.compute_type}, "
+        f"cpu_threads={cfg.cpu_threads}, num_workers={cfg.num_workers}, fallback={cfg.fallback_model_name or '-'}"
+    )
+
+
+def _fit_fallback_model(cfg) -> None:
+    """
+    governor 의 fallback-model 단계는 지금 모델보다 가벼워야 의미가 있다.
+    fallback 이 같거나 무거우면 후보 중 바로 아래 모델로 바꾸고, 더 작은 모델이 없으면 그 단계를 끈다.
+    """
+    chosen = MODEL_COST.get(cfg.model_name)
+    fallback = cfg.fallback_model_name
+    if chosen is None or not fallback or MODEL_COST.get(fallback, 0.0) < chosen:
+        return
+
+    smaller = [m for m in cfg.model_candidates if MODEL_COST.get(m, chosen) < chosen]
+    cfg.fallback_model_name = max(smaller, key=MODEL_COST.get) if smaller else None
+    print(f"[HW] fallback 모델 {fallback} 은 {cfg.model_name} 보다 가볍지 않아 → {cfg.fallback_model_name or '사용 안 함'}")
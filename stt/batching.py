@@ -0,0 +1,176 @@
+# stt/batching.py
+
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from core.metrics import metrics
+from stt.engine import SessionLanguage, Transcript
+
+
+# (결과, 이 발화가 든 배치의 디코딩 시작 시각 time.monotonic) → 배치 대기와 디코딩 시간을 나눠 잴 수 있다
+ResultCallback = Callable[[Transcript, float], None]
+
+
+@dataclass
+class _Request:
+    audio: np.ndarray
+    sample_rate: int
+    on_result: ResultCallback
+    source: str
+
+
+class BatchingScheduler:
+    """
+    확정된 발화를 모아 engine.transcribe_batch 로 한꺼번에 디코딩하는 STT 스케줄러.
+
+    - 첫 발화가 들어오면 max_wait_ms 동안(또는 max_batch_size 가 찰 때까지) 더 모은다
+    - 결과는 발화마다 submit 때 넘긴 콜백으로 돌려준다 (워커 스레드에서 호출)
+    - 한가할 때는 발화 하나가 바로 단독 디코딩되므로 지연이 거의 늘지 않는다
+    - source(화자)별로 큐를 따로 두고 배치를 채울 때 라운드로빈으로 한 개씩 꺼낸다.
+      말이 많은 화자가 있어도 다른 화자의 발화가 뒤로 밀려 굶지 않는다.
+    - num_workers 개의 워커가 같은 엔진(모델 하나)을 공유한다
+    - speech: 이 스케줄러를 쓰는 세션의 언어 설정 / 언어 고정 상태 (엔진은 세션끼리 공유)
+    """
+
+    def __init__(
+        self,
+        engine,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 30.0,
+        num_workers: int = 1,
+        speech: Optional[SessionLanguage] = None,
+    ):
+        self.engine = engine
+        self.speech = speech
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_sec = max_wait_ms / 1000.0
+        self.num_workers = max(1, num_workers)
+
+        self._queues: "OrderedDict[str, deque[_Request]]" = OrderedDict()
+        self._pending = 0
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._threads: List[threading.Thread] = []
+
+        self.batches = 0
+        self.utterances = 0
+
+    def start(self) -> "BatchingScheduler":
+        if not self._threads:
+            self._stopping = False
+            for i in range(self.num_workers):
+                t = threading.Thread(target=self._worker, name=f"stt-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """이미 들어온 발화는 처리하고 종료."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+
+        for t in self._threads:
+            t.join(timeout=timeout)
+        self._threads = []
+
+    def submit(
+        self,
+        audio: np.ndarray,
+        sample_rate: int,
+        on_result: ResultCallback,
+        source: str = "",
+    ) -> None:
+        with self._cond:
+            self._queues.setdefault(source, deque()).append(
+                _Request(audio, sample_rate, on_result, source)
+            )
+            self._pending += 1
+            self._cond.notify_all()
+
+    def pending(self) -> int:
+        return self._pending
+
+    def stats(self) -> dict:
+        return {
+            "pending": self._pending,
+            "batches": self.batches,
+            "utterances": self.utterances,
+        }
+
+    def wait_for_capacity(self, max_pending: int, timeout: Optional[float] = None) -> bool:
+        """
+        대기 중인 발화가 max_pending 미만이 될 때까지 기다린다.
+        앞단이 밀린 작업을 자기 큐(backpressure 정책 적용 대상)에 두도록 할 때 쓴다.
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending < max_pending, timeout=timeout)
+
+    # ---------------- worker ---------------- #
+    def _take_round_robin(self, batch: List[_Request]) -> None:
+        """소스마다 한 개씩 돌아가며 배치를 채운다. (self._cond 잡은 상태에서 호출)"""
+        while self._pending and len(batch) < self.max_batch_size:
+            source, q = next(iter(self._queues.items()))
+            batch.append(q.popleft())
+            self._pending -= 1
+            self._cond.notify_all()
+
+            # 방금 꺼낸 소스는 맨 뒤로 보내 다음 차례를 다른 소스에게 준다
+            if q:
+                self._queues.move_to_end(source)
+            else:
+                del self._queues[source]
+
+    def _collect(self) -> List[_Request]:
+        batch: List[_Request] = []
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending or self._stopping)
+            if not self._pending:
+                return batch
+
+            deadline = time.monotonic() + self.max_wait_sec
+            self._take_round_robin(batch)
+
+            while len(batch) < self.max_batch_size and not self._stopping:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(timeout=remaining)
+                self._take_round_robin(batch)
+
+        return batch
+
+    def _worker(self) -> None:
+        while True:
+            batch = self._collect()
+            if not batch:
+                return
+
+            # 샘플레이트가 섞이면 따로 디코딩
+            by_sr: dict[int, List[_Request]] = {}
+            for r in batch:
+                by_sr.setdefault(r.sample_rate, []).append(r)
+
+            for sr, reqs in by_sr.items():
+                metrics.observe("stt_batch_size", len(reqs))
+                started_at = time.monotonic()
+                try:
+                    transcripts = self.engine.transcribe_batch([r.audio for r in reqs], sr, speech=self.speech)
+                except Exception as e:
+                    print(f"[STT][ERROR] batch({len(reqs)}) 디코딩 실패: {e}")
+                    continue
+
+                with self._cond:
+                    self.batches += 1
+                    self.utterances += len(reqs)
+
+                for r, transcript in zip(reqs, transcripts):
+                    try:
+                        r.on_result(transcript, started_at)
+                    except Exception as e:
+                        print(f"[STT][ERROR] 결과 콜백 실패: {e}")
@@ -1,8 +1,112 @@
 # stt/engine.py
 
 import os
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from typing import List, Optional
+
 import numpy as np
 from faster_whisper import WhisperModel
+from faster_whisper.audio import pad_or_trim
+from faster_whisper.tokenizer import Tokenizer
+
+from core.metrics import metrics
+from stt.autoconfig import autoconfigure
+from stt.governor import DECODE_LEVELS, DecodeLevel
+from stt.language import LanguageTracker
+
+# 무음 판정: no_speech 확률이 높고 평균 logprob 도 낮으면 빈 결과 (faster-whisper 의 segment 판정과 같은 규칙)
+NO_SPEECH_THRESHOLD = 0.1
+LOG_PROB_THRESHOLD = -1.0
+
+
+def _is_no_speech(no_speech_prob: float, avg_logprob: float) -> bool:
+    return no_speech_prob > NO_SPEECH_THRESHOLD and avg_logprob < LOG_PROB_THRESHOLD
+
+
+@dataclass
+class Word:
+    start: float   # 입력 오디오 기준 초
+    end: float
+    text: str      # faster-whisper 그대로 (앞 공백 포함)
+
+
+@dataclass
+class Transcript:
+    """
+    디코딩 결과 하나.
+    language 는 Whisper 가 실제로 쓴 언어 (auto 면 감지 결과, 아니면 지정한 언어).
+    """
+
+    text: str
+    language: str = ""
+    language_probability: float = 0.0
+    avg_logprob: float = 0.0
+    words: List[Word] = field(default_factory=list)   # transcribe_words 일 때만
+    task: str = "transcribe"
+
+    @property
+    def text_language(self) -> str:
+        """text 의 언어 (task="translate" 면 말한 언어와 상관없이 영어)."""
+        return "en" if self.task == "translate" else self.language
+
+
+def whisper_translates(cfg) -> bool:
+    """
+    자막 언어가 영어이고 말하는 언어가 영어가 아니면 Whisper 가 바로 번역한다.
+    이때는 별도 번역 모델(core.translate)을 올리지 않는다.
+    """
+    return (
+        getattr(cfg, "whisper_translate", False)
+        and cfg.caption_language == "en"
+        and cfg.speech_language != "en"
+    )
+
+
+class SessionLanguage:
+    """
+    세션(파이프라인) 하나의 언어 설정과 auto 모드 언어 고정 상태.
+
+    엔진(모델)은 상주 워커 / 여러 CaptionSession 이 같이 쓰므로, 말하는 언어 / task / 언어 고정은
+    엔진 설정이 아니라 세션 설정에서 만들어 디코딩할 때마다 넘긴다.
+    """
+
+    def __init__(self, stt_cfg):
+        self.speech_language = stt_cfg.speech_language
+        self.task = "translate" if whisper_translates(stt_cfg) else "transcribe"
+
+        # auto 모드에서 확실해진 언어는 고정해 발화마다 감지하지 않는다
+        self.tracker: Optional[LanguageTracker] = None
+        if self.speech_language == "auto" and stt_cfg.language_lock:
+            self.tracker = LanguageTracker(
+                lock_count=stt_cfg.lang_lock_count,
+                lock_prob=stt_cfg.lang_lock_prob,
+                recheck_every=stt_cfg.lang_recheck_every,
+                unlock_logprob=stt_cfg.lang_unlock_logprob,
+            )
+
+    def language(self) -> Optional[str]:
+        """다음 디코딩에 넘길 언어. None 이면 Whisper 가 감지한다."""
+        if self.speech_language != "auto":
+            return self.speech_language
+        if self.tracker is not None:
+            return self.tracker.language()
+        return None
+
+    def observe(self, result: "Transcript", detected: bool) -> None:
+        if self.tracker is None or not result.text:
+            return
+        self.tracker.observe(result.language, result.language_probability, result.avg_logprob, detected)
+
+    def reset(self) -> None:
+        if self.tracker is not None:
+            self.tracker.reset()
+
+    def stats(self) -> dict:
+        if self.tracker is None:
+            return {"locked_language": self.speech_language if self.speech_language != "auto" else ""}
+        return self.tracker.stats()
 
 
 class FasterWhisperEngine:
@@ -14,33 +118,283 @@ class FasterWhisperEngine:
             f"({cfg.model_name}, device={cfg.device}, compute_type={cfg.compute_type})"
         )
 
-        self.model = WhisperModel(
-            cfg.model_name,
-            device=cfg.device,
-            compute_type=cfg.compute_type,
-        )
+        try:
+            self.model = self._load_model(cfg.model_name)
+        except (RuntimeError, ValueError) as e:
+            if cfg.device != "cuda":
+                raise
+            # 드라이버 / cuDNN 문제 등으로 GPU 를 못 쓰면 CPU int8 로
+            print(f"[WARN] CUDA 로 모델을 올리지 못해 CPU(int8)로 전환: {e}")
+            cfg.device, cfg.compute_type = "cpu", "int8"
+            self.model = self._load_model(cfg.model_name)
 
         print("[*] STT 모델 로드 완료")
 
-    def transcribe(self, audio: np.ndarray, sample_rate: int) -> str:
-        segments, info = self.model.transcribe(
+        # 디코딩 품질 단계 (DecodeGovernor 가 부하에 따라 바꾼다)
+        self.decode_level: DecodeLevel = DECODE_LEVELS[0]
+        self.governor = None
+        self._fallback_model = None
+        self._fallback_loader = None
+        self._fallback_lock = threading.Lock()
+
+    def _load_model(self, model_name: str) -> WhisperModel:
+        return WhisperModel(
+            model_name,
+            device=self.cfg.device,
+            compute_type=self.cfg.compute_type,
+            cpu_threads=self.cfg.cpu_threads,
+            num_workers=self.cfg.num_workers,
+        )
+
+    def warmup(self, sample_rate: int = 16000) -> None:
+        """
+        첫 자막이 늦지 않도록 모델 로드 직후 짧은 무음으로 한 번 디코딩해 둔다.
+        (CUDA 커널 / 메모리 풀 초기화)
+        """
+        started = time.perf_counter()
+        dummy = np.zeros(sample_rate, dtype=np.float32)
+        language = self.cfg.speech_language if self.cfg.speech_language != "auto" else "en"
+        list(self.model.transcribe(dummy, language=language, beam_size=1)[0])
+        print(f"[*] STT 워밍업 완료 ({time.perf_counter() - started:.2f}s)")
+
+    def set_decode_level(self, level: DecodeLevel) -> None:
+        self.decode_level = level
+
+    def preload_fallback_model(self) -> None:
+        """
+        fallback 모델을 백그라운드 스레드에서 올린다 (이미 올렸거나 올리는 중이면 무시).
+        governor 가 fallback 바로 앞 단계로 내려가면 부른다 → 디코딩 스레드가 로드를 기다리지 않음.
+        """
+        if not self.cfg.fallback_model_name:
+            return
+        with self._fallback_lock:
+            if self._fallback_model is not None or self._fallback_loader is not None:
+                return
+            self._fallback_loader = threading.Thread(target=self._load_fallback, name="stt-fallback-load", daemon=True)
+            self._fallback_loader.start()
+
+    def _load_fallback(self) -> None:
+        print(f"[*] fallback 모델 미리 로드 중... ({self.cfg.fallback_model_name})")
+        try:
+            model = self._load_model(self.cfg.fallback_model_name)
+        except Exception as e:
+            print(f"[WARN] fallback 모델 로드 실패 → 기본 모델로 계속: {e}")
+            return
+        with self._fallback_lock:
+            self._fallback_model = model
+        print("[*] fallback 모델 로드 완료")
+
+    def _active_model(self) -> WhisperModel:
+        if not self.decode_level.use_fallback_model:
+            return self.model
+
+        # 아직 로드 중이면 (다 올라올 때까지) 기본 모델로 가장 싼 설정만 적용
+        if self._fallback_model is None:
+            self.preload_fallback_model()
+            return self.model
+        return self._fallback_model
+
+    def _observe(self, audio_sec: float, started: float) -> None:
+        stt_sec = time.perf_counter() - started
+        if audio_sec > 0:
+            metrics.observe("stt_decode_sec", stt_sec)
+            metrics.observe("stt_rtf", stt_sec / audio_sec)
+        if self.governor is not None:
+            self.governor.observe_decode(audio_sec, stt_sec)
+
+    def _session(self, speech: Optional[SessionLanguage]) -> SessionLanguage:
+        # 세션을 안 넘기면 엔진 설정 그대로 (언어 고정 없이, 단독 실행 / 테스트용)
+        if speech is not None:
+            return speech
+        stt_cfg = replace(self.cfg, language_lock=False) if self.cfg.language_lock else self.cfg
+        return SessionLanguage(stt_cfg)
+
+    def transcribe(
+        self, audio: np.ndarray, sample_rate: int, fast: bool = False, speech: Optional[SessionLanguage] = None
+    ) -> Transcript:
+        """
+        fast=True 는 말하는 도중의 중간 자막용 디코딩.
+        - greedy, 타임스탬프 없음 → 같은 발화를 자주 다시 디코딩해도 부담이 적다
+        speech: 호출한 세션의 언어 설정 / 언어 고정 상태 (SessionLanguage)
+        """
+        speech = self._session(speech)
+        model = self.model
+        if fast:
+            decode_opts = dict(
+                beam_size=1,
+                best_of=1,
+                without_timestamps=True,
+                condition_on_previous_text=False,
+            )
+        else:
+            level = self.decode_level
+            model = self._active_model()
+            decode_opts = dict(
+                beam_size=level.beam_size,
+                best_of=level.best_of,
+                without_timestamps=level.without_timestamps,
+            )
+
+        task = speech.task
+        language = speech.language()
+        started = time.perf_counter()
+        segments, info = model.transcribe(
+            audio,
+            language=language,
+            task=task,
+            temperature=0.0,
+            no_speech_threshold=NO_SPEECH_THRESHOLD,
+            log_prob_threshold=LOG_PROB_THRESHOLD,
+            **decode_opts,
+        )
+
+        segments = list(segments)
+        result = Transcript(
+            "".join(seg.text for seg in segments).strip(),
+            info.language,
+            info.language_probability,
+            avg_logprob=_mean_logprob(segments),
+            task=task,
+        )
+
+        # 중간 자막 디코딩은 부하 측정·언어 추적에서 뺀다 (같은 발화를 여러 번 디코딩하므로)
+        if not fast:
+            self._observe(len(audio) / sample_rate, started)
+            speech.observe(result, detected=language is None)
+        return result
+
+    def transcribe_words(
+        self, audio: np.ndarray, sample_rate: int, speech: Optional[SessionLanguage] = None
+    ) -> Transcript:
+        """
+        단어 단위 타임스탬프와 함께 디코딩 (슬라이딩 윈도우 병합용).
+        """
+        speech = self._session(speech)
+        level = self.decode_level
+        task = speech.task
+        language = speech.language()
+        started = time.perf_counter()
+        segments, info = self._active_model().transcribe(
             audio,
-            language=None if self.cfg.speech_language == "auto" else self.cfg.speech_language,
-            task="transcribe",      # ⚠ 번역 아님
-            beam_size=5,
-            best_of=5,
+            language=language,
+            task=task,
+            beam_size=level.beam_size,
+            best_of=level.best_of,
             temperature=0.0,
-            no_speech_threshold=0.1,
+            no_speech_threshold=NO_SPEECH_THRESHOLD,
+            log_prob_threshold=LOG_PROB_THRESHOLD,
+            word_timestamps=True,
+            condition_on_previous_text=False,
+        )
+
+        segments = list(segments)
+        words = [
+            Word(start=w.start, end=w.end, text=w.word)
+            for seg in segments
+            for w in (seg.words or [])
+        ]
+        self._observe(len(audio) / sample_rate, started)
+
+        result = Transcript(
+            "".join(w.text for w in words).strip(),
+            info.language,
+            info.language_probability,
+            avg_logprob=_mean_logprob(segments),
+            words=words,
+            task=task,
+        )
+        speech.observe(result, detected=language is None)
+        return result
+
+    def transcribe_batch(
+        self, audios: List[np.ndarray], sample_rate: int, speech: Optional[SessionLanguage] = None
+    ) -> List[Transcript]:
+        """
+        여러 발화를 한 번의 encode/generate 배치로 디코딩.
+
+        - 발화마다 30초 창으로 패딩한 멜 특징을 쌓아 CTranslate2 에 한 번에 넣는다
+          (BatchedInferencePipeline 이 내부에서 쓰는 경로와 같음)
+        - auto 모드에서는 발화마다 언어를 따로 감지한다
+        - 발화는 30초 이하라고 가정 (대화 모드 max_utter_sec=15)
+        - governor 의 디코딩 단계(beam, 타임스탬프)와 무음 판정은 transcribe 와 같다
+          (best_of 는 temperature > 0 샘플링에서만 쓰이므로 temperature=0 인 여기서는 해당 없음)
+        """
+        speech = self._session(speech)
+        if len(audios) == 1:
+            return [self.transcribe(audios[0], sample_rate, speech=speech)]
+
+        level = self.decode_level
+        wm = self._active_model()
+        started = time.perf_counter()
+        features = np.stack([pad_or_trim(wm.feature_extractor(audio)) for audio in audios])
+        encoder_output = wm.encode(features)
+
+        language = speech.language()
+        if language is None:
+            detected = wm.model.detect_language(encoder_output)
+            languages = [result[0][0][2:-2] for result in detected]   # "<|ko|>" → "ko"
+            language_probs = [result[0][1] for result in detected]
+        else:
+            languages = [language] * len(audios)
+            language_probs = [1.0] * len(audios)
+
+        task = speech.task
+        tokenizers = {
+            lang: Tokenizer(wm.hf_tokenizer, wm.model.is_multilingual, task=task, language=lang)
+            for lang in set(languages)
+        }
+        prompts = [
+            wm.get_prompt(tokenizers[lang], [], without_timestamps=level.without_timestamps)
+            for lang in languages
+        ]
+
+        results = wm.model.generate(
+            encoder_output,
+            prompts,
+            beam_size=level.beam_size,
+            patience=1.0,
+            length_penalty=1.0,
+            max_length=448,
+            suppress_blank=True,
+            suppress_tokens=[-1],
+            return_scores=True,
+            return_no_speech_prob=True,
         )
 
-        text = "".join(seg.text for seg in segments).strip()
-        return text
+        transcripts = []
+        for lang, prob, result in zip(languages, language_probs, results):
+            tokenizer = tokenizers[lang]
+            tokens = result.sequences_ids[0]
+
+            avg_logprob = result.scores[0] * len(tokens) / (len(tokens) + 1)
+            if _is_no_speech(result.no_speech_prob, avg_logprob):
+                transcripts.append(Transcript("", lang, prob, avg_logprob, task=task))
+                continue
+
+            # 타임스탬프 토큰(eot 뒤 번호)은 빼고 텍스트만
+            text = tokenizer.decode([t for t in tokens if t < tokenizer.eot]).strip()
+            transcripts.append(Transcript(text, lang, prob, avg_logprob, task=task))
+
+        self._observe(sum(len(a) for a in audios) / sample_rate, started)
+        for result in transcripts:
+            speech.observe(result, detected=language is None)
+        return transcripts
+
+
+def _mean_logprob(segments) -> float:
+    if not segments:
+        return 0.0
+    return sum(seg.avg_logprob for seg in segments) / len(segments)
 
 
 # ---------------- factory ---------------- #
 
 def create_stt_engine(cfg):
+    """
+    "auto" 설정(device / compute_type / cpu_threads / num_workers / model_name)을 하드웨어에 맞게 채운 뒤 엔진을 만든다.
+    """
     if cfg.engine_type == "faster-whisper":
+        autoconfigure(cfg)
         return FasterWhisperEngine(cfg)
 
     raise ValueError(f"지원하지 않는 STT 엔진: {cfg.engine_type}")
@@ -0,0 +1,135 @@
+# stt/governor.py
+
+import threading
+from dataclasses import dataclass
+from typing import List
+
+from core.config import GovernorConfig
+
+
+@dataclass(frozen=True)
+class DecodeLevel:
+    name: str
+    beam_size: int
+    best_of: int
+    without_timestamps: bool = False
+    use_fallback_model: bool = False
+
+
+# 0 이 최고 품질, 뒤로 갈수록 싸다
+DECODE_LEVELS: List[DecodeLevel] = [
+    DecodeLevel("beam5", beam_size=5, best_of=5),
+    DecodeLevel("beam3", beam_size=3, best_of=3),
+    DecodeLevel("greedy", beam_size=1, best_of=1),
+    DecodeLevel("greedy-notime", beam_size=1, best_of=1, without_timestamps=True),
+    DecodeLevel("fallback-model", beam_size=1, best_of=1, without_timestamps=True, use_fallback_model=True),
+]
+
+
+class DecodeGovernor:
+    """
+    STT 실시간 계수(RTF = 디코딩 시간 / 오디오 길이)와 큐 깊이를 보고 디코딩 품질을 조절한다.
+
+    - RTF EMA 가 rtf_high 를 넘거나 큐가 queue_high 이상 쌓이면 한 단계 낮춤
+    - RTF 가 rtf_low 아래이고 큐가 비어 있는 상태가 recover_count 번 이어지면 한 단계 올림
+    - 단계를 바꾼 직후 cooldown 번의 관측 동안은 다시 바꾸지 않는다 (출렁임 방지)
+    - 단계가 바뀌면 engine.set_decode_level() 로 바로 반영
+    - fallback 모델 바로 앞 단계에 들어서면 engine.preload_fallback_model() 로 미리 올려 둔다
+    """
+
+    def __init__(self, cfg: GovernorConfig, engine, has_fallback_model: bool = False):
+        self.cfg = cfg
+        self.engine = engine
+
+        self.levels = DECODE_LEVELS if has_fallback_model else [
+            lv for lv in DECODE_LEVELS if not lv.use_fallback_model
+        ]
+        self.level = 0
+
+        self.rtf_ema = 0.0
+        self.queue_depth = 0
+        self.level_changes = 0
+        self._observations = 0
+        self._since_change = 0
+        self._calm_streak = 0
+        self._lock = threading.Lock()
+
+        engine.set_decode_level(self.levels[0])
+
+    @property
+    def current(self) -> DecodeLevel:
+        return self.levels[self.level]
+
+    def update_queue_depth(self, depth: int) -> None:
+        self.queue_depth = depth
+
+    def observe_decode(self, audio_sec: float, stt_sec: float) -> None:
+        if audio_sec <= 0:
+            return
+
+        rtf = stt_sec / audio_sec
+        with self._lock:
+            a = self.cfg.ema_alpha
+            self.rtf_ema = rtf if self._observations == 0 else (1 - a) * self.rtf_ema + a * rtf
+            self._observations += 1
+            self._since_change += 1
+            self._decide()
+
+    def _decide(self) -> None:
+        cfg = self.cfg
+        overloaded = self.rtf_ema > cfg.rtf_high or self.queue_depth >= cfg.queue_high
+        calm = self.rtf_ema < cfg.rtf_low and self.queue_depth <= cfg.queue_low
+
+        self._calm_streak = self._calm_streak + 1 if calm else 0
+
+        if self._since_change < cfg.cooldown:
+            return
+
+        if overloaded and self.level < len(self.levels) - 1:
+            self._set_level(self.level + 1)
+        elif self._calm_streak >= cfg.recover_count and self.level > 0:
+            self._set_level(self.level - 1)
+
+    def _set_level(self, level: int) -> None:
+        old = self.levels[self.level]
+        self.level = level
+        self.level_changes += 1
+        self._since_change = 0
+        self._calm_streak = 0
+
+        new = self.levels[level]
+        print(
+            f"[GOV] decode level {old.name} → {new.name} "
+            f"(rtf={self.rtf_ema:.2f}, queue={self.queue_depth})"
+        )
+        self.engine.set_decode_level(new)
+
+        if level == len(self.levels) - 2 and self.levels[-1].use_fallback_model:
+            preload = getattr(self.engine, "preload_fallback_model", None)
+            if preload is not None:
+                preload()
+
+    def metrics(self) -> dict:
+        return {
+            "decode_level": self.level,
+            "decode_level_name": self.current.name,
+            "stt_rtf_ema": round(self.rtf_ema, 4),
+            "stt_queue_depth": self.queue_depth,
+            "decode_level_changes": self.level_changes,
+        }
+
+
+def attach_governor(engine, cfg: GovernorConfig):
+    """
+    설정이 켜져 있으면 엔진에 governor 를 붙여 돌려준다. (꺼져 있으면 None)
+    """
+    if not cfg.enabled:
+        return None
+
+    governor = DecodeGovernor(
+        cfg,
+        engine,
+        has_fallback_model=bool(getattr(engine.cfg, "fallback_model_name", None)),
+    )
+    engine.governor = governor
+    return governor
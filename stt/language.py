@@ -0,0 +1,107 @@
+# stt/language.py
+
+import threading
+from typing import Optional
+
+
+class LanguageTracker:
+    """
+    auto 모드용 언어 고정기 (세션마다 하나, stt.engine.SessionLanguage 가 가진다).
+
+    - 감지 확률이 lock_prob 이상인 같은 언어가 lock_count 번 이어지면 그 언어로 고정
+    - 고정된 동안은 language() 가 그 언어를 돌려줘 Whisper 가 감지를 건너뛴다
+      → 발화마다 드는 감지 비용이 없어지고, 짧은 말에서 ko/en 이 튀는 일도 없다
+    - recheck_every 번째 발화마다 한 번씩 다시 감지해 본다
+    - 고정된 언어로 디코딩한 결과의 avg_logprob 가 unlock_logprob 아래로 떨어지면 (말하는 언어가
+      바뀐 신호) 고정을 풀고 다시 감지부터 시작
+    """
+
+    def __init__(
+        self,
+        lock_count: int = 3,
+        lock_prob: float = 0.8,
+        recheck_every: int = 20,
+        unlock_logprob: float = -1.0,
+    ):
+        self.lock_count = lock_count
+        self.lock_prob = lock_prob
+        self.recheck_every = recheck_every
+        self.unlock_logprob = unlock_logprob
+
+        self.locked: Optional[str] = None
+        self._candidate: Optional[str] = None
+        self._streak = 0
+        self._since_check = 0
+        self._lock = threading.Lock()
+
+        self.detections = 0
+        self.skipped_detections = 0
+
+    def language(self) -> Optional[str]:
+        """다음 디코딩에 넘길 언어. None 이면 Whisper 가 감지한다."""
+        with self._lock:
+            if self.locked is None:
+                return None
+            if self.recheck_every > 0 and self._since_check >= self.recheck_every:
+                return None
+            return self.locked
+
+    def observe(self, language: str, probability: float, avg_logprob: float, detected: bool) -> None:
+        """
+        확정 발화 하나의 디코딩 결과를 반영한다.
+        detected=True 면 Whisper 가 직접 감지한 결과, False 면 고정 언어로 디코딩한 결과.
+        """
+        if not language:
+            return
+
+        with self._lock:
+            if not detected:
+                self.skipped_detections += 1
+                self._since_check += 1
+                if avg_logprob < self.unlock_logprob:
+                    print(f"[LANG] '{self.locked}' 신뢰도 하락 (avg_logprob={avg_logprob:.2f}) → 다시 감지")
+                    self._unlock()
+                return
+
+            self.detections += 1
+            confident = probability >= self.lock_prob
+
+            if self.locked is not None:
+                # 주기적 재확인
+                self._since_check = 0
+                if confident and language != self.locked:
+                    print(f"[LANG] 재확인 결과 '{self.locked}' → '{language}' ({probability:.2f}) → 다시 감지")
+                    self._unlock()
+                    self._candidate, self._streak = language, 1
+                return
+
+            if not confident:
+                self._streak = 0
+                return
+
+            if language == self._candidate:
+                self._streak += 1
+            else:
+                self._candidate, self._streak = language, 1
+
+            if self._streak >= self.lock_count:
+                self.locked = language
+                self._since_check = 0
+                print(f"[LANG] 언어 고정: {language} (확률 {probability:.2f}, {self._streak}회 연속)")
+
+    def reset(self) -> None:
+        with self._lock:
+            self._unlock()
+
+    def _unlock(self) -> None:
+        self.locked = None
+        self._candidate = None
+        self._streak = 0
+        self._since_check = 0
+
+    def stats(self) -> dict:
+        return {
+            "locked_language": self.locked or "",
+            "language_detections": self.detections,
+            "language_detections_skipped": self.skipped_detections,
+        }
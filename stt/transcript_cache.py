@@ -0,0 +1,166 @@
+# stt/transcript_cache.py
+
+import threading
+from collections import deque
+from typing import Optional, Tuple
+
+import numpy as np
+
+from audio.fingerprint import HOP_SEC, Fingerprint, FingerprintIndex, fingerprint
+from core.config import FingerprintConfig
+from stt.engine import Transcript, Word
+
+
+class TranscriptCache:
+    """
+    브금/영상 모드에서 반복되는 오디오(루프 BGM, 다시 재생한 클립)의 STT 를 건너뛴다.
+
+    - 지나간 오디오의 지문(스펙트럼 피크 해시)과 받아 적은 단어를 스트림 시간축으로 history_sec 만큼 기억
+    - 새 윈도우의 지문이 과거 구간과 일정한 시간 차로 충분히 맞으면, 그 구간의 단어를
+      시간 차만큼 옮겨 디코딩 결과 대신 돌려준다 (윈도우 경계가 달라도 됨)
+    - 재사용한 결과도 다시 기록하므로 루프가 계속 돌면 계속 맞는다
+    - 단어 타임스탬프가 없는 고정 청크 모드는 청크 하나를 한 덩어리로 기억하고,
+      경계가 align_tolerance_sec 안으로 맞을 때만 재사용한다
+    """
+
+    def __init__(self, cfg: FingerprintConfig, sample_rate: int, commit_margin_sec: float = 0.0):
+        self.cfg = cfg
+        self.sample_rate = sample_rate
+        self.commit_margin_sec = commit_margin_sec
+
+        self.index = FingerprintIndex()
+        # (절대 시작, 절대 끝, 텍스트, 언어, task, 단어 단위 여부)
+        self._entries: "deque[Tuple[float, float, str, str, str, bool]]" = deque()
+        self._decoded_upto = 0.0
+        self._indexed_upto = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.skipped_audio_sec = 0.0
+        self._stt_sec = 0.0         # 실제로 디코딩한 시간 / 오디오 길이 (절약한 시간 추정용)
+        self._stt_audio_sec = 0.0
+
+    def fingerprint(self, audio: np.ndarray, start_sec: float) -> Fingerprint:
+        return fingerprint(audio, self.sample_rate, start_sec, self.cfg.peaks_per_frame, self.cfg.fan_out)
+
+    # ---------------- 조회 ---------------- #
+    def lookup(
+        self, fp: Fingerprint, start_sec: float, end_sec: float, new_sec: Optional[float] = None
+    ) -> Optional[Transcript]:
+        """
+        new_sec: 윈도우 끝에서 이번에 새로 들어온 길이. 이 구간(이번에 자막이 확정될 곳)도
+        따로 충분히 맞아야 한다 (루프가 끝나고 다른 오디오로 넘어가는 윈도우를 걸러냄).
+        """
+        if len(fp) < self.cfg.min_hashes:
+            return None   # 무음 / 피크가 거의 없는 구간은 지문으로 가리지 않는다
+
+        window_frames = int(round((end_sec - start_sec) / HOP_SEC))
+        with self._lock:
+            # 지금 윈도우와 겹치지 않는 (윈도우 길이 이상 지난) 과거만
+            found = self.index.match(fp, max_delta=-window_frames)
+            if found is None:
+                return None
+
+            delta, matched = found
+            if not self._enough(matched):
+                return None
+            if new_sec is not None:
+                lo = int((end_sec - new_sec - self.commit_margin_sec) / HOP_SEC)
+                hi = int((end_sec - self.commit_margin_sec) / HOP_SEC)
+                fresh = (fp.frames >= lo) & (fp.frames < hi)
+                if fresh.sum() >= self.cfg.min_hashes and not self._enough(matched[fresh]):
+                    return None
+
+            shift = delta * HOP_SEC
+            src_start, src_end = start_sec + shift, end_sec + shift
+            if src_end - self.commit_margin_sec > self._decoded_upto:
+                return None   # 맞은 과거 구간을 아직 다 받아 적지 못함
+
+            return self._transcript_from(src_start, src_end)
+
+    def _enough(self, matched: np.ndarray) -> bool:
+        votes = int(matched.sum())
+        return votes >= self.cfg.min_hashes and votes >= self.cfg.min_match_ratio * len(matched)
+
+    def _transcript_from(self, src_start: float, src_end: float) -> Optional[Transcript]:
+        tol = self.cfg.align_tolerance_sec
+        words = []
+        language, task = "", "transcribe"
+
+        for start, end, text, lang, entry_task, word_level in self._entries:
+            if word_level:
+                if not src_start <= (start + end) / 2 <= src_end:
+                    continue
+            else:
+                if end <= src_start + tol or start >= src_end - tol:
+                    continue
+                if abs(start - src_start) > tol or abs(end - src_end) > tol:
+                    return None   # 청크 경계가 어긋나 텍스트를 나눌 수 없음
+            words.append(Word(max(0.0, start - src_start), end - src_start, text))
+            language, task = language or lang, entry_task
+
+        text = "".join(w.text for w in words).strip()
+        return Transcript(text=text, language=language, words=words, task=task)
+
+    # ---------------- 기록 ---------------- #
+    def record(
+        self,
+        fp: Fingerprint,
+        start_sec: float,
+        end_sec: float,
+        result: Transcript,
+        stt_sec: Optional[float] = None,
+    ) -> None:
+        """
+        윈도우 하나의 결과를 기록한다. stt_sec 가 None 이면 재사용(hit), 아니면 실제 디코딩 시간.
+        - 단어는 지금까지 받아 적은 구간 뒤(윈도우 끝 - commit margin 까지)만 시간축에 붙인다
+        """
+        with self._lock:
+            if stt_sec is None:
+                self.hits += 1
+                self.skipped_audio_sec += end_sec - start_sec
+            else:
+                self.misses += 1
+                self._stt_sec += stt_sec
+                self._stt_audio_sec += end_sec - start_sec
+
+            stable_end = end_sec - self.commit_margin_sec
+            if result.words:
+                for w in result.words:
+                    start, end = start_sec + w.start, start_sec + w.end
+                    if (start + end) / 2 <= self._decoded_upto or end > stable_end:
+                        continue
+                    self._entries.append((start, end, w.text, result.language, result.task, True))
+            elif result.text.strip() and start_sec >= self._decoded_upto - self.cfg.align_tolerance_sec:
+                self._entries.append((start_sec, end_sec, result.text, result.language, result.task, False))
+            self._decoded_upto = max(self._decoded_upto, stable_end)
+
+            self.index.add(fp, from_frame=self._indexed_upto)
+            if len(fp):
+                self._indexed_upto = max(self._indexed_upto, int(fp.frames.max()) + 1)
+
+            cutoff = end_sec - self.cfg.history_sec
+            self.index.evict(int(cutoff / HOP_SEC))
+            while self._entries and self._entries[0][1] < cutoff:
+                self._entries.popleft()
+
+    def stats(self) -> dict:
+        with self._lock:
+            rtf = self._stt_sec / self._stt_audio_sec if self._stt_audio_sec else 0.0
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "skipped_audio_sec": round(self.skipped_audio_sec, 2),
+                "stt_sec_saved": round(self.skipped_audio_sec * rtf, 2),   # 디코딩했다면 걸렸을 시간 (실측 RTF 기준)
+                "indexed_hashes": len(self.index),
+            }
+
+
+def create_transcript_cache(cfg: FingerprintConfig, sample_rate: int, commit_margin_sec: float = 0.0):
+    """꺼져 있으면 None."""
+    if not cfg.enabled:
+        return None
+    return TranscriptCache(cfg, sample_rate, commit_margin_sec)
@@ -1,12 +1,23 @@
 # stt_worker.py
 
 import argparse
+import json
+import sys
+import threading
+from typing import Optional
 
-from core.config import load_default_config
+from core.caption_sink import CaptionSink, open_caption_sink
+from core.config import SourceConfig, load_default_config
+from core.events import CaptionEvent
+from core.ipc import FrameChannel, caption_message, connect_ipc
+from core.metrics import metrics, start_metrics
 from core.streaming import (
     run_stream_pipeline_vad,
     run_stream_pipeline_fixed,
+    run_stream_pipeline_multi,
 )
+from core.translate import translate_text
+from stt.engine import create_stt_engine, whisper_translates
 
 # ---------------- argparse ---------------- #
 def parse_args():
@@ -31,9 +42,219 @@ def parse_args():
         help="caption language (same / ko / en / ja / zh)",
     )
 
+    parser.add_argument(
+        "--source",
+        action="append",
+        default=[],
+        metavar="NAME=DEVICE",
+        help="화자별 입력 장치 (여러 번 지정하면 다중 화자 모드, dialog 모드에서만)",
+    )
+
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="상주 모드: 모델을 한 번만 로드하고 stdin 의 JSON 명령으로 세션을 시작/중지",
+    )
+
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=0,
+        help="127.0.0.1:<port>/metrics 로 단계별 지연 지표 노출 (0 이면 끔)",
+    )
+
+    parser.add_argument(
+        "--trace",
+        default=None,
+        metavar="PATH",
+        help="자막/단계별 지연을 JSONL trace 파일로 기록",
+    )
+
+    parser.add_argument(
+        "--caption-log",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="PATH",
+        help="확정 자막을 JSONL 로 기록하고 종료 시 .srt/.vtt 로 내보냄 (경로 생략 시 captions/ 아래 자동 이름)",
+    )
+
+    parser.add_argument(
+        "--ipc-port",
+        type=int,
+        default=None,
+        help="overlay 의 IPC 포트 (지정하면 자막 이벤트를 stdout 대신 전용 소켓으로 보냄)",
+    )
+
     return parser.parse_args()
 
 
+# overlay 와의 IPC 채널 (--ipc-port 로 띄웠을 때만)
+_ipc: Optional[FrameChannel] = None
+
+# 헤드리스 실행용 자막 기록 (--caption-log 일 때만)
+_sink: Optional[CaptionSink] = None
+
+
+# 🔥 핵심 추가 부분 🔥
+def on_caption(event: CaptionEvent):
+    if _sink is not None:
+        _sink.write(event)
+
+    if _ipc is not None:
+        try:
+            _ipc.send(caption_message(event))
+        except OSError as e:
+            print(f"[WORKER][WARN] IPC 전송 실패: {e}", flush=True)
+        return
+
+    # IPC 없이 단독 실행하면 콘솔에 찍는다 (같은 번호의 PARTIAL 은 CAPTION 이 올 때까지 제자리 갱신)
+    tag = "PARTIAL" if event.kind == "partial" else "CAPTION"
+    text = f"{event.speaker}: {event.text}" if event.speaker else event.text
+    print(f">>> {tag} {event.caption_id}: {text}", flush=True)
+
+
+def apply_session_options(cfg, mode: str, speech_lang: str, caption_lang: str, sources) -> None:
+    cfg.stt.speech_language = speech_lang
+    cfg.stt.caption_language = caption_lang
+
+    cfg.sources = []
+    for spec in sources:
+        name, _, device = spec.partition("=")
+        cfg.sources.append(SourceConfig(name=name, device_name=device or name))
+
+
+def apply_metrics_options(cfg, args) -> None:
+    if args.metrics_port:
+        cfg.metrics.http_port = args.metrics_port
+    if args.trace:
+        cfg.metrics.trace_path = args.trace
+    start_metrics(cfg.metrics)
+
+
+def run_session(cfg, mode: str, stt_engine=None, stop_event=None) -> None:
+    if mode == "dialog" and cfg.sources:
+        run_stream_pipeline_multi(cfg, on_caption, stt_engine=stt_engine, stop_event=stop_event)
+    elif mode == "dialog":
+        run_stream_pipeline_vad(cfg, on_caption, stt_engine=stt_engine, stop_event=stop_event)
+    else:
+        run_stream_pipeline_fixed(cfg, on_caption, stt_engine=stt_engine, stop_event=stop_event)
+
+
+# ---------------- 상주 모드 ---------------- #
+class WorkerServer:
+    """
+    모델(STT + 번역)을 한 번만 올려두고 세션만 바꿔 끼우는 상주 워커.
+
+    stdin 으로 한 줄에 하나씩 JSON 명령을 받는다.
+      {"cmd": "start", "mode": "dialog", "speech_lang": "ko", "caption_lang": "en"}
+      {"cmd": "reconfigure", "mode": "bgm"}      # 바뀐 항목만 보내면 됨
+      {"cmd": "stop"}
+      {"cmd": "quit"}
+    모드/언어 전환은 캡처와 파이프라인 스레드만 다시 띄우므로 모델 재로드가 없다.
+    """
+
+    def __init__(self, args):
+        self.cfg = load_default_config()
+        self.options = {
+            "mode": args.mode,
+            "speech_lang": args.speech_lang,
+            "caption_lang": args.caption_lang,
+            "sources": list(args.source),
+        }
+        apply_session_options(self.cfg, **self.options)
+        apply_metrics_options(self.cfg, args)
+
+        self.stt_engine = create_stt_engine(self.cfg.stt)
+        self.stt_engine.warmup(self.cfg.audio.sample_rate)
+
+        self._session: threading.Thread | None = None
+        self._stop_event: threading.Event | None = None
+
+    def _warm_translator(self) -> None:
+        src = self.options["speech_lang"]
+        tgt = self.options["caption_lang"]
+        if src != "auto" and tgt not in ("same", src) and not whisper_translates(self.cfg.stt):
+            translate_text("warm up", src=src, tgt=tgt, cfg=self.cfg.translate)
+
+    def start_session(self) -> None:
+        self.stop_session()
+        apply_session_options(self.cfg, **self.options)
+        self._warm_translator()
+
+        if _sink is not None:
+            _sink.new_session()
+
+        self._stop_event = threading.Event()
+        self._session = threading.Thread(
+            target=run_session,
+            args=(self.cfg, self.options["mode"], self.stt_engine, self._stop_event),
+            daemon=True,
+        )
+        self._session.start()
+        print(f"[WORKER] session started: {self.options}", flush=True)
+
+    def stop_session(self) -> None:
+        if self._session is None:
+            return
+
+        self._stop_event.set()
+        # 다음 세션은 이전 세션이 완전히 끝난 뒤에만 시작한다 (캡처 장치, 엔진, metrics 를 같이 쓰므로)
+        self._session.join(timeout=5.0)
+        if self._session.is_alive():
+            print("[WORKER][WARN] 이전 세션 종료 대기 중...", flush=True)
+            self._session.join()
+        self._session = None
+        self._stop_event = None
+        print("[WORKER] session stopped", flush=True)
+
+    def handle(self, msg: dict) -> bool:
+        cmd = msg.get("cmd")
+
+        if cmd in ("start", "reconfigure"):
+            for key in ("mode", "speech_lang", "caption_lang", "sources"):
+                if key in msg:
+                    self.options[key] = msg[key]
+            self.start_session()
+        elif cmd == "observe":
+            # overlay 가 재는 단계 (IPC 전달, 화면 반영)
+            values = msg.get("values", {})
+            for stage, sec in values.items():
+                metrics.observe(f"overlay_{stage}_sec", sec)
+            metrics.trace("overlay", caption_id=msg.get("caption_id"), timings=values)
+        elif cmd == "stop":
+            self.stop_session()
+        elif cmd == "quit":
+            self.stop_session()
+            return False
+        else:
+            print(f"[WORKER][WARN] 알 수 없는 명령: {msg}", flush=True)
+
+        return True
+
+    def serve(self) -> None:
+        print("[WORKER] ready", flush=True)
+        if _ipc is not None:
+            _ipc.send({"type": "ready"})
+
+        for line in sys.stdin:
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                msg = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"[WORKER][WARN] 잘못된 명령 ({e}): {line}", flush=True)
+                continue
+
+            if not self.handle(msg):
+                break
+
+        # 부모(overlay)가 stdin 을 닫으면 종료
+        self.stop_session()
+
+
 def main():
     args = parse_args()
 
@@ -43,20 +264,26 @@ def main():
     print(f"- caption_language: {args.caption_lang}")
     print()
 
-    cfg = load_default_config()
-    cfg.stt.speech_language = args.speech_lang
-    cfg.stt.caption_language = args.caption_lang
+    global _ipc, _sink
+    if args.ipc_port is not None:
+        _ipc = connect_ipc(args.ipc_port)
+    if args.caption_log is not None:
+        _sink = open_caption_sink(load_default_config().caption_log, args.caption_log or None)
 
-    # 🔥 핵심 추가 부분 🔥
-    def on_caption(caption_text, original_text):
-        # overlay가 이 줄을 읽는다
-        print(f">>> CAPTION: {caption_text}", flush=True)
+    try:
+        if args.serve:
+            WorkerServer(args).serve()
+            return
 
-    # -------- 실행 -------- #
-    if args.mode == "dialog":
-        run_stream_pipeline_vad(cfg, caption_callback=on_caption)
-    else:
-        run_stream_pipeline_fixed(cfg, caption_callback=on_caption)
+        cfg = load_default_config()
+        apply_session_options(cfg, args.mode, args.speech_lang, args.caption_lang, args.source)
+        apply_metrics_options(cfg, args)
+
+        # -------- 실행 -------- #
+        run_session(cfg, args.mode)
+    finally:
+        if _sink is not None:
+            _sink.close()
 
 
 if __name__ == "__main__":
@@ -4,6 +4,9 @@ from ui.overlay_caption_manager import CaptionManager
 
 class CaptionOverlay(QtWidgets.QWidget):
     caption_changed = QtCore.pyqtSignal(str)
+    caption_event = QtCore.pyqtSignal(int, str, bool)   # (caption_id, text, is_final)
+    caption_rendered = QtCore.pyqtSignal(int)           # caption_event 를 화면에 반영한 직후
+    mode_change_requested = QtCore.pyqtSignal(str)      # "dialog" | "bgm"
 
     def __init__(self):
         super().__init__()
@@ -46,13 +49,24 @@ class CaptionOverlay(QtWidgets.QWidget):
 
         layout.addWidget(self.label)
 
-        # ✅ 자막 관리기 복구
+        # ✅ 자막 관리기: 실제 글꼴 폭(QFontMetrics)으로 줄바꿈
+        metrics = QtGui.QFontMetrics(self.label.font())
         self.caption_manager = CaptionManager(
-            max_chars_per_line=25,
+            max_width=self._text_width(),
             max_lines=2,
+            measure=metrics.horizontalAdvance,
         )
 
+        # 자막 이벤트가 몰려도 화면 갱신 주기에 한 번만 다시 그린다
+        refresh_hz = QtGui.QGuiApplication.primaryScreen().refreshRate() or 60.0
+        self._render_timer = QtCore.QTimer(self)
+        self._render_timer.setSingleShot(True)
+        self._render_timer.setInterval(max(1, int(1000 / refresh_hz)))
+        self._render_timer.timeout.connect(self._render)
+        self._rendered_ids: list[int] = []
+
         self.caption_changed.connect(self._on_caption_changed)
+        self.caption_event.connect(self._on_caption_event)
 
         # 우클릭 종료 메뉴
         self._setup_context_menu()
@@ -62,11 +76,44 @@ class CaptionOverlay(QtWidgets.QWidget):
             QtCore.Qt.ContextMenuPolicy.ActionsContextMenu
         )
 
+        for label, mode in (("디스코드 대화 모드", "dialog"), ("브금 / 영상 모드", "bgm")):
+            action = QtGui.QAction(label, self)
+            action.triggered.connect(
+                lambda _checked=False, m=mode: self.mode_change_requested.emit(m)
+            )
+            self.addAction(action)
+
         quit_action = QtGui.QAction("종료", self)
         quit_action.triggered.connect(QtWidgets.QApplication.quit)
         self.addAction(quit_action)
 
+    def _text_width(self) -> int:
+        # 배경 둥근 모서리 안쪽 여백을 뺀 폭
+        return max(1, self.width() - 48)
+
+    def _schedule_render(self):
+        if not self._render_timer.isActive():
+            self._render_timer.start()
+
     def _on_caption_changed(self, text: str):
-        result = self.caption_manager.push(text)
-        if result:
-            self.label.setText(result)
+        if self.caption_manager.push(text):
+            self._schedule_render()
+
+    def _on_caption_event(self, caption_id: int, text: str, is_final: bool):
+        if self.caption_manager.update(caption_id, text, is_final):
+            self._rendered_ids.append(caption_id)
+            self._schedule_render()
+        elif self._render_timer.isActive():
+            # 바뀐 건 없지만 곧 그려질 화면에 함께 반영된 것으로 본다
+            self._rendered_ids.append(caption_id)
+        else:
+            # 화면이 이미 이 내용을 보여주고 있으므로 다시 그리지 않는다
+            self.caption_rendered.emit(caption_id)
+
+    def _render(self):
+        self.caption_manager.set_max_width(self._text_width())
+        self.label.setText(self.caption_manager.render())
+
+        ids, self._rendered_ids = self._rendered_ids, []
+        for caption_id in ids:
+            self.caption_rendered.emit(caption_id)
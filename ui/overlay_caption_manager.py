@@ -1,23 +1,203 @@
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+# (줄 번호, 그 줄에 이미 놓인 앞부분, 앞부분 폭)
+LayoutState = Tuple[int, str, int]
+
+# 띄어쓰기 없이 이어 쓰는 문자 (한자 / 가나): 글자마다 줄을 바꿀 수 있다
+_NO_SPACE_RANGES = (
+    (0x3040, 0x30FF),   # 히라가나, 가타카나
+    (0x3400, 0x4DBF),   # CJK 확장 A
+    (0x4E00, 0x9FFF),   # CJK 통합 한자
+    (0xF900, 0xFAFF),   # CJK 호환 한자
+    (0xFF66, 0xFF9F),   # 반각 가타카나
+)
+
+
+def _breaks_anywhere(ch: str) -> bool:
+    cp = ord(ch)
+    return any(lo <= cp <= hi for lo, hi in _NO_SPACE_RANGES)
+
+
+def display_width(text: str) -> int:
+    """Qt 없이 쓸 때의 기본 폭: 전각(한글/한자/가나 등) 2칸, 나머지 1칸."""
+    return sum(2 if unicodedata.east_asian_width(ch) in ("W", "F") else 1 for ch in text)
+
+
+def _tokens(text: str) -> List[Tuple[str, str]]:
+    """
+    (앞에 붙는 구분자, 토큰) 목록. 한글/영어는 단어 단위, 한자/가나는 글자 단위로 줄을 바꿀 수 있다.
+    """
+    tokens: List[Tuple[str, str]] = []
+    for word in text.split():
+        joiner = " "
+        run = ""
+        for ch in word:
+            if _breaks_anywhere(ch):
+                if run:
+                    tokens.append((joiner, run))
+                    joiner, run = "", ""
+                tokens.append((joiner, ch))
+                joiner = ""
+            else:
+                run += ch
+        if run:
+            tokens.append((joiner, run))
+    return tokens
+
+
 class CaptionManager:
-    def __init__(self, max_chars_per_line=25, max_lines=2):
-        self.max_chars_per_line = max_chars_per_line
+    """
+    caption_id 별 자막을 이어 붙여 픽셀 폭 기준으로 줄바꿈한다.
+
+    - measure(text) 로 실제 글꼴 폭을 잰다 (overlay 는 QFontMetrics.horizontalAdvance)
+    - update() 는 자막 내용만 바꾸고, 레이아웃은 render() 때 바뀐 자막부터 다시 한다
+      → 보통은 마지막(말하는 중인) 자막의 꼬리 줄만 다시 계산
+    - scrollback_lines 보다 오래된 줄을 가진 자막은 버린다 (화면에는 max_lines 줄만 표시)
+    """
+
+    def __init__(
+        self,
+        max_width: int = 50,
+        max_lines: int = 2,
+        scrollback_lines: int = 50,
+        measure: Optional[Callable[[str], int]] = None,
+    ):
+        self.max_width = max_width
         self.max_lines = max_lines
+        self.scrollback_lines = scrollback_lines
+        self.measure = measure or display_width
+
         self.lines: list[str] = []
+        self._widths: list[int] = []
+
+        # caption_id -> 텍스트. 중간 자막은 같은 id 로 들어와 제자리에서 바뀐다.
+        self._captions: "OrderedDict[int, str]" = OrderedDict()
+        # caption_id -> 이 자막을 놓기 직전의 레이아웃 상태 (줄 번호, 그 줄의 앞부분, 폭)
+        self._starts: dict[int, LayoutState] = {}
+        # 다시 배치할 첫 자막의 순서와 그 직전 상태 (None 이면 레이아웃이 최신)
+        self._dirty: Optional[Tuple[int, LayoutState]] = None
+        self._next_local_id = 0
+        self._evicted_upto = 0   # 이미 밀려난 자막 id (늦게 온 번역문이 다시 끼어들지 않게)
 
-    def push(self, text: str) -> str | None:
+    # ---------------- 내용 갱신 ---------------- #
+    def push(self, text: str) -> bool:
         if not text:
-            return None
-
-        words = text.split()
-        for word in words:
-            if not self.lines:
-                self.lines.append(word)
-            elif len(self.lines[-1]) + len(word) + 1 <= self.max_chars_per_line:
-                self.lines[-1] += " " + word
+            return False
+
+        # id 없이 들어오는 확정 자막은 음수 id 로 따로 관리
+        self._next_local_id -= 1
+        return self.update(self._next_local_id, text, True)
+
+    def update(self, caption_id: int, text: str, is_final: bool) -> bool:
+        """
+        partial/final 자막을 caption_id 기준으로 반영한다. 화면을 다시 그려야 하면 True.
+        - 빈 final 은 해당 자막을 지운다.
+        """
+        if 0 < caption_id <= self._evicted_upto and caption_id not in self._captions:
+            return False
+
+        if caption_id in self._captions:
+            if self._captions[caption_id] == text:
+                return False
+            pos = list(self._captions).index(caption_id)
+            self._mark_dirty(pos, self._starts.get(caption_id))
+            if text:
+                self._captions[caption_id] = text
             else:
-                self.lines.append(word)
+                del self._captions[caption_id]
+                self._starts.pop(caption_id, None)
+            return True
+
+        if not text:
+            return False
+
+        # 새 자막은 맨 뒤: 지금 레이아웃 끝에서 이어서 배치
+        self._mark_dirty(len(self._captions), self._end_state())
+        self._captions[caption_id] = text
+        return True
+
+    def set_max_width(self, max_width: int) -> None:
+        if max_width != self.max_width:
+            self.max_width = max_width
+            self._mark_dirty(0, (0, "", 0))
+
+    # ---------------- 레이아웃 ---------------- #
+    def render(self) -> str:
+        """바뀐 자막부터 다시 배치하고 화면에 보일 문자열을 돌려준다."""
+        if self._dirty is not None:
+            pos, state = self._dirty
+            self._dirty = None
+            self._relayout(pos, state)
+            self._trim_scrollback()
+        return "\n".join(self.lines[-self.max_lines:])
+
+    def _mark_dirty(self, pos: int, state: Optional[LayoutState]) -> None:
+        if self._dirty is not None and self._dirty[0] <= pos:
+            return
+        self._dirty = (pos, state if state is not None else (0, "", 0))
+
+    def _end_state(self) -> LayoutState:
+        if not self.lines:
+            return (0, "", 0)
+        return (len(self.lines) - 1, self.lines[-1], self._widths[-1])
+
+    def _relayout(self, pos: int, state: LayoutState) -> None:
+        line_index, prefix, width = state
+        del self.lines[line_index:]
+        del self._widths[line_index:]
+        if prefix:
+            self.lines.append(prefix)
+            self._widths.append(width)
+
+        for caption_id in list(self._captions)[pos:]:
+            self._starts[caption_id] = self._end_state()
+            self._place(self._captions[caption_id])
+
+    def _place(self, text: str) -> None:
+        space_w = self.measure(" ")
+
+        for joiner, token in _tokens(text):
+            token_w = self.measure(token)
+
+            if self.lines and self._widths[-1] > 0:
+                joiner_w = space_w if joiner else 0
+                if self._widths[-1] + joiner_w + token_w <= self.max_width:
+                    self.lines[-1] += joiner + token
+                    self._widths[-1] += joiner_w + token_w
+                    continue
+
+            if token_w <= self.max_width:
+                self.lines.append(token)
+                self._widths.append(token_w)
+                continue
+
+            # 한 줄보다 긴 토큰 (긴 URL 등): 글자 단위로 자른다
+            for ch in token:
+                ch_w = self.measure(ch)
+                if self.lines and self._widths[-1] > 0 and self._widths[-1] + ch_w <= self.max_width:
+                    self.lines[-1] += ch
+                    self._widths[-1] += ch_w
+                else:
+                    self.lines.append(ch)
+                    self._widths.append(ch_w)
+
+    def _trim_scrollback(self) -> None:
+        """scrollback_lines 밖으로 완전히 밀려난 자막을 버리고 줄 번호를 당긴다."""
+        while len(self._captions) > 1:
+            ids = iter(self._captions)
+            first_id = next(ids)
+            second_id = next(ids)
+            drop = self._starts[second_id][0]
+            if len(self.lines) <= self.scrollback_lines:
+                return
 
-            if len(self.lines) > self.max_lines:
-                self.lines.pop(0)
+            del self._captions[first_id]
+            del self._starts[first_id]
+            self._evicted_upto = max(self._evicted_upto, first_id)
 
-        return "\n".join(self.lines)
+            del self.lines[:drop]
+            del self._widths[:drop]
+            for caption_id, (line_index, prefix, width) in list(self._starts.items()):
+                self._starts[caption_id] = (line_index - drop, prefix, width)